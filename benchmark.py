@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+性能基准测试 - 离线覆盖各个热点路径
+
+覆盖内容：
+1. parse_gpx / remove_duplicates / simplify_path（1k ~ 1M 点的合成路径），批量编译数百条路线为 .route
+2. simulate_walk 的单帧耗时和整次耗时（假后端 + 虚拟时钟，不真正 sleep），速度曲线与平滑样条的构建及对应的行走，
+   叠加定位噪声的行走
+3. generate_sensor_data / write_sensor_file / 压缩推送前的 gzip（20分钟 ~ 4小时），多轴 100Hz 流式写出，
+   真实片段拼接（合成语料）
+4. get_recent_sensor_files（假 adb，模拟每次调用的往返延迟）
+5. 各入口模块的冷启动导入耗时（-X importtime）
+
+结果保存为 JSON，并与已保存的基线对比，超出容差即视为性能回退（退出码 1）。
+冷启动耗时同样与基线对比，新进程的导入耗时波动较大，使用更宽的 STARTUP_TOLERANCE。
+
+用法:
+    python benchmark.py                  # 运行并与基线对比
+    python benchmark.py --quick          # 只跑小规模数据
+    python benchmark.py --save-baseline  # 将本次结果保存为基线
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import math
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest import mock
+
+import gpx_parser
+import main as walker
+import sensor_axes
+import sensor_bootstrap
+import sensor_simulator
+from clock import VirtualClock
+from gps_noise import GaussMarkovNoise, NoisySender
+from route_spline import RouteSpline
+from speed_planner import SpeedProfile, build_speed_profile
+
+RESULTS_PATH = Path("bench_results.json")
+BASELINE_PATH = Path("bench_baseline.json")
+
+DEFAULT_TOLERANCE = 0.25  # 允许比基线慢 25%
+NOISE_FLOOR_SEC = 0.002  # 低于该差值的波动不计为回退
+
+ROUTE_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+QUICK_ROUTE_SIZES = [1_000, 10_000]
+SENSOR_DURATIONS = [20 * 60, 60 * 60, 4 * 60 * 60]  # 20分钟、1小时、4小时
+QUICK_SENSOR_DURATIONS = [20 * 60]
+
+COMPILE_ROUTES = 200  # 批量编译的路线条数
+QUICK_COMPILE_ROUTES = 20
+COMPILE_ROUTE_POINTS = 2_000
+
+FAKE_ADB_LATENCY_SEC = 0.005  # 假 adb 每次调用的往返延迟
+FAKE_SENSOR_FILES = 20
+
+# 冷启动：在新解释器中 import 入口模块的累计耗时（-X importtime），与基线对比
+STARTUP_MODULES = ["main", "sensor_simulator", "sensor_watch"]
+STARTUP_RUNS = 7
+STARTUP_TOLERANCE = 0.5  # 允许比基线慢 50%
+
+# 合成路径的中心点（取自 run.gpx 附近）
+CENTER_LAT = 30.3083
+CENTER_LON = 120.0783
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    """多次运行取最短耗时（秒）"""
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _repeat_for(size: int) -> int:
+    return 1 if size >= 1_000_000 else 3
+
+
+def make_route(num_points: int, dup_every: int = 5) -> List[Tuple[float, float]]:
+    """
+    生成合成的 (经度, 纬度) 路径：绕操场的椭圆，每隔 dup_every 个点插入一个重复点
+
+    Args:
+        num_points: 输出的点数（含重复点）
+        dup_every: 重复点间隔
+
+    Returns:
+        包含 (经度, 纬度) 元组的列表，与 parse_gpx 的输出格式一致
+    """
+    points = []
+    i = 0
+    while len(points) < num_points:
+        angle = 2 * math.pi * i / 4000
+        point = (
+            round(CENTER_LON + 0.0009 * math.cos(angle), 9),
+            round(CENTER_LAT + 0.0005 * math.sin(angle), 9),
+        )
+        points.append(point)
+        if dup_every and i % dup_every == 0 and len(points) < num_points:
+            points.append(point)
+        i += 1
+    return points
+
+
+def write_synthetic_gpx(path: Path, points: List[Tuple[float, float]]) -> None:
+    """将 (经度, 纬度) 列表写成只包含 wpt 的 GPX 文件"""
+    with path.open("w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">\n')
+        for lon, lat in points:
+            f.write(f'<wpt lat="{lat}" lon="{lon}"></wpt>\n')
+        f.write("</gpx>\n")
+
+
+class FakeBackend:
+    """假定位后端：只记录调用次数，不启动 MuMuManager 进程"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.last: Optional[Tuple[float, float]] = None
+
+    def __call__(self, mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> None:
+        self.calls += 1
+        self.last = (lon, lat)
+
+
+class FakeAdb:
+    """假 adb：替换 subprocess.run，按命令返回 ls / stat 的输出并模拟往返延迟"""
+
+    def __init__(self, num_files: int, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+        self.files = [f"{i:08x}-0000-4000-8000-000000000000.txt" for i in range(num_files)]
+
+    def __call__(self, cmd, *args, **kwargs) -> subprocess.CompletedProcess:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        shell_cmd = cmd[-1] if cmd else ""
+        if "%y|%n" in shell_cmd:
+            stdout = "".join(f"2025-12-15 14:30:45.123456789 +0800|{name}\n" for name in self.files)
+        elif "stat " in shell_cmd:
+            stdout = "2025-12-15 14:30:45.123456789 +0800\n"
+        elif "ls " in shell_cmd:
+            stdout = "\n".join(self.files) + "\n"
+        else:
+            stdout = ""
+        return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+
+def bench_route_parsing(results: Dict[str, dict], sizes: List[int], workdir: Path) -> None:
+    """parse_gpx / remove_duplicates / simplify_path"""
+    for size in sizes:
+        points = make_route(size)
+        gpx_path = workdir / f"route_{size}.gpx"
+        write_synthetic_gpx(gpx_path, points)
+        repeat = _repeat_for(size)
+
+        sec = _best_of(lambda: gpx_parser.parse_gpx(str(gpx_path)), repeat)
+        _record(results, f"parse_gpx[{size}]", sec, size)
+
+        sec = _best_of(lambda: gpx_parser.remove_duplicates(points), repeat)
+        _record(results, f"remove_duplicates[{size}]", sec, size)
+
+        deduped = gpx_parser.remove_duplicates(points)
+        sec = _best_of(lambda: gpx_parser.simplify_path(deduped, step=10), repeat)
+        _record(results, f"simplify_path[{size}]", sec, len(deduped))
+
+        gpx_path.unlink()
+
+
+def bench_route_compile(results: Dict[str, dict], count: int, workdir: Path) -> None:
+    """gpx_parser.compile_routes：进程池并行编译 count 条路线"""
+    src_dir = workdir / "compile_src"
+    src_dir.mkdir()
+    for i in range(count):
+        write_synthetic_gpx(src_dir / f"route_{i:04d}.gpx", make_route(COMPILE_ROUTE_POINTS + i))
+    sources = gpx_parser.collect_sources([str(src_dir)])
+
+    sec = _best_of(lambda: gpx_parser.compile_routes(sources, workdir / "compiled"), 1)
+    _record(results, f"compile_routes[{count}]", sec, count)
+    shutil.rmtree(src_dir)
+    shutil.rmtree(workdir / "compiled")
+
+
+def bench_walk_tick(results: Dict[str, dict]) -> None:
+    """simulate_walk 完整跑完 DIST_LIMIT_M：含终端表格的单帧耗时，以及虚拟时钟下的整次耗时"""
+    route = [(lat, lon) for lon, lat in gpx_parser.remove_duplicates(make_route(2_000))]
+
+    def run(display: bool, profile: Optional[SpeedProfile] = None, spline: Optional[RouteSpline] = None,
+            noise: bool = False) -> int:
+        backend = FakeBackend()
+        send = backend
+        if noise:
+            noisy = NoisySender(GaussMarkovNoise(2.0, seed=0))
+            send = noisy.wrap(backend)
+        with mock.patch.object(walker.os, "system", lambda _cmd: 0), \
+                contextlib.redirect_stdout(io.StringIO()):
+            result = walker.simulate_walk(Path("fake"), route, (0.0, 0.0), send=send, clock=VirtualClock(),
+                                          display=display, speed_profile=profile, spline=spline)
+        if noise:
+            noisy.stop()
+        return result.ticks
+
+    ticks = run(True)
+    sec = _best_of(lambda: run(True), 3)
+    _record(results, "simulate_walk.tick", sec / ticks, ticks, total=sec)
+
+    sec = _best_of(lambda: run(False), 3)
+    _record(results, "simulate_walk.run[virtual]", sec, ticks)
+
+    def build() -> SpeedProfile:
+        return build_speed_profile(route, walker.BASE_SPEED_MPS, walker.DIST_LIMIT_M, walker.SPEED_JITTER_RATIO, seed=0)
+
+    sec = _best_of(build, 3)
+    profile = build()
+    _record(results, "build_speed_profile", sec, len(profile))
+
+    ticks = run(False, profile)
+    sec = _best_of(lambda: run(False, profile), 3)
+    _record(results, "simulate_walk.run[virtual,profile]", sec, ticks)
+
+    sec = _best_of(lambda: RouteSpline(route), 3)
+    spline = RouteSpline(route)
+    _record(results, "RouteSpline.build", sec, len(spline.lut_s))
+
+    ticks = run(False, spline=spline)
+    sec = _best_of(lambda: run(False, spline=spline), 3)
+    _record(results, "simulate_walk.run[virtual,spline]", sec, ticks)
+
+    ticks = run(False, noise=True)
+    sec = _best_of(lambda: run(False, noise=True), 3)
+    _record(results, "simulate_walk.run[virtual,gps_noise]", sec, ticks)
+
+
+def bench_sensor(results: Dict[str, dict], durations: List[int], workdir: Path) -> None:
+    """generate_sensor_data / write_sensor_file"""
+    for duration in durations:
+        label = f"{duration // 60}min"
+        data: List[float] = []
+
+        def generate() -> None:
+            nonlocal data
+            data = sensor_simulator.generate_sensor_data(float(duration), 2.8)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            sec = _best_of(generate, 3)
+        _record(results, f"generate_sensor_data[{label}]", sec, len(data))
+
+        out_path = workdir / f"sensor_{label}.txt"
+        with contextlib.redirect_stdout(io.StringIO()):
+            sec = _best_of(lambda: sensor_simulator.write_sensor_file(data, str(out_path)), 3)
+        _record(results, f"write_sensor_file[{label}]", sec, len(data))
+
+        def compress() -> None:
+            with out_path.open("rb") as src, gzip.GzipFile(fileobj=io.BytesIO(), mode="wb",
+                                                           compresslevel=sensor_simulator.GZIP_LEVEL) as dst:
+                shutil.copyfileobj(src, dst, 1 << 16)
+
+        sec = _best_of(compress, 3)
+        _record(results, f"gzip_sensor_file[{label}]", sec, out_path.stat().st_size)
+        out_path.unlink()
+
+
+def bench_sensor_bootstrap(results: Dict[str, dict], workdir: Path) -> None:
+    """真实片段拼接：合成语料的打包耗时，以及 20 分钟数据的生成耗时（对比谐波模型）"""
+    corpus_dir = workdir / "corpus"
+    corpus_dir.mkdir()
+    for i, step_freq in enumerate((2.6, 2.7, 2.8, 2.9)):
+        data = sensor_simulator.SensorGenerator(2.8, step_freq).take(30 * 60 * sensor_simulator.SAMPLING_RATE_HZ)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sensor_simulator.write_sensor_file(data, str(corpus_dir / f"sample_{i}.txt"))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sec = _best_of(lambda: sensor_bootstrap.pack_corpus(corpus_dir), 1)
+    _record(results, "pack_corpus[4x30min]", sec, 4)
+
+    duration = 20 * 60
+    with contextlib.redirect_stdout(io.StringIO()):
+        sec = _best_of(lambda: sensor_bootstrap.generate_bootstrap_data(duration, 2.8, corpus_dir, seed=0), 3)
+    _record(results, "generate_bootstrap_data[20min]", sec, duration * sensor_simulator.SAMPLING_RATE_HZ)
+
+
+def bench_sensor_axes(results: Dict[str, dict], workdir: Path) -> None:
+    """多轴 100Hz 数据分块生成 + 流式写出（20分钟，含陀螺仪）"""
+    duration = 20 * 60
+    out_path = workdir / "sensor_axes.txt"
+    with contextlib.redirect_stdout(io.StringIO()):
+        sec = _best_of(lambda: sensor_axes.write_axis_sensor_file(duration, str(out_path), gyro=True, seed=1), 1)
+    _record(results, "write_axis_sensor_file[20min@100Hz]", sec, duration * sensor_axes.DEFAULT_RATE_HZ)
+    out_path.unlink()
+
+
+def bench_sensor_listing(results: Dict[str, dict]) -> None:
+    """get_recent_sensor_files 对假 adb 的查询耗时"""
+    fake_adb = FakeAdb(FAKE_SENSOR_FILES, FAKE_ADB_LATENCY_SEC)
+
+    def run() -> None:
+        fake_adb.calls = 0
+        with mock.patch.object(sensor_simulator.subprocess, "run", fake_adb), \
+                contextlib.redirect_stdout(io.StringIO()):
+            sensor_simulator.get_recent_sensor_files(Path("adb"))
+
+    sec = _best_of(run, 3)
+    _record(results, f"get_recent_sensor_files[{FAKE_SENSOR_FILES}]", sec, FAKE_SENSOR_FILES,
+            adb_calls=fake_adb.calls)
+
+
+def measure_import_time(module: str) -> float:
+    """在新的解释器中用 -X importtime 测量模块的累计导入耗时（秒）"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent,
+    )
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        # 顶层模块的名称列只有一个前导空格，嵌套导入按层级缩进
+        if len(parts) == 3 and parts[2] == f" {module}":
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"未在 -X importtime 输出中找到 {module}")
+
+
+def bench_startup(results: Dict[str, dict], runs: int) -> None:
+    """各入口模块的冷启动导入耗时（每次都是新进程，取最短）"""
+    for module in STARTUP_MODULES:
+        sec = min(measure_import_time(module) for _ in range(runs))
+        _record(results, f"startup[{module}]", sec, 1, tolerance=STARTUP_TOLERANCE)
+
+
+def _record(results: Dict[str, dict], name: str, seconds: float, items: int, **extra) -> None:
+    entry = {"seconds": seconds, "items": items}
+    entry.update(extra)
+    results[name] = entry
+    print(f"  {name:<36} {seconds * 1000:10.3f} ms  ({items} 项)")
+
+
+def run_all(quick: bool) -> dict:
+    """运行全部基准，返回可序列化的结果字典"""
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="runinmumu_bench_") as tmp:
+        workdir = Path(tmp)
+        print("路径解析:")
+        bench_route_parsing(results, QUICK_ROUTE_SIZES if quick else ROUTE_SIZES, workdir)
+        bench_route_compile(results, QUICK_COMPILE_ROUTES if quick else COMPILE_ROUTES, workdir)
+        print("行走模拟:")
+        bench_walk_tick(results)
+        print("传感器数据:")
+        bench_sensor(results, QUICK_SENSOR_DURATIONS if quick else SENSOR_DURATIONS, workdir)
+        bench_sensor_axes(results, workdir)
+        bench_sensor_bootstrap(results, workdir)
+        print("sensor 文件查询:")
+        bench_sensor_listing(results)
+        print("冷启动:")
+        bench_startup(results, 3 if quick else STARTUP_RUNS)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    与基线对比，返回回退项的描述列表
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        tolerance: 允许的相对变慢比例（本次结果中带 tolerance 字段的项使用两者中较大的一个）
+
+    Returns:
+        回退描述列表，为空表示没有回退
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    print(f"\n{'名称':<38} {'基线(ms)':>10} {'本次(ms)':>10} {'变化':>8}")
+    for name, entry in current["results"].items():
+        base = base_results.get(name)
+        if not base:
+            continue
+        base_sec, cur_sec = base["seconds"], entry["seconds"]
+        change = (cur_sec - base_sec) / base_sec if base_sec > 0 else 0.0
+        flag = ""
+        if cur_sec > base_sec * (1 + max(tolerance, entry.get("tolerance", 0.0))) and cur_sec - base_sec > NOISE_FLOOR_SEC:
+            flag = "  ! 回退"
+            regressions.append(f"{name}: {base_sec * 1000:.3f} ms -> {cur_sec * 1000:.3f} ms ({change:+.0%})")
+        print(f"{name:<38} {base_sec * 1000:10.3f} {cur_sec * 1000:10.3f} {change:+8.0%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="RunInMumu 性能基准测试")
+    parser.add_argument("--quick", action="store_true", help="只跑小规模数据")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH, help="结果输出路径")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允许的相对变慢比例")
+    args = parser.parse_args()
+
+    current = run_all(args.quick)
+    args.output.write_text(json.dumps(current, indent=4, ensure_ascii=False), encoding="utf-8")
+    print(f"\n结果已保存到: {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=4, ensure_ascii=False), encoding="utf-8")
+        print(f"基线已保存到: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"未找到基线文件 {args.baseline}，使用 --save-baseline 生成")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(current, baseline, args.tolerance)
+    if regressions:
+        print(f"\n× 检测到 {len(regressions)} 项性能回退:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("\n✓ 未检测到性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+检查点 - 加载路线时计算每个检查点在沿路线第几米处被经过
+
+许多应用要求跑步经过指定的打卡点。这里在开跑前：
+1. 把路线的每一段按包围盒登记到网格空间索引（复用 route_library.GridIndex）
+2. 对每个检查点只取半径范围内的候选段，解出线段首次进入半径的位置，
+   得到"沿路线第几米时满足该检查点"的表（路线按圈循环，第一圈内首次经过即为全程首次经过）
+3. 出发前检查目标距离是否覆盖所有检查点，不够时把目标距离延长到刚好满足为止
+
+行走时按已走路程与排好序的表比较，每帧只比较下一个未经过的检查点。
+
+配置（config.json）:
+    "checkpoints": [
+        {"name": "北门", "lat": 30.3101, "lon": 120.0802, "radius_m": 30},
+        {"name": "操场", "lat": 30.3083, "lon": 120.0783}
+    ]
+
+坐标为应用看到的位置，即已加上 location_offset 后的坐标。开启 spline 时行走沿平滑曲线按弧长累计路程，
+这里改用样条的弧长查找表作为路线的折线，表中的路程与行走时累计的路程一致。
+
+用法:
+    python checkpoints.py        # 按 config.json 检查路线和目标距离能否覆盖所有检查点
+"""
+import math
+import sys
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Sequence, Tuple
+
+from geo import METERS_PER_DEG, geo_dist_m
+from route_library import GridIndex
+
+if TYPE_CHECKING:
+    from route_spline import RouteSpline
+
+DEFAULT_RADIUS_M = 25.0
+SEGMENT_CELL_DEG = 0.001  # 路线段网格的边长（度），约 110 米
+
+
+class Checkpoint(NamedTuple):
+    name: str
+    lat: float
+    lon: float
+    radius_m: float
+
+
+class CheckpointHit(NamedTuple):
+    checkpoint: Checkpoint
+    distance_m: Optional[float]  # 沿路线首次满足的路程，None 表示整条路线都不经过
+
+
+def parse_checkpoints(items: Sequence[dict]) -> List[Checkpoint]:
+    """
+    解析配置中的检查点列表
+
+    Raises:
+        ValueError: 缺少坐标或格式错误
+    """
+    checkpoints = []
+    for i, item in enumerate(items, 1):
+        try:
+            lat, lon = float(item["lat"]), float(item["lon"])
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"第 {i} 个检查点缺少有效的 lat / lon") from exc
+        radius = float(item.get("radius_m", DEFAULT_RADIUS_M))
+        if radius <= 0:
+            raise ValueError(f"第 {i} 个检查点的 radius_m 必须大于 0")
+        checkpoints.append(Checkpoint(str(item.get("name", f"#{i}")), lat, lon, radius))
+    return checkpoints
+
+
+def _first_entry(lat: float, lon: float, radius_m: float,
+                 lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[float]:
+    """
+    线段 (lat1, lon1) -> (lat2, lon2) 首次进入以 (lat, lon) 为圆心、radius_m 为半径的圆时的参数 t ∈ [0, 1]
+
+    在局部等距投影中解 |A + t(B - A) - C| = r，不相交时返回 None。
+    """
+    k = math.cos(math.radians(lat)) * METERS_PER_DEG
+    ax, ay = (lon1 - lon) * k, (lat1 - lat) * METERS_PER_DEG
+    dx, dy = (lon2 - lon1) * k, (lat2 - lat1) * METERS_PER_DEG
+    c = ax * ax + ay * ay - radius_m * radius_m
+    if c <= 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    if a == 0:
+        return None
+    b = 2 * (ax * dx + ay * dy)
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / (2 * a)
+    return t if 0.0 <= t <= 1.0 else None
+
+
+class CheckpointPlan:
+    """
+    检查点计划：每个检查点在沿路线第几米被满足
+
+    Args:
+        route: (纬度, 经度) 列表，按首尾相连循环（与 simulate_walk 一致）
+        checkpoints: 检查点列表
+        offset: 发送位置时叠加的 (Δ纬度, Δ经度)
+        spline: 行走使用的平滑样条（见 route_spline），给出时按样条的弧长查找表计算
+    """
+
+    def __init__(self, route: Sequence[Tuple[float, float]], checkpoints: Sequence[Checkpoint],
+                 offset: Tuple[float, float] = (0.0, 0.0), spline: Optional["RouteSpline"] = None) -> None:
+        if len(route) < 2:
+            raise ValueError("路径点至少需要两个")
+        d_lat, d_lon = offset
+
+        # 闭合折线（末点即起点）及每个点沿行走路线的路程，与行走循环累计路程的方式一致
+        if spline is not None:
+            points = [(lat + d_lat, lon + d_lon) for lat, lon in spline.lut_points()]
+            cum = list(spline.lut_s)
+        else:
+            points = [(lat + d_lat, lon + d_lon) for lat, lon in route]
+            points.append(points[0])
+            cum = [0.0]
+            for i in range(len(points) - 1):
+                cum.append(cum[-1] + geo_dist_m(*points[i], *points[i + 1]))
+        self.lap_m = cum[-1]
+
+        grid = GridIndex(SEGMENT_CELL_DEG)
+        for i in range(len(points) - 1):
+            lat1, lon1 = points[i]
+            lat2, lon2 = points[i + 1]
+            grid.insert(i, (min(lat1, lat2), min(lon1, lon2), max(lat1, lat2), max(lon1, lon2)))
+
+        self.hits: List[CheckpointHit] = []
+        for cp in checkpoints:
+            best: Optional[float] = None
+            for i in sorted(grid.query_radius(cp.lat, cp.lon, cp.radius_m)):
+                if best is not None and cum[i] >= best:
+                    break
+                lat1, lon1 = points[i]
+                lat2, lon2 = points[i + 1]
+                t = _first_entry(cp.lat, cp.lon, cp.radius_m, lat1, lon1, lat2, lon2)
+                if t is not None:
+                    dist = cum[i] + t * (cum[i + 1] - cum[i])
+                    if best is None or dist < best:
+                        best = dist
+            self.hits.append(CheckpointHit(cp, best))
+
+    @property
+    def unreachable(self) -> List[Checkpoint]:
+        return [hit.checkpoint for hit in self.hits if hit.distance_m is None]
+
+    @property
+    def required_m(self) -> float:
+        """满足所有可到达检查点所需的最短路程"""
+        return max((hit.distance_m for hit in self.hits if hit.distance_m is not None), default=0.0)
+
+    def goal_m(self, dist_limit: float) -> float:
+        """距离目标和检查点目标同时满足时的路程"""
+        return max(dist_limit, self.required_m)
+
+    def report(self, dist_limit: float) -> List[str]:
+        lines = []
+        for hit in sorted(self.hits, key=lambda h: math.inf if h.distance_m is None else h.distance_m):
+            cp = hit.checkpoint
+            where = "路线不经过" if hit.distance_m is None else f"第 {hit.distance_m:7.1f} 米"
+            lines.append(f"  {cp.name:<12} 半径 {cp.radius_m:4.0f} 米  {where}")
+        required = self.required_m
+        if required <= dist_limit:
+            lines.append(f"  目标距离 {dist_limit:.0f} 米可覆盖所有可到达的检查点 (最后一个在第 {required:.1f} 米)")
+        else:
+            lines.append(f"  目标距离 {dist_limit:.0f} 米不足, 需要至少 {required:.1f} 米")
+        return lines
+
+
+class CheckpointTracker:
+    """行走时记录检查点的经过情况，on_tick 可直接作为 simulate_walk 的 hook"""
+
+    def __init__(self, plan: CheckpointPlan, on_hit=None) -> None:
+        self.pending = sorted(
+            (hit.distance_m, hit.checkpoint) for hit in plan.hits if hit.distance_m is not None
+        )
+        self.passed: List[Tuple[Checkpoint, float]] = []
+        self.on_hit = on_hit
+        self._next = 0
+
+    def on_tick(self, elapsed_sec: float, total_dist_m: float, speed_mps: float) -> None:
+        pending = self.pending
+        while self._next < len(pending) and total_dist_m >= pending[self._next][0]:
+            checkpoint = pending[self._next][1]
+            self.passed.append((checkpoint, elapsed_sec))
+            self._next += 1
+            if self.on_hit:
+                self.on_hit(checkpoint, elapsed_sec, total_dist_m)
+
+    @property
+    def done(self) -> bool:
+        return self._next >= len(self.pending)
+
+
+def main() -> int:
+    import main as walker
+
+    cfg = walker.load_config()
+    try:
+        checkpoints = parse_checkpoints(cfg.get("checkpoints") or [])
+    except ValueError as exc:
+        print(f"× checkpoints 配置错误: {exc}")
+        return 1
+    if not checkpoints:
+        print("config.json 中没有配置 checkpoints")
+        return 0
+
+    route, offset = walker.load_walk_path(cfg)
+    plan = CheckpointPlan(route, checkpoints, offset, walker.build_spline(cfg, route))
+    print(f"路线一圈 {plan.lap_m:.1f} 米, {len(checkpoints)} 个检查点:")
+    for line in plan.report(walker.DIST_LIMIT_M):
+        print(line)
+    return 1 if plan.unreachable else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
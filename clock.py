@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+时钟抽象 - 行走循环、传感器和探测器统一通过 Clock 取时间和等待
+
+RealClock 使用 time.perf_counter / time.sleep；VirtualClock 的 sleep 只推进虚拟时间，
+配合假后端可以在毫秒级内跑完一整次模拟，用于参数扫描和快速回归检查。
+"""
+import time
+from typing import Protocol
+
+
+class Clock(Protocol):
+    def now(self) -> float: ...
+
+    def sleep(self, seconds: float) -> None: ...
+
+
+class RealClock:
+    """真实时钟"""
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """虚拟时钟：sleep 立即返回并把当前时间向前推进"""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.t = start
+
+    def now(self) -> float:
+        return self.t
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.t += seconds
+
+
+REAL_CLOCK = RealClock()
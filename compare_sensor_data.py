@@ -1,20 +1,16 @@
 #!/usr/bin/env python3
 """
 对比生成数据和真实数据的统计特征
+
+真实数据的统计量来自 sensor_catalog 的目录，不再读取原始文件；可按时长、步频筛选样本:
+    python compare_sensor_data.py --duration 25 35 --spm 165 175 --count 5
 """
-import json
-import random
+import argparse
 import statistics
 from pathlib import Path
 
-from sensor_simulator import generate_sensor_data
-
-
-def load_real_sample(sample_file: Path):
-    """加载真实传感器数据样本"""
-    content = sample_file.read_text(encoding="utf-8")
-    data = json.loads(content)
-    return data
+from sensor_catalog import DEFAULT_CORPUS_DIR, SensorCatalog, pooled_stats
+from sensor_simulator import SAMPLING_RATE_HZ, generate_sensor_data
 
 
 def analyze_data(data, label):
@@ -37,37 +33,68 @@ def analyze_data(data, label):
     print(f"  75%分位: {p75:.2f} m/s^2")
 
 
+def analyze_catalog(entries, label):
+    """
+    由目录中的摘要合并出真实数据的统计特征
+
+    目录只保存每个文件的分位数，合并后的分位数是各文件分位数按点数加权的平均值，输出中标为近似值。
+    """
+    count, mean, std = pooled_stats(entries)
+
+    def weighted(field):
+        return sum(getattr(e, field) * e.count for e in entries) / count
+
+    print(f"\n{'='*60}")
+    print(f"{label}")
+    print(f"{'='*60}")
+    print(f"  数据点数: {count}")
+    print(f"  平均值: {mean:.2f} m/s^2")
+    print(f"  标准差: {std:.2f} m/s^2")
+    print(f"  中位数(近似): {weighted('p50'):.2f} m/s^2")
+    print(f"  最小值: {min(e.min for e in entries):.2f} m/s^2")
+    print(f"  最大值: {max(e.max for e in entries):.2f} m/s^2")
+    print(f"  25%分位(近似): {weighted('p25'):.2f} m/s^2")
+    print(f"  75%分位(近似): {weighted('p75'):.2f} m/s^2")
+    print(f"  主步频: {weighted('cadence_spm'):.0f} 步/分钟")
+    print("  (近似 = 各样本分位数按点数加权平均，并非合并后数据的真实分位数)")
+    return count, mean, std
+
+
 def main():
+    parser = argparse.ArgumentParser(description="对比生成数据和真实数据的统计特征")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_CORPUS_DIR, help="真实数据目录")
+    parser.add_argument("--duration", nargs=2, type=float, metavar=("MIN", "MAX"), help="样本时长范围（分钟）")
+    parser.add_argument("--spm", nargs=2, type=float, metavar=("MIN", "MAX"), help="样本步频范围（步/分钟）")
+    parser.add_argument("--count", type=int, default=3, help="随机选取的样本数")
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("  传感器数据对比分析")
     print("="*60)
     
-    # 1. 加载真实数据样本
-    real_samples_dir = Path("real_sensor")
-    samples = list(real_samples_dir.glob("*.txt"))
-    
-    if not samples:
+    # 1. 从目录中按条件随机选取样本
+    if not args.dir.is_dir():
         print("错误: 未找到真实数据样本")
         return
+
+    with SensorCatalog(args.dir) as catalog:
+        catalog.refresh()
+        selected_samples = catalog.query(args.duration, args.spm, limit=args.count, shuffle=True)
     
-    # 随机选择3个样本
-    selected_samples = random.sample(samples, min(3, len(samples)))
+    if not selected_samples:
+        print("错误: 没有符合条件的真实数据样本")
+        return
     
-    print(f"\n加载了 {len(selected_samples)} 个真实数据样本:")
+    print(f"\n选取了 {len(selected_samples)} 个真实数据样本:")
     for s in selected_samples:
-        print(f"  - {s.name}")
+        print(f"  - {s.name} ({s.duration_sec / 60:.1f} 分钟, {s.cadence_spm:.0f} 步/分钟)")
     
     # 2. 分析真实数据
-    all_real_data = []
-    for sample_file in selected_samples:
-        data = load_real_sample(sample_file)
-        all_real_data.extend(data)
-    
-    analyze_data(all_real_data, "真实数据统计 (多个样本合并)")
+    real_count, real_mean, real_std = analyze_catalog(selected_samples, "真实数据统计 (多个样本合并)")
     
     # 3. 生成模拟数据
     print("\n正在生成模拟数据...")
-    duration = len(all_real_data) / 10.0  # 假设10Hz采样率
+    duration = real_count / SAMPLING_RATE_HZ
     generated_data = generate_sensor_data(duration, 2.8)
     
     analyze_data(generated_data, "生成数据统计")
@@ -77,11 +104,9 @@ def main():
     print("对比结果")
     print(f"{'='*60}")
     
-    real_mean = statistics.mean(all_real_data)
     gen_mean = statistics.mean(generated_data)
     mean_diff = abs(real_mean - gen_mean) / real_mean * 100
     
-    real_std = statistics.stdev(all_real_data)
     gen_std = statistics.stdev(generated_data)
     std_diff = abs(real_std - gen_std) / real_std * 100
     
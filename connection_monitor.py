@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+连接健康监测 - 跟踪定位注入的返回码和耗时，后台定期探测模拟器，断线后退避重连
+
+模拟器或 adb server 在跑步中途重启时，set_location 的失败原本会被静默吞掉。
+ConnectionMonitor 包装定位发送函数：
+1. 记录每次注入的返回码和耗时，连续失败达到阈值即判定断线
+2. 后台线程定期调用 probe（MuMuManager info）探测模拟器是否在线
+3. 断线后按退避间隔调用 reconnect，期间的帧计为丢失帧，行走进度照常推进；
+   退避只在注入成功后才重置，info 探测正常但注入仍失败的反复断线会逐次拉长间隔
+4. 重连成功后立即补发最近一次的位置，从当前路线位置继续，不重新开始跑步；
+   注入按发送顺序串行执行，行走线程已发出更新的位置时跳过补发，不会让设备上的位置回跳
+"""
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+PROBE_INTERVAL_SEC = 5.0  # 在线时的探测间隔
+FAIL_THRESHOLD = 3  # 连续注入失败多少次判定断线
+BACKOFF_SEC = (1.0, 2.0, 4.0, 8.0, 16.0)  # 重连退避间隔，超出后保持最后一个值
+LATENCY_WINDOW = 512  # 保留最近多少次注入耗时用于统计
+
+Sender = Callable[[Path, float, float, Tuple[float, float]], Optional[int]]
+
+
+class ConnectionMonitor:
+    """
+    定位注入的健康监测与自动重连
+
+    Args:
+        send: 实际的定位发送函数（如 main.set_location），返回命令返回码
+        probe: 探测模拟器是否在线，返回 bool
+        reconnect: 重新建立连接，失败时抛出异常
+        probe_interval: 在线时的探测间隔（秒）
+        fail_threshold: 连续失败多少次判定断线
+        backoff: 重连退避间隔序列（秒）
+    """
+
+    def __init__(
+        self,
+        send: Sender,
+        probe: Callable[[], bool],
+        reconnect: Callable[[], object],
+        probe_interval: float = PROBE_INTERVAL_SEC,
+        fail_threshold: int = FAIL_THRESHOLD,
+        backoff: Sequence[float] = BACKOFF_SEC,
+    ) -> None:
+        self._send = send
+        self._probe = probe
+        self._reconnect = reconnect
+        self.probe_interval = probe_interval
+        self.fail_threshold = max(1, fail_threshold)
+        self.backoff = tuple(backoff) or (1.0,)
+
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()  # 串行化注入，行走线程与重连后的补发不会同时调用 send
+        self._healthy = threading.Event()
+        self._healthy.set()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_fix: Optional[Tuple[int, Path, float, float, Tuple[float, float]]] = None  # (序号, 位置...)
+        self._seq = 0  # 最近一次 send 的序号
+        self._delivered_seq = 0  # 最近一次实际注入的序号
+        self._attempt = 0  # 自上次注入成功以来的重连次数，决定下一次的退避间隔
+
+        self.sent = 0
+        self.failed = 0
+        self.lost_ticks = 0
+        self.consecutive_failures = 0
+        self.disconnects = 0
+        self.reconnects = 0
+        self.reconnect_time_sec = 0.0
+        self.latencies: List[float] = []
+        self._down_since: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self._healthy.is_set()
+
+    def start(self) -> "ConnectionMonitor":
+        """启动后台探测线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止后台线程"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def send(self, mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> Optional[int]:
+        """与 set_location 签名相同，可直接作为 simulate_walk 的 send 参数"""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._last_fix = (seq, mgr_path, lon, lat, offset)
+            if not self._healthy.is_set():
+                self.lost_ticks += 1
+                return None
+        return self._deliver(seq, mgr_path, lon, lat, offset)
+
+    def _deliver(self, seq: int, mgr_path: Path, lon: float, lat: float,
+                 offset: Tuple[float, float]) -> Optional[int]:
+        with self._send_lock:
+            # 已注入过更新的位置（补发晚于行走线程的下一帧）时跳过，避免位置回跳
+            if seq <= self._delivered_seq:
+                return None
+            self._delivered_seq = seq
+            t0 = time.perf_counter()
+            try:
+                rc = self._send(mgr_path, lon, lat, offset)
+            except (OSError, subprocess.SubprocessError):
+                rc = -1
+            latency = time.perf_counter() - t0
+
+        with self._lock:
+            self.sent += 1
+            self.latencies.append(latency)
+            if len(self.latencies) > LATENCY_WINDOW:
+                del self.latencies[: len(self.latencies) - LATENCY_WINDOW]
+            if rc is None or rc == 0:
+                self.consecutive_failures = 0
+                self._attempt = 0
+            else:
+                self.failed += 1
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.fail_threshold:
+                    self._mark_down()
+        return rc
+
+    def _mark_down(self) -> None:
+        """判定断线（调用方需持有锁）"""
+        if self._healthy.is_set():
+            self._healthy.clear()
+            self.disconnects += 1
+            self._down_since = time.perf_counter()
+            self._wake.set()
+
+    def _monitor_loop(self) -> None:
+        while not self._stop.is_set():
+            if self._healthy.is_set():
+                self._wake.wait(self.probe_interval)
+                self._wake.clear()
+                if self._stop.is_set():
+                    return
+                if self._healthy.is_set() and not self._probe():
+                    with self._lock:
+                        self._mark_down()
+                continue
+
+            with self._lock:
+                attempt = self._attempt
+                self._attempt += 1
+            # 首次断线立即重连；重连后仍未注入成功又断线（或重连失败）时按退避间隔等待
+            if attempt > 0:
+                delay = self.backoff[min(attempt - 1, len(self.backoff) - 1)]
+                if self._stop.wait(delay):
+                    return
+
+            try:
+                self._reconnect()
+                ok = self._probe()
+            except Exception:
+                ok = False
+
+            if ok:
+                with self._lock:
+                    self.reconnects += 1
+                    self.consecutive_failures = 0
+                    if self._down_since is not None:
+                        self.reconnect_time_sec += time.perf_counter() - self._down_since
+                        self._down_since = None
+                    last_fix = self._last_fix
+                    self._healthy.set()
+                # 立即补发当前位置，从断线时的路线进度继续（行走线程已发出新位置时 _deliver 会跳过）
+                if last_fix is not None:
+                    self._deliver(*last_fix)
+
+    def metrics(self) -> dict:
+        """返回统计指标：注入次数、失败次数、丢失帧、重连次数与耗时、注入耗时分布"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            down_for = time.perf_counter() - self._down_since if self._down_since is not None else 0.0
+            result = {
+                "healthy": self._healthy.is_set(),
+                "sent": self.sent,
+                "failed": self.failed,
+                "lost_ticks": self.lost_ticks,
+                "disconnects": self.disconnects,
+                "reconnects": self.reconnects,
+                "reconnect_time_sec": self.reconnect_time_sec + down_for,
+            }
+        if latencies:
+            result["latency_p50_ms"] = latencies[len(latencies) // 2] * 1000
+            result["latency_p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            result["latency_max_ms"] = latencies[-1] * 1000
+        return result
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+FIT 文件解码器 - 原生解析 Garmin FIT 二进制格式中 record 消息的经纬度
+
+只实现读取路线所需的部分：
+1. 文件头（12 或 14 字节）与多段拼接的 FIT 文件
+2. 定义消息（含开发者字段）与普通 / 压缩时间戳数据消息
+3. record 消息（全局编号 20）中的 position_lat / position_long（sint32 半圆单位）
+
+每个定义消息预编译一个 struct.Struct，只解出经纬度两个字段，其他字段按填充字节跳过；
+文件按记录逐条读取，内存占用与文件大小无关。
+"""
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from route_importers import RouteArrays
+
+RECORD_MESG_NUM = 20
+FIELD_POSITION_LAT = 0
+FIELD_POSITION_LONG = 1
+INVALID_SINT32 = 0x7FFFFFFF
+SEMICIRCLE_TO_DEG = 180.0 / 2 ** 31
+
+
+class FitError(ValueError):
+    """FIT 文件格式错误"""
+
+
+class _Definition:
+    """一个本地消息类型的定义：总长度，以及 record 消息的经纬度解包器"""
+
+    __slots__ = ("size", "unpack")
+
+    def __init__(self, size: int, unpack: Optional[struct.Struct]) -> None:
+        self.size = size
+        self.unpack = unpack
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise FitError("FIT 文件意外结束")
+    return data
+
+
+def _read_definition(f: BinaryIO, has_dev_fields: bool) -> Tuple[_Definition, int]:
+    """读取定义消息，返回 (定义, 消息字节数)"""
+    header = _read_exact(f, 5)
+    big_endian = header[1] == 1
+    global_num = struct.unpack(">H" if big_endian else "<H", header[2:4])[0]
+    num_fields = header[4]
+    fields = _read_exact(f, num_fields * 3)
+    consumed = 5 + num_fields * 3
+
+    dev_size = 0
+    if has_dev_fields:
+        num_dev = _read_exact(f, 1)[0]
+        dev_fields = _read_exact(f, num_dev * 3)
+        consumed += 1 + num_dev * 3
+        dev_size = sum(dev_fields[i * 3 + 1] for i in range(num_dev))
+
+    is_record = global_num == RECORD_MESG_NUM
+    fmt = [">" if big_endian else "<"]
+    size = dev_size
+    found = 0
+    for i in range(num_fields):
+        field_num, field_size = fields[i * 3], fields[i * 3 + 1]
+        size += field_size
+        if is_record and field_size == 4 and field_num in (FIELD_POSITION_LAT, FIELD_POSITION_LONG):
+            fmt.append("i")
+            found |= 1 << field_num
+        else:
+            fmt.append(f"{field_size}x")
+    fmt.append(f"{dev_size}x")
+
+    unpack = None
+    if is_record and found == 0b11:
+        unpack = struct.Struct("".join(fmt))
+        # 记录经纬度在解包结果中的顺序
+        order = [fields[i * 3] for i in range(num_fields)
+                 if fields[i * 3] in (FIELD_POSITION_LAT, FIELD_POSITION_LONG) and fields[i * 3 + 1] == 4]
+        if order != [FIELD_POSITION_LAT, FIELD_POSITION_LONG]:
+            unpack = _Swapped(unpack)
+    return _Definition(size, unpack), consumed
+
+
+class _Swapped:
+    """经度字段排在纬度之前时，交换解包结果的顺序"""
+
+    __slots__ = ("_inner",)
+
+    def __init__(self, inner: struct.Struct) -> None:
+        self._inner = inner
+
+    def unpack(self, data: bytes) -> Tuple[int, int]:
+        lon, lat = self._inner.unpack(data)
+        return lat, lon
+
+
+def _read_file_header(f: BinaryIO) -> Optional[int]:
+    """读取文件头，返回数据区长度；已到文件末尾时返回 None"""
+    first = f.read(1)
+    if not first:
+        return None
+    header_size = first[0]
+    if header_size < 12:
+        raise FitError("FIT 文件头长度无效")
+    rest = _read_exact(f, header_size - 1)
+    if rest[7:11] != b".FIT":
+        raise FitError("不是 FIT 文件")
+    return struct.unpack("<I", rest[3:7])[0]
+
+
+def decode_positions(f: BinaryIO, route: RouteArrays) -> RouteArrays:
+    """
+    从 FIT 数据流中解码 record 消息的经纬度，追加到 route
+
+    Args:
+        f: 以二进制模式打开的文件对象
+        route: 输出的列式坐标数组
+
+    Returns:
+        route 本身
+    """
+    while True:
+        data_size = _read_file_header(f)
+        if data_size is None:
+            return route
+
+        definitions: Dict[int, _Definition] = {}
+        remaining = data_size
+        while remaining > 0:
+            header = _read_exact(f, 1)[0]
+            remaining -= 1
+            if header & 0x80:
+                # 压缩时间戳头：本地消息类型在第 5-6 位，后面直接是数据
+                local_type = (header >> 5) & 0x03
+            elif header & 0x40:
+                definition, consumed = _read_definition(f, bool(header & 0x20))
+                definitions[header & 0x0F] = definition
+                remaining -= consumed
+                continue
+            else:
+                local_type = header & 0x0F
+
+            definition = definitions.get(local_type)
+            if definition is None:
+                raise FitError(f"数据消息引用了未定义的本地消息类型 {local_type}")
+            payload = _read_exact(f, definition.size)
+            remaining -= definition.size
+            if definition.unpack is not None:
+                lat, lon = definition.unpack.unpack(payload)
+                if lat != INVALID_SINT32 and lon != INVALID_SINT32:
+                    route.append(lat * SEMICIRCLE_TO_DEG, lon * SEMICIRCLE_TO_DEG)
+
+        _read_exact(f, 2)  # 文件 CRC
+
+
+def import_fit(path: Path) -> RouteArrays:
+    """FIT：读取所有 record 消息中的有效经纬度"""
+    with Path(path).open("rb") as f:
+        return decode_positions(f, RouteArrays())
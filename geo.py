@@ -0,0 +1,22 @@
+"""
+路程度量 - 所有模块共用的经纬度与米的换算
+
+simulate_walk 按 geo_dist_m 累计路程、判断是否达到目标距离；速度曲线、平滑样条、路线库、
+检查点等预先计算的路程都必须使用同一度量，才能与行走循环对齐，因此换算系数只在这里定义。
+"""
+import math
+from typing import Tuple
+
+METERS_PER_DEG = 111_320
+
+
+def geo_dist_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """计算两点间的地理距离（米）"""
+    return math.hypot(lat2 - lat1, lon2 - lon1) * METERS_PER_DEG
+
+
+def meter_to_deg(lat: float, dx: float, dy: float) -> Tuple[float, float]:
+    """将米（东向 dx, 北向 dy）转换为经纬度偏移"""
+    d_lat = dy / METERS_PER_DEG
+    d_lon = dx / (METERS_PER_DEG * math.cos(math.radians(lat)))
+    return d_lat, d_lon
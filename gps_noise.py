@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+定位噪声 - 一阶 Gauss-Markov 过程模拟接收机的相关漂移
+
+原先每帧在 JITTER_RADIUS_M 内独立均匀取值：相邻两帧互不相关，看起来像白噪声，
+而且每帧的随机跳动都会被应用计入路程。真实定位误差是缓慢漂移的，这里用一阶 Gauss-Markov 过程：
+
+    n[k+1] = φ·n[k] + σ·√(1-φ²)·w[k],   φ = exp(-Δt/τ),  w ~ N(0, 1)
+
+σ 为定位精度（每个方向的误差标准差，米），τ 为相关时间（秒）。东、北两个方向独立。
+
+噪声按块预先生成（每块 BLOCK_SIZE 帧，存为 array），后台线程在当前块用完前生成下一块；
+行走时每帧只读取下一个值。NoisySender 包装定位发送函数，同时累计噪声使路程增加了多少，
+estimate_added_m 在出发前用同样的噪声参数在虚拟时钟上空跑一遍实际路线来估算这一增量，供补偿目标距离。
+
+配置（config.json，可选）:
+    "gps_noise": {"enabled": true, "sigma_m": 2.0, "tau_sec": 20, "seed": 1, "compensate": false}
+"""
+import math
+import queue
+import random
+import threading
+from array import array
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from geo import geo_dist_m, meter_to_deg
+
+DEFAULT_TAU_SEC = 20.0
+BLOCK_SIZE = 1024  # 每块的帧数（约 7 分钟 @ 0.4s）
+PREFETCH_BLOCKS = 2  # 后台预先生成的块数
+
+Sender = Callable[[Path, float, float, Tuple[float, float]], Optional[int]]
+TickHook = Callable[[float, float, float], None]
+
+
+class GaussMarkovNoise:
+    """
+    东、北两个方向的一阶 Gauss-Markov 噪声序列
+
+    Args:
+        sigma_m: 每个方向的稳态误差标准差（米）
+        tau_sec: 相关时间（秒），越大漂移越缓慢
+        dt: 相邻两帧的时间间隔（秒）
+        seed: 随机种子，相同种子生成相同的序列
+        background: 是否由后台线程预先生成后续的块（关闭时在当前线程按需生成）
+    """
+
+    def __init__(self, sigma_m: float, tau_sec: float = DEFAULT_TAU_SEC, dt: float = 0.4,
+                 seed: Optional[int] = None, block_size: int = BLOCK_SIZE, background: bool = True) -> None:
+        if sigma_m < 0 or tau_sec <= 0 or dt <= 0:
+            raise ValueError("sigma_m 不能为负, tau_sec 和 dt 必须大于 0")
+        self.sigma_m = sigma_m
+        self.tau_sec = tau_sec
+        self.phi = math.exp(-dt / tau_sec)
+        self._drive = sigma_m * math.sqrt(1 - self.phi * self.phi)
+        self.block_size = block_size
+        self._rng = random.Random(seed)
+        # 从稳态分布开始，第一帧就有与之后相同的误差水平
+        self._state = (self._rng.gauss(0.0, sigma_m), self._rng.gauss(0.0, sigma_m))
+
+        self._east, self._north = self._generate()
+        self._pos = 0
+        self._blocks: Optional["queue.Queue[Tuple[array, array]]"] = None
+        self._stop = threading.Event()
+        if background:
+            self._blocks = queue.Queue(maxsize=PREFETCH_BLOCKS)
+            threading.Thread(target=self._fill, daemon=True).start()
+
+    def _generate(self) -> Tuple[array, array]:
+        """按递推式生成一块噪声，状态在块之间连续"""
+        phi, drive, gauss = self.phi, self._drive, self._rng.gauss
+        east, north = self._state
+        east_out = array("d", bytes(8 * self.block_size))
+        north_out = array("d", bytes(8 * self.block_size))
+        for i in range(self.block_size):
+            east = phi * east + drive * gauss(0.0, 1.0)
+            north = phi * north + drive * gauss(0.0, 1.0)
+            east_out[i] = east
+            north_out[i] = north
+        self._state = (east, north)
+        return east_out, north_out
+
+    def _fill(self) -> None:
+        while not self._stop.is_set():
+            block = self._generate()
+            while not self._stop.is_set():
+                try:
+                    self._blocks.put(block, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def next(self) -> Tuple[float, float]:
+        """下一帧的 (东向, 北向) 误差（米）"""
+        if self._pos == self.block_size:
+            self._east, self._north = self._blocks.get() if self._blocks is not None else self._generate()
+            self._pos = 0
+        i = self._pos
+        self._pos = i + 1
+        return self._east[i], self._north[i]
+
+    def stop(self) -> None:
+        """停止后台生成线程"""
+        self._stop.set()
+
+
+class NoisySender:
+    """
+    包装定位发送函数，在每个位置上叠加噪声，wrap 后与 set_location 签名相同
+
+    noisy_m 按 geo_dist_m 累计加噪后各位置之间的路程（即应用记录的路程）；on_tick 作为 simulate_walk 的 hook
+    记录行走循环累计的路程 true_m，也就是判断目标距离所用的同一个量。added_m 即噪声多出的路程。
+    """
+
+    def __init__(self, noise: GaussMarkovNoise) -> None:
+        self.noise = noise
+        self.true_m = 0.0
+        self.noisy_m = 0.0
+        self._prev: Optional[Tuple[float, float]] = None  # 上一帧的加噪位置
+
+    @property
+    def added_m(self) -> float:
+        return self.noisy_m - self.true_m
+
+    def wrap(self, send: Sender) -> Sender:
+        def noisy_send(mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> Optional[int]:
+            east, north = self.noise.next()
+            d_lat, d_lon = meter_to_deg(lat, east, north)
+            noisy_lat, noisy_lon = lat + d_lat, lon + d_lon
+            if self._prev is not None:
+                self.noisy_m += geo_dist_m(self._prev[0], self._prev[1], noisy_lat, noisy_lon)
+            self._prev = (noisy_lat, noisy_lon)
+            return send(mgr_path, noisy_lon, noisy_lat, offset)
+
+        return noisy_send
+
+    def on_tick(self, elapsed_sec: float, total_dist_m: float, speed_mps: float) -> None:
+        self.true_m = total_dist_m
+
+    def stop(self) -> None:
+        self.noise.stop()
+
+
+def estimate_added_m(walk: Callable[[Sender, TickHook], object], sigma_m: float, tau_sec: float, dt: float,
+                     seed: Optional[int] = 0) -> float:
+    """
+    估算噪声使一次行走中应用记录的路程比行走循环累计的路程多出多少米
+
+    Args:
+        walk: 以给定的 send 和 hook 完整跑一次行走（如虚拟时钟下的 simulate_walk），
+              路线、速度曲线、平滑样条和目标距离都与实际行走一致
+        sigma_m / tau_sec / dt / seed: 与实际使用的噪声相同的参数
+    """
+    noisy = NoisySender(GaussMarkovNoise(sigma_m, tau_sec, dt, seed=seed, background=False))
+    walk(noisy.wrap(lambda mgr_path, lon, lat, offset: None), noisy.on_tick)
+    return noisy.added_m
@@ -1,10 +1,38 @@
 #!/usr/bin/env python3
 """
 GPX 文件解析器 - 将 GPX 文件中的路径点转换为 Python 列表格式
+
+批量编译：把一个目录（或通配符匹配）下的路线文件在进程池中并行解析、去重、抽稀，
+每条路线写成紧凑的二进制 .route 文件（坐标按 1e-7 度存为 int32），并生成汇总清单 .manifest.json。
+.route 已注册到 route_importers，main.py 和路线库可以直接读取。
+
+用法:
+    python gpx_parser.py                                    # 交互式处理 run.gpx，输出 walk_path.py
+    python gpx_parser.py compile routes/ -o compiled/       # 批量编译目录下的所有路线
+    python gpx_parser.py compile "routes/*.gpx" --step 5 --jobs 8
 """
+import argparse
+import glob
+import json
+import os
+import struct
+import sys
+import time
 import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from route_importers import RouteArrays, import_route, supported_suffixes
+
+COMPILED_SUFFIX = ".route"
+COMPILED_MAGIC = b"RIMR"
+COMPILED_VERSION = 1
+COMPILED_SCALE = 1e7  # 坐标按 1e-7 度（约 1 厘米）取整存为 int32
+MANIFEST_FILENAME = ".manifest.json"  # 以 . 开头，路线库扫描目录时会跳过
+
+_COMPILED_HEADER = struct.Struct("<4sHxxI")  # magic, 版本, 点数
 
 
 def parse_gpx(gpx_file: str) -> List[Tuple[float, float]]:
@@ -103,7 +131,199 @@ def format_python_list(waypoints: List[Tuple[float, float]]) -> str:
     return "\n".join(lines)
 
 
-if __name__ == "__main__":
+def write_compiled(path: Path, lats: Sequence[float], lons: Sequence[float]) -> None:
+    """写出 .route 文件：文件头 + 纬度 int32 数组 + 经度 int32 数组（小端）"""
+    lat_ints = array("i", (round(v * COMPILED_SCALE) for v in lats))
+    lon_ints = array("i", (round(v * COMPILED_SCALE) for v in lons))
+    if sys.byteorder == "big":
+        lat_ints.byteswap()
+        lon_ints.byteswap()
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as f:
+        f.write(_COMPILED_HEADER.pack(COMPILED_MAGIC, COMPILED_VERSION, len(lat_ints)))
+        lat_ints.tofile(f)
+        lon_ints.tofile(f)
+    tmp_path.replace(path)
+
+
+def import_compiled(path: Path) -> RouteArrays:
+    """读取 .route 文件（route_importers 中注册的导入器）"""
+    raw = Path(path).read_bytes()
+    if len(raw) < _COMPILED_HEADER.size:
+        raise ValueError(f"{path} 不是有效的编译路线文件")
+    magic, version, count = _COMPILED_HEADER.unpack_from(raw, 0)
+    if magic != COMPILED_MAGIC or version != COMPILED_VERSION:
+        raise ValueError(f"{path} 不是有效的编译路线文件")
+    ints = array("i")
+    ints.frombytes(raw[_COMPILED_HEADER.size:_COMPILED_HEADER.size + 8 * count])
+    if len(ints) != 2 * count:
+        raise ValueError(f"{path} 数据不完整")
+    if sys.byteorder == "big":
+        ints.byteswap()
+    route = RouteArrays()
+    route.lats = array("d", (v / COMPILED_SCALE for v in ints[:count]))
+    route.lons = array("d", (v / COMPILED_SCALE for v in ints[count:]))
+    return route
+
+
+def _simplify_arrays(route: RouteArrays, step: int) -> Tuple[array, array]:
+    """与 simplify_path 相同的抽稀规则：每隔 step 个点取一个，并保留最后一个点"""
+    lats, lons = route.lats[::step], route.lons[::step]
+    if len(route) and (len(route) - 1) % step:
+        lats.append(route.lats[-1])
+        lons.append(route.lons[-1])
+    return lats, lons
+
+
+def compile_route(task: Tuple[str, str, int]) -> Dict[str, object]:
+    """
+    编译一条路线（在工作进程中运行）
+
+    Args:
+        task: (源文件, 输出文件, 抽稀间隔)
+
+    Returns:
+        清单条目；解析失败时包含 error 字段
+    """
+    from route_library import walk_length_m
+
+    src, out, step = task
+    entry: Dict[str, object] = {"source": src}
+    t0 = time.perf_counter()
+    try:
+        route = import_route(Path(src))  # 读入时已去除连续重复点
+        if len(route) < 2:
+            raise ValueError("路径点少于两个")
+        lats, lons = _simplify_arrays(route, step)
+        write_compiled(Path(out), lats, lons)
+    except (OSError, ValueError, SyntaxError, ET.ParseError) as exc:
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+        return entry
+    entry.update(
+        output=Path(out).name,
+        points=len(route),
+        compiled_points=len(lats),
+        length_m=round(walk_length_m(lats, lons), 1),
+        bbox=[min(lats), min(lons), max(lats), max(lons)],
+        parse_sec=round(time.perf_counter() - t0, 4),
+    )
+    return entry
+
+
+def collect_sources(inputs: Sequence[str]) -> List[Path]:
+    """展开目录和通配符，返回所有可导入的路线文件（不含已编译的 .route 和 . 开头的文件）"""
+    suffixes = tuple(s for s in supported_suffixes() if s != COMPILED_SUFFIX)
+    sources = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            sources.extend(p for p in sorted(path.iterdir())
+                           if p.is_file() and not p.name.startswith(".") and p.suffix.lower() in suffixes)
+        elif path.is_file():
+            sources.append(path)
+        else:
+            sources.extend(Path(p) for p in sorted(glob.glob(item, recursive=True))
+                           if Path(p).is_file() and Path(p).suffix.lower() in suffixes)
+    return list({src.resolve(): src for src in sources}.values())
+
+
+def output_names(sources: Sequence[Path]) -> List[str]:
+    """
+    按相对于所有源文件公共目录的路径生成输出文件名（a/run.gpx -> a__run.route）
+
+    Raises:
+        ValueError: 两个源文件映射到同一个输出文件名
+    """
+    resolved = [src.resolve() for src in sources]
+    root = Path(os.path.commonpath([str(src.parent) for src in resolved])) if resolved else Path()
+    bases = ["__".join(src.relative_to(root).with_suffix("").parts) for src in resolved]
+    names = []
+    for src, base in zip(resolved, bases):
+        # 同一目录下同名不同格式的源文件（run.gpx / run.kml）用后缀区分
+        if bases.count(base) > 1:
+            base = f"{base}_{src.suffix[1:].lower()}"
+        names.append(base + COMPILED_SUFFIX)
+
+    seen: Dict[str, Path] = {}
+    for src, name in zip(resolved, names):
+        if name.lower() in seen:
+            raise ValueError(f"{seen[name.lower()]} 和 {src} 的输出文件名冲突: {name}")
+        seen[name.lower()] = src
+    return names
+
+
+def compile_routes(sources: Sequence[Path], out_dir: Path, step: int = 1, jobs: Optional[int] = None) -> dict:
+    """
+    在进程池中并行编译多条路线，写出 .route 文件和 .manifest.json
+
+    Returns:
+        清单内容
+
+    Raises:
+        ValueError: 输出文件名冲突（在提交任何任务之前检查）
+    """
+    names = output_names(sources)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(str(src), str(out_dir / name), step) for src, name in zip(sources, names)]
+
+    jobs = jobs or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    if jobs == 1 or len(tasks) <= 1:
+        entries = [compile_route(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            entries = list(pool.map(compile_route, tasks, chunksize=chunksize))
+
+    manifest = {
+        "version": COMPILED_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "step": step,
+        "jobs": jobs,
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+        "routes": entries,
+    }
+    manifest_path = out_dir / MANIFEST_FILENAME
+    manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    return manifest
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="GPX 解析与路线批量编译")
+    sub = parser.add_subparsers(dest="command")
+    compile_parser = sub.add_parser("compile", help="并行编译路线文件为 .route")
+    compile_parser.add_argument("inputs", nargs="+", help="路线目录、文件或通配符")
+    compile_parser.add_argument("-o", "--output", type=Path, default=Path("compiled_routes"), help="输出目录")
+    compile_parser.add_argument("--step", type=int, default=1, help="抽稀间隔（每隔 N 个点取 1 个，默认不抽稀）")
+    compile_parser.add_argument("--jobs", type=int, help="工作进程数（默认 CPU 核数）")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        interactive()
+        return 0
+    if args.step < 1:
+        parser.error("--step 必须大于等于 1")
+
+    sources = collect_sources(args.inputs)
+    if not sources:
+        print("没有找到可编译的路线文件")
+        return 1
+    try:
+        manifest = compile_routes(sources, args.output, args.step, args.jobs)
+    except ValueError as exc:
+        print(f"× {exc}")
+        return 1
+
+    failed = [entry for entry in manifest["routes"] if "error" in entry]
+    for entry in failed:
+        print(f"× {entry['source']}: {entry['error']}")
+    print(f"✓ 编译 {len(sources) - len(failed)}/{len(sources)} 条路线到 {args.output} "
+          f"({manifest['elapsed_sec']:.2f}s, {manifest['jobs']} 个进程), 清单: {args.output / MANIFEST_FILENAME}")
+    return 1 if failed else 0
+
+
+def interactive() -> None:
+    """交互式处理 run.gpx，输出 walk_path.py"""
     gpx_file = "run.gpx"
     
     print(f"正在解析 GPX 文件: {gpx_file}")
@@ -156,3 +376,7 @@ if __name__ == "__main__":
     if len(waypoints) > 5:
         print(f"  ...")
         print(f"  总共 {len(waypoints)} 个点")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
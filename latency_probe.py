@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+端到端注入延迟探测 - 回读设备上报的位置，统计"发送 → 设备可见"的延迟
+
+MuMuManager ... tool location 返回只代表命令执行完毕，并不代表 Android 定位服务已经看到该位置。
+LatencyProbe 在行走的同时并行采样设备的最近位置（通过常驻的 adb shell 执行 dumpsys location，
+避免每次采样都启动新进程），把采样结果与已发送的位置逐一匹配，输出：
+1. 发送 → 可见的延迟分布
+2. 从未被观察到的位置数（采样间隔大于发送间隔时为上限估计）
+3. 乱序（先发送的位置晚于后发送的位置出现）的次数
+
+用法:
+    python latency_probe.py --fake                      # 对假设备自检：固定延迟回显位置
+    python latency_probe.py --fake --drop-every 5 --reorder-every 7   # 同时模拟丢失和乱序
+"""
+import argparse
+import math
+import re
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from geo import METERS_PER_DEG
+
+SAMPLE_INTERVAL_SEC = 0.2  # 设备位置采样间隔
+MATCH_TOLERANCE_M = 0.5  # 采样位置与发送位置的匹配容差（米）
+MATCH_WINDOW_SEC = 10.0  # 只在最近这段时间内发送的位置中查找匹配
+
+LOCATION_RE = re.compile(r"Location\[(?:gps|fused) (-?\d+\.\d+),(-?\d+\.\d+)")
+SHELL_MARKER = "__RUNINMUMU_END__"
+
+Sender = Callable[[Path, float, float, Tuple[float, float]], Optional[int]]
+LocationQuery = Callable[[], Optional[Tuple[float, float]]]
+
+
+def parse_dumpsys_location(output: str) -> Optional[Tuple[float, float]]:
+    """
+    从 dumpsys location 的输出中提取最近位置
+
+    优先取包含 "last" 的行（Last Known Locations / last location=），否则取第一处匹配。
+
+    Returns:
+        (纬度, 经度)，找不到时返回 None
+    """
+    fallback = None
+    for line in output.splitlines():
+        match = LOCATION_RE.search(line)
+        if not match:
+            continue
+        point = (float(match.group(1)), float(match.group(2)))
+        if "last" in line.lower():
+            return point
+        if fallback is None:
+            fallback = point
+    return fallback
+
+
+class AdbLocationQuery:
+    """
+    通过常驻 adb shell 查询设备最近位置
+
+    每次查询只向 shell 的 stdin 写入一条命令并读到结束标记为止，不重复启动 adb 进程。
+    """
+
+    def __init__(self, adb_path: Path) -> None:
+        self.adb_path = adb_path
+        self._proc: Optional[subprocess.Popen] = None
+
+    def _ensure_shell(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [str(self.adb_path), "shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+        return self._proc
+
+    def __call__(self) -> Optional[Tuple[float, float]]:
+        try:
+            proc = self._ensure_shell()
+            proc.stdin.write(f"dumpsys location | grep -i 'location\\[' | head -n 20; echo {SHELL_MARKER}\n")
+            proc.stdin.flush()
+            lines = []
+            while True:
+                line = proc.stdout.readline()
+                if not line:
+                    self.close()
+                    return None
+                if line.strip() == SHELL_MARKER:
+                    break
+                lines.append(line)
+        except (OSError, ValueError):
+            self.close()
+            return None
+        return parse_dumpsys_location("".join(lines))
+
+    def close(self) -> None:
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except OSError:
+                pass
+            self._proc = None
+
+
+class FakeLocationDevice:
+    """
+    假设备：记录发送的位置，按固定延迟回显，可按比例丢弃或延后
+
+    send 与 set_location 签名相同；query 返回当前"设备可见"的最近位置，即已到达的位置中最后到达的一个。
+    reorder_every 为 N 时，每 N 个位置额外延迟 reorder_delay_sec，晚于之后发送的位置到达（乱序）。
+    """
+
+    def __init__(self, delay_sec: float = 0.15, drop_every: int = 0,
+                 clock: Callable[[], float] = time.perf_counter,
+                 reorder_every: int = 0, reorder_delay_sec: float = 0.25) -> None:
+        self.delay_sec = delay_sec
+        self.drop_every = drop_every
+        self.reorder_every = reorder_every
+        self.reorder_delay_sec = reorder_delay_sec
+        self.clock = clock
+        self._queue: List[Tuple[float, float, float]] = []
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def send(self, mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> int:
+        with self._lock:
+            self._count += 1
+            if self.drop_every and self._count % self.drop_every == 0:
+                return 0
+            delay = self.delay_sec
+            if self.reorder_every and self._count % self.reorder_every == 0:
+                delay += self.reorder_delay_sec
+            self._queue.append((self.clock() + delay, lat + offset[0], lon + offset[1]))
+        return 0
+
+    def query(self) -> Optional[Tuple[float, float]]:
+        now = self.clock()
+        with self._lock:
+            visible = [item for item in self._queue if item[0] <= now]
+            if not visible:
+                return None
+            latest = max(visible)
+            self._queue = [latest] + [item for item in self._queue if item[0] > now]
+            _, lat, lon = latest
+        return lat, lon
+
+
+class LatencyProbe:
+    """
+    并行采样设备位置并与已发送的位置匹配
+
+    Args:
+        query: 查询设备最近位置的函数，返回 (纬度, 经度) 或 None
+        interval: 采样间隔（秒）
+        tolerance_m: 匹配容差（米），需大于位置抖动且小于相邻两帧的间距
+        clock: 计时函数
+    """
+
+    def __init__(
+        self,
+        query: LocationQuery,
+        interval: float = SAMPLE_INTERVAL_SEC,
+        tolerance_m: float = MATCH_TOLERANCE_M,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.query = query
+        self.interval = interval
+        self.tolerance_m = tolerance_m
+        self.clock = clock
+        self.sent: List[Tuple[float, float, float]] = []  # (发送时刻, 纬度, 经度)
+        self.seen_at: List[Optional[float]] = []  # 每个发送位置首次被观察到的时刻
+        self.samples = 0
+        self.reordered = 0
+        self._last_seen_idx = -1
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def wrap(self, send: Sender) -> Sender:
+        """包装定位发送函数，记录每个位置的发送时刻和预期坐标（含偏移）"""
+
+        def probed_send(mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> Optional[int]:
+            with self._lock:
+                self.sent.append((self.clock(), lat + offset[0], lon + offset[1]))
+                self.seen_at.append(None)
+            return send(mgr_path, lon, lat, offset)
+
+        return probed_send
+
+    def start(self) -> "LatencyProbe":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        close = getattr(self.query, "close", None)
+        if close:
+            close()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.is_set():
+            t_next = self.clock() + self.interval
+            self.sample()
+            self._stop.wait(max(0.0, t_next - self.clock()))
+
+    def sample(self) -> None:
+        """采样一次设备位置并匹配"""
+        point = self.query()
+        observed_at = self.clock()
+        if point is None:
+            return
+        with self._lock:
+            self.samples += 1
+            idx = self._match(point, observed_at)
+            if idx is None:
+                return
+            first = self.seen_at[idx] is None
+            if first:
+                self.seen_at[idx] = observed_at
+            if idx < self._last_seen_idx:
+                # 迟到的位置可能被连续采样到多次，只在首次观察到时计一次乱序
+                if first:
+                    self.reordered += 1
+            else:
+                self._last_seen_idx = idx
+
+    def _match(self, point: Tuple[float, float], observed_at: float) -> Optional[int]:
+        """在最近发送的位置中找与采样位置最近且在容差内的一个（调用方需持有锁）"""
+        lat, lon = point
+        k = math.cos(math.radians(lat))
+        best_idx, best_dist = None, self.tolerance_m
+        for idx in range(len(self.sent) - 1, -1, -1):
+            t_sent, s_lat, s_lon = self.sent[idx]
+            if t_sent > observed_at:
+                continue
+            if observed_at - t_sent > MATCH_WINDOW_SEC:
+                break
+            dist = math.hypot(s_lat - lat, (s_lon - lon) * k) * METERS_PER_DEG
+            if dist <= best_dist:
+                best_idx, best_dist = idx, dist
+        return best_idx
+
+    def report(self) -> dict:
+        """返回延迟分布、未观察到的位置数和乱序次数"""
+        with self._lock:
+            latencies = sorted(seen - sent[0] for sent, seen in zip(self.sent, self.seen_at) if seen is not None)
+            # 最后一个被观察到的位置之后发送的位置还可能在途，不计为丢失
+            last_seen = max((i for i, seen in enumerate(self.seen_at) if seen is not None), default=-1)
+            unobserved = sum(1 for seen in self.seen_at[: last_seen + 1] if seen is None)
+            result = {
+                "sent": len(self.sent),
+                "samples": self.samples,
+                "observed": len(latencies),
+                "unobserved": unobserved,
+                "reordered": self.reordered,
+            }
+        if latencies:
+            result["latency_p50_ms"] = _quantile(latencies, 0.50) * 1000
+            result["latency_p90_ms"] = _quantile(latencies, 0.90) * 1000
+            result["latency_p99_ms"] = _quantile(latencies, 0.99) * 1000
+            result["latency_max_ms"] = latencies[-1] * 1000
+        return result
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def format_report(report: dict) -> str:
+    """将 report() 的结果格式化为一行文字"""
+    text = (f"发送 {report['sent']} 个位置, 采样 {report['samples']} 次, 观察到 {report['observed']} 个, "
+            f"未观察到 {report['unobserved']} 个, 乱序 {report['reordered']} 次")
+    if "latency_p50_ms" in report:
+        text += (f"; 延迟 p50 {report['latency_p50_ms']:.0f}ms, p90 {report['latency_p90_ms']:.0f}ms, "
+                 f"p99 {report['latency_p99_ms']:.0f}ms, max {report['latency_max_ms']:.0f}ms")
+    return text
+
+
+def _run_fake(delay_sec: float, drop_every: int, duration_sec: float, tick_sec: float,
+              reorder_every: int = 0) -> dict:
+    """对假设备运行一段直线行走，返回探测报告"""
+    device = FakeLocationDevice(delay_sec, drop_every, reorder_every=reorder_every, reorder_delay_sec=2.5 * tick_sec)
+    probe = LatencyProbe(device.query, interval=tick_sec / 4).start()
+    send = probe.wrap(device.send)
+    lat, lon = 30.3083, 120.0783
+    t_end = time.perf_counter() + duration_sec
+    while time.perf_counter() < t_end:
+        send(Path("fake"), lon, lat, (0.0, 0.0))
+        lat += 2.8 * tick_sec / METERS_PER_DEG
+        time.sleep(tick_sec)
+    time.sleep(delay_sec + tick_sec)
+    probe.stop()
+    return probe.report()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="端到端注入延迟探测")
+    parser.add_argument("--fake", action="store_true", help="对假设备自检")
+    parser.add_argument("--delay", type=float, default=0.15, help="假设备回显延迟（秒）")
+    parser.add_argument("--drop-every", type=int, default=0, help="假设备每 N 个位置丢弃一个")
+    parser.add_argument("--reorder-every", type=int, default=0, help="假设备每 N 个位置延后到达一个（乱序）")
+    parser.add_argument("--duration", type=float, default=5.0, help="自检时长（秒）")
+    parser.add_argument("--tick", type=float, default=0.1, help="自检发送间隔（秒）")
+    args = parser.parse_args()
+
+    if not args.fake:
+        parser.error("独立运行时仅支持 --fake 自检；实际探测请在 config.json 中开启 latency_probe")
+    print(format_report(_run_fake(args.delay, args.drop_every, args.duration, args.tick, args.reorder_every)))
+
+
+if __name__ == "__main__":
+    main()
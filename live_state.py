@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+实时状态共享 - simulate_walk 每帧把当前状态写入一块固定布局的内存映射文件
+
+main.py 与 sensor_simulator.py 等工具是不同进程，通过这块映射区域共享行走状态：
+写入端每帧只做几次 struct.pack_into，读取端随时 mmap 读取，不需要任何进程间往返。
+
+并发控制使用 seqlock：写入前把序号加一（变为奇数），写完再加一（变为偶数）；
+读取端读到奇数序号、或前后两次序号不一致时重读，因此读写双方都无需加锁。
+
+布局（小端）:
+    0   4s  magic "RIMS"
+    4   H   版本
+    6   2x  保留
+    8   Q   序号
+    16  ... 状态（见 _PAYLOAD）
+
+用法:
+    python live_state.py            # 每秒打印一次当前状态
+    python live_state.py --once     # 只打印一次
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from sensor_simulator import cadence_for_speed
+
+DEFAULT_STATE_PATH = Path(tempfile.gettempdir()) / "runinmumu_live_state.bin"
+MAGIC = b"RIMS"
+VERSION = 1
+CADENCE_SMOOTHING = 0.1  # 步频估计的指数平滑系数
+READ_RETRIES = 100
+
+STATE_IDLE = 0
+STATE_RUNNING = 1
+STATE_FINISHED = 2
+STATE_ABORTED = 3  # 行走出错或被中断，用时和路程只是中途的值
+
+_HEADER = struct.Struct("<4sH2x")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = _HEADER.size
+# 会话 ID, pid, 状态, 帧数, 开始时间, 更新时间, 已用时间, 总路程, 即时速度, 平均速度, 步频
+_PAYLOAD = struct.Struct("<16sIIQddddddd")
+_PAYLOAD_OFFSET = _SEQ_OFFSET + _SEQ.size
+STATE_SIZE = _PAYLOAD_OFFSET + _PAYLOAD.size
+
+
+class LiveState(NamedTuple):
+    session_id: str
+    pid: int
+    state: int
+    ticks: int
+    started_at: float  # time.time()
+    updated_at: float  # time.time()
+    elapsed_sec: float
+    distance_m: float
+    speed_mps: float
+    avg_speed_mps: float
+    cadence_hz: float
+
+    @property
+    def running(self) -> bool:
+        return self.state == STATE_RUNNING
+
+    @property
+    def finished(self) -> bool:
+        return self.state == STATE_FINISHED
+
+    @property
+    def aborted(self) -> bool:
+        return self.state == STATE_ABORTED
+
+    def age(self) -> float:
+        """距最近一次更新的秒数"""
+        return time.time() - self.updated_at
+
+
+class LiveStatePublisher:
+    """
+    写入端：on_tick 可直接作为 simulate_walk 的 hook
+
+    同一时间只应有一个写入端；创建时重置映射区域并生成新的会话 ID。
+    """
+
+    def __init__(self, path: Path = DEFAULT_STATE_PATH) -> None:
+        self.path = Path(path)
+        self.session_id = uuid.uuid4()
+        self._pid = os.getpid()
+        # 不截断已有文件，避免正在映射它的读取端读到被截短的区域
+        self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        os.ftruncate(self._fd, STATE_SIZE)
+        self._mm = mmap.mmap(self._fd, STATE_SIZE)
+        self._seq = _SEQ.unpack_from(self._mm, _SEQ_OFFSET)[0] & ~1
+        _HEADER.pack_into(self._mm, 0, MAGIC, VERSION)
+        self._ticks = 0
+        self._started_at = time.time()
+        self._cadence = 0.0
+        self._last = (0.0, 0.0, 0.0)
+        self._write(STATE_IDLE, 0.0, 0.0, 0.0)
+
+    def _write(self, state: int, elapsed: float, distance: float, speed: float) -> None:
+        avg_speed = distance / elapsed if elapsed > 0 else 0.0
+        self._seq += 1
+        _SEQ.pack_into(self._mm, _SEQ_OFFSET, self._seq)
+        _PAYLOAD.pack_into(
+            self._mm, _PAYLOAD_OFFSET,
+            self.session_id.bytes, self._pid, state, self._ticks, self._started_at, time.time(),
+            elapsed, distance, speed, avg_speed, self._cadence,
+        )
+        self._seq += 1
+        _SEQ.pack_into(self._mm, _SEQ_OFFSET, self._seq)
+
+    def on_tick(self, elapsed_sec: float, total_dist_m: float, speed_mps: float) -> None:
+        if self._ticks == 0:
+            self._started_at = time.time() - elapsed_sec
+        self._ticks += 1
+        cadence = cadence_for_speed(speed_mps)
+        self._cadence = cadence if self._cadence == 0 else self._cadence + CADENCE_SMOOTHING * (cadence - self._cadence)
+        self._last = (elapsed_sec, total_dist_m, speed_mps)
+        self._write(STATE_RUNNING, elapsed_sec, total_dist_m, speed_mps)
+
+    def finish(self) -> None:
+        """标记本次行走结束，读取端仍可读到最终的用时和路程"""
+        self._write(STATE_FINISHED, *self._last)
+
+    def abort(self) -> None:
+        """标记本次行走未完成（出错或被中断），读取端不应把中途的用时和路程当作本次跑步的结果"""
+        self._write(STATE_ABORTED, *self._last)
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
+class LiveStateReader:
+    """读取端：每次 read 都是一次无锁快照，映射文件不存在时返回 None"""
+
+    def __init__(self, path: Path = DEFAULT_STATE_PATH) -> None:
+        self.path = Path(path)
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+
+    def _open(self) -> bool:
+        try:
+            f = self.path.open("rb")
+        except OSError:
+            return False
+        try:
+            mm = mmap.mmap(f.fileno(), STATE_SIZE, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            f.close()
+            return False
+        magic, version = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            f.close()
+            return False
+        self._file, self._mm = f, mm
+        return True
+
+    def read(self) -> Optional[LiveState]:
+        if self._mm is None and not self._open():
+            return None
+        mm = self._mm
+        for _ in range(READ_RETRIES):
+            seq = _SEQ.unpack_from(mm, _SEQ_OFFSET)[0]
+            if seq & 1:
+                continue
+            payload = _PAYLOAD.unpack_from(mm, _PAYLOAD_OFFSET)
+            if _SEQ.unpack_from(mm, _SEQ_OFFSET)[0] == seq:
+                session, *rest = payload
+                return LiveState(str(uuid.UUID(bytes=session)), *rest)
+        return None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+
+def read_live_state(path: Path = DEFAULT_STATE_PATH) -> Optional[LiveState]:
+    """读取一次当前状态"""
+    reader = LiveStateReader(path)
+    try:
+        return reader.read()
+    finally:
+        reader.close()
+
+
+STATE_NAMES = {STATE_IDLE: "等待开始", STATE_RUNNING: "行走中", STATE_FINISHED: "已结束", STATE_ABORTED: "已中断"}
+
+
+def format_state(state: LiveState) -> str:
+    return (
+        f"[{STATE_NAMES.get(state.state, state.state)}] 会话 {state.session_id[:8]} "
+        f"用时 {state.elapsed_sec:7.1f}s  路程 {state.distance_m:8.1f}m  "
+        f"速度 {state.speed_mps:5.2f}m/s  均速 {state.avg_speed_mps:5.2f}m/s  "
+        f"步频 {state.cadence_hz * 60:4.0f}步/分钟  ({state.age():.1f}s 前更新)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="查看 main.py 的实时行走状态")
+    parser.add_argument("--path", type=Path, default=DEFAULT_STATE_PATH, help="状态映射文件路径")
+    parser.add_argument("--interval", type=float, default=1.0, help="刷新间隔（秒）")
+    parser.add_argument("--once", action="store_true", help="只打印一次")
+    args = parser.parse_args()
+
+    reader = LiveStateReader(args.path)
+    try:
+        while True:
+            state = reader.read()
+            print(format_state(state) if state else f"未找到实时状态: {args.path}")
+            if args.once or (state and (state.finished or state.aborted)):
+                return 0 if state else 1
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
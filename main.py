@@ -1,25 +1,27 @@
 import json
-import math
 import os
 import random
-import subprocess
 import sys
-import time
+import threading
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
+from typing import TYPE_CHECKING, Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
-from prettytable import PrettyTable
+from clock import REAL_CLOCK, Clock
+from geo import geo_dist_m
 
-from gpx_parser import parse_gpx, remove_duplicates
+if TYPE_CHECKING:
+    from route_spline import RouteSpline
+    from speed_planner import SpeedProfile
 
 # --- 全局配置 ---
 CONFIG_PATH = Path("config.json")
 
-JITTER_RADIUS_M = 0.1  # 定位抖动半径（米），模拟定位失真
+JITTER_RADIUS_M = 0.1  # 定位误差标准差（米），模拟定位失真（见 gps_noise）
 BASE_SPEED_MPS = 2.8  # 平均速度（米/秒）- 约3km/18分钟 = 2.8m/s
 SPEED_JITTER_RATIO = 0.20  # 速度波动 ±20%，模拟步频变化
 TICK_INTERVAL_SEC = 0.40  # GPS位置更新间隔（秒）
 DIST_LIMIT_M = 4000  # 总距离阈值（米）- 约3.2公里
+SEND_TIMEOUT_SEC = 3.0  # 单次 MuMuManager 定位命令的超时（秒），超时计为发送失败
 
 # --- 终端颜色定义 ---
 CLR_A = "\x1b[01;38;5;117m"
@@ -40,7 +42,7 @@ def load_config() -> dict:
 
 
 def save_config(cfg: dict) -> None:
-    """写回配置文件"""
+    """写回配置文件 (只在主线程调用; 启动时的后台连接任务不修改配置)"""
     CONFIG_PATH.write_text(
         json.dumps(cfg, indent=4, ensure_ascii=False),
         encoding="utf-8",
@@ -67,32 +69,48 @@ def _pick_best_emu_dir(base_dir: Path) -> Path:
     return base_dir
 
 
-def find_emu_dir(cfg: dict) -> Path:
-    """从配置或磁盘搜索 MuMu 模拟器目录"""
+def configured_emu_dir(cfg: dict, log: Callable[[str], None] = print) -> Optional[Path]:
+    """返回配置中有效的 MuMu 模拟器目录, 未配置或无效时返回 None"""
     emu_dir_value = cfg.get("emu_dir")
     if emu_dir_value:
         emu_dir = resolve_path(emu_dir_value)
         if _manager_exists(emu_dir):
-            print(f"{CLR_C}✔ 从 config.json 成功加载模拟器路径: {emu_dir}{CLR_RST}")
+            log(f"{CLR_C}✔ 从 config.json 成功加载模拟器路径: {emu_dir}{CLR_RST}")
             return emu_dir
-        print(f"{CLR_P}在 config.json 中找到的路径无效，将尝试自动搜索...{CLR_RST}")
+        log(f"{CLR_P}在 config.json 中找到的路径无效，将尝试自动搜索...{CLR_RST}")
+    return None
+
 
-    print(f"{CLR_P}未找到有效配置, 开始搜索 MuMu 安装目录...{CLR_RST}")
+def search_emu_dir(log: Callable[[str], None] = print) -> Path:
+    """在各磁盘上搜索 MuMu 模拟器目录, 找不到时退出"""
+    log(f"{CLR_P}未找到有效配置, 开始搜索 MuMu 安装目录...{CLR_RST}")
     search_roots = [Path(f"{d}:/") for d in "CDEFGHIJKLMNOPQRSTUVWXYZ" if Path(f"{d}:/").exists()]
     for root in search_roots:
         try:
             for mgr_path in root.rglob("MuMuManager.exe"):
-                emu_dir = _pick_best_emu_dir(mgr_path.parent)
-                cfg["emu_dir"] = str(emu_dir)
-                save_config(cfg)
-                print(f"{CLR_C}✔ 找到并保存 MuMu 路径: {emu_dir}{CLR_RST}")
-                return emu_dir
+                return _pick_best_emu_dir(mgr_path.parent)
         except PermissionError:
             continue
 
     sys.exit(f"{CLR_A}× 未能找到 MuMu 模拟器, 请检查是否已安装或在 config.json 中手动指定路径。{CLR_RST}")
 
 
+def remember_emu_dir(cfg: dict, emu_dir: Path) -> None:
+    """把搜索到的模拟器目录写回配置"""
+    cfg["emu_dir"] = str(emu_dir)
+    save_config(cfg)
+    print(f"{CLR_C}✔ 找到并保存 MuMu 路径: {emu_dir}{CLR_RST}")
+
+
+def find_emu_dir(cfg: dict) -> Path:
+    """从配置或磁盘搜索 MuMu 模拟器目录, 搜索到的目录写回配置"""
+    emu_dir = configured_emu_dir(cfg)
+    if emu_dir is None:
+        emu_dir = search_emu_dir()
+        remember_emu_dir(cfg, emu_dir)
+    return emu_dir
+
+
 def _coerce_lat_lon(pair: Sequence[float]) -> Tuple[float, float]:
     if not isinstance(pair, Sequence) or len(pair) != 2:
         raise ValueError("坐标点必须是包含两个元素的序列")
@@ -113,6 +131,27 @@ def _coerce_offset(cfg: dict) -> Tuple[float, float]:
     return lat, lon
 
 
+def load_from_library(library_cfg: dict) -> List[Tuple[float, float]]:
+    """从路线库中按位置和目标距离选路"""
+    from route_library import RouteLibrary
+
+    library_dir = resolve_path(library_cfg.get("dir", "routes"))
+    if not library_dir.is_dir():
+        sys.exit(f"{CLR_A}× route_library 目录不存在: {library_dir}{CLR_RST}")
+
+    library = RouteLibrary(library_dir).refresh()
+    near = library_cfg.get("near")
+    near_pt = _coerce_lat_lon(near) if near else None
+    target_m = float(library_cfg.get("target_distance_m", DIST_LIMIT_M))
+    entry = library.best_for_distance(target_m, near_pt, float(library_cfg.get("radius_m", 1000.0)))
+    if entry is None:
+        sys.exit(f"{CLR_A}× 路线库 {library_dir} 中没有符合条件的路线{CLR_RST}")
+
+    route = library.load(entry)
+    print(f"{CLR_C}✔ 从路线库选中 {entry.name}: {len(route)} 个点, 一圈 {entry.length_m:.0f} 米{CLR_RST}")
+    return route
+
+
 def load_walk_path(cfg: dict) -> Tuple[List[Tuple[float, float]], Tuple[float, float]]:
     """从配置文件或外部文件加载行走路径及偏移量"""
     offset = _coerce_offset(cfg)
@@ -123,27 +162,25 @@ def load_walk_path(cfg: dict) -> Tuple[List[Tuple[float, float]], Tuple[float, f
             print(f"{CLR_C}✔ 从 config.json 加载路径: {len(route)} 个点{CLR_RST}")
             return route, offset
 
+    if cfg.get("route_library"):
+        return load_from_library(cfg["route_library"]), offset
+
     walk_path_file = cfg.get("walk_path_file")
     if walk_path_file:
         path = resolve_path(walk_path_file)
         if not path.exists():
             sys.exit(f"{CLR_A}× walk_path_file 指定的文件不存在: {path}{CLR_RST}")
 
-        suffix = path.suffix.lower()
-        if suffix == ".gpx":
-            raw_points = remove_duplicates(parse_gpx(str(path)))
-            route = [(float(lat), float(lon)) for lon, lat in raw_points]
-        elif suffix == ".json":
-            data = json.loads(path.read_text(encoding="utf-8"))
-            route = [_coerce_lat_lon(item) for item in data]
-        elif suffix == ".py":
-            namespace: dict = {}
-            exec(path.read_text(encoding="utf-8"), namespace)
-            if "WALK_PATH" not in namespace:
-                sys.exit(f"{CLR_A}× {path} 中未找到 WALK_PATH 变量{CLR_RST}")
-            route = [_coerce_lat_lon(item) for item in namespace["WALK_PATH"]]
-        else:
+        import xml.etree.ElementTree as ET
+
+        from route_importers import UnsupportedRouteFormat, load_route
+
+        try:
+            route = load_route(path)
+        except UnsupportedRouteFormat:
             sys.exit(f"{CLR_A}× 不支持的路径文件类型: {path}{CLR_RST}")
+        except (ValueError, SyntaxError, ET.ParseError) as exc:
+            sys.exit(f"{CLR_A}× 解析路径文件 {path} 失败: {exc}{CLR_RST}")
 
         if not route:
             sys.exit(f"{CLR_A}× 路径文件 {path} 未提供任何坐标点{CLR_RST}")
@@ -159,141 +196,464 @@ def load_walk_path(cfg: dict) -> Tuple[List[Tuple[float, float]], Tuple[float, f
 
     sys.exit(f"{CLR_A}× 未配置 walker 路径，请在 config.json 中提供 walk_path 或 walk_path_file。{CLR_RST}")
 
-def connect_to_emulator(emu_dir: Path) -> Path:
-
-    """连接到正在运行的 MuMu 模拟器，并返回 MuMuManager 路径"""
+def manager_paths(emu_dir: Path) -> Tuple[Path, Path]:
+    """返回 (MuMuManager 路径, adb 路径)，找不到时退出"""
     if emu_dir.joinpath("MuMuManager.exe").is_file():
-        mgr_path = emu_dir / "MuMuManager.exe"
-        adb_path = emu_dir / "adb.exe"
-    elif emu_dir.joinpath("../MuMuManager.exe").is_file():
-        mgr_path = emu_dir.parent / "MuMuManager.exe"
-        adb_path = emu_dir / "adb.exe"
-    else:
-        sys.exit(f"{CLR_A}× 在 {emu_dir} 中找不到 MuMuManager.exe。{CLR_RST}")
-
-    print(f"{CLR_P}正在尝试连接到模拟器...{CLR_RST}")
-    try:
-        adb_info_raw = subprocess.check_output([str(mgr_path), "info", "-v", "0"], encoding="utf-8")
-        adb_info = json.loads(adb_info_raw)
+        return emu_dir / "MuMuManager.exe", emu_dir / "adb.exe"
+    if emu_dir.joinpath("../MuMuManager.exe").is_file():
+        return emu_dir.parent / "MuMuManager.exe", emu_dir / "adb.exe"
+    sys.exit(f"{CLR_A}× 在 {emu_dir} 中找不到 MuMuManager.exe。{CLR_RST}")
 
-        if "adb_port" not in adb_info or "adb_host_ip" not in adb_info:
-            sys.exit(f"{CLR_A}× 获取 ADB 端口失败, 请确保模拟器正在运行。{CLR_RST}")
 
-        adb_addr = f"{adb_info['adb_host_ip']}:{adb_info['adb_port']}"
-        subprocess.run([str(adb_path), "connect", adb_addr], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        print(f"{CLR_C}✔ 成功连接到 ADB: {adb_addr}{CLR_RST}")
-        return mgr_path
-    except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError) as exc:
-        sys.exit(f"{CLR_A}× 连接模拟器失败, 请确保模拟器已完全启动。错误: {exc}{CLR_RST}")
+def adb_connect(mgr_path: Path, adb_path: Path, timeout: float = 10.0) -> str:
+    """通过 MuMuManager info 查询 ADB 端口并执行 adb connect，失败时抛出异常，返回 ADB 地址"""
+    import subprocess
 
+    adb_info_raw = subprocess.check_output([str(mgr_path), "info", "-v", "0"], encoding="utf-8", timeout=timeout)
+    adb_info = json.loads(adb_info_raw)
 
-def meter_to_deg(lat: float, dx: float, dy: float) -> Tuple[float, float]:
-    """将米转换为经纬度偏移"""
-    d_lat = dy / 111_320
-    d_lon = dx / (111_320 * math.cos(math.radians(lat)))
-    return d_lat, d_lon
+    if "adb_port" not in adb_info or "adb_host_ip" not in adb_info:
+        raise ValueError("获取 ADB 端口失败, 请确保模拟器正在运行。")
 
+    adb_addr = f"{adb_info['adb_host_ip']}:{adb_info['adb_port']}"
+    subprocess.run(
+        [str(adb_path), "connect", adb_addr],
+        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout,
+    )
+    return adb_addr
 
-def set_location(mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> None:
-    """使用 MuMuManager 设置模拟器位置 (包含偏移)"""
-    dx, dy = (random.uniform(-JITTER_RADIUS_M, JITTER_RADIUS_M) for _ in range(2))
-    d_lat, d_lon = meter_to_deg(lat, dx, dy)
 
-    final_lon = lon + offset[1] + d_lon
-    final_lat = lat + offset[0] + d_lat
+def probe_emulator(mgr_path: Path, timeout: float = 5.0) -> bool:
+    """探测模拟器是否在线 (MuMuManager info 能返回 ADB 端口)"""
+    import subprocess
 
-    subprocess.run(
-        [
-            str(mgr_path),
-            "control",
-            "-v",
-            "0",
-            "tool",
-            "location",
-            "-lon",
-            f"{final_lon:.6f}",
-            "-lat",
-            f"{final_lat:.6f}",
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+    try:
+        adb_info = json.loads(subprocess.check_output([str(mgr_path), "info", "-v", "0"], encoding="utf-8", timeout=timeout))
+    except (OSError, subprocess.SubprocessError, json.JSONDecodeError):
+        return False
+    return isinstance(adb_info, dict) and "adb_port" in adb_info
 
-def geo_dist_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
 
-    """计算两点间的地理距离（米）"""
-    return math.hypot(lat2 - lat1, lon2 - lon1) * 111_320
+def connect_to_emulator(emu_dir: Path, log: Callable[[str], None] = print) -> Path:
+    """连接到正在运行的 MuMu 模拟器，并返回 MuMuManager 路径"""
+    import subprocess
+
+    mgr_path, adb_path = manager_paths(emu_dir)
+
+    log(f"{CLR_P}正在尝试连接到模拟器...{CLR_RST}")
+    try:
+        adb_addr = adb_connect(mgr_path, adb_path)
+        log(f"{CLR_C}✔ 成功连接到 ADB: {adb_addr}{CLR_RST}")
+        return mgr_path
+    except ValueError as exc:
+        sys.exit(f"{CLR_A}× {exc}{CLR_RST}")
+    except (subprocess.SubprocessError, FileNotFoundError, json.JSONDecodeError) as exc:
+        sys.exit(f"{CLR_A}× 连接模拟器失败, 请确保模拟器已完全启动。错误: {exc}{CLR_RST}")
 
 
-def simulate_walk(mgr_path: Path, route: List[Tuple[float, float]], offset: Tuple[float, float]) -> None:
-    """模拟沿着路线行走"""
+def set_location(mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> int:
+    """
+    使用 MuMuManager 设置模拟器位置 (包含偏移)，返回命令返回码; 定位噪声由 gps_noise.NoisySender 叠加
+
+    MuMuManager 卡住时在 SEND_TIMEOUT_SEC 后放弃并返回 -1, 行走不会无限阻塞, 健康监测也能计为失败。
+    """
+    import subprocess
+
+    final_lon = lon + offset[1]
+    final_lat = lat + offset[0]
+
+    try:
+        return subprocess.run(
+            [
+                str(mgr_path),
+                "control",
+                "-v",
+                "0",
+                "tool",
+                "location",
+                "-lon",
+                f"{final_lon:.6f}",
+                "-lat",
+                f"{final_lat:.6f}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=SEND_TIMEOUT_SEC,
+        ).returncode
+    except subprocess.TimeoutExpired:
+        return -1
+
+LocationSender = Callable[[Path, float, float, Tuple[float, float]], Optional[int]]
+TickHook = Callable[[float, float, float], None]  # (已用时间, 总路程, 即时速度)
+
+
+class WalkResult(NamedTuple):
+    elapsed_sec: float
+    distance_m: float
+    ticks: int
+
+
+def simulate_walk(
+    mgr_path: Path,
+    route: List[Tuple[float, float]],
+    offset: Tuple[float, float],
+    send: LocationSender = set_location,
+    hooks: Sequence[TickHook] = (),
+    clock: Clock = REAL_CLOCK,
+    display: bool = True,
+    base_speed: Optional[float] = None,
+    speed_jitter: Optional[float] = None,
+    tick_interval: Optional[float] = None,
+    dist_limit: Optional[float] = None,
+    speed_profile: Optional["SpeedProfile"] = None,
+    spline: Optional["RouteSpline"] = None,
+) -> WalkResult:
+    """
+    模拟沿着路线行走
+
+    send 可替换为假后端, clock 可替换为虚拟时钟 (配合 display=False 可在毫秒级跑完整次模拟);
+    hooks 每帧回调; base_speed / speed_jitter / tick_interval / dist_limit 默认取模块常量, 供参数扫描覆盖。
+    speed_profile 为预先生成的速度曲线 (见 speed_planner), 给出时每帧按已走路程查表, 否则每帧独立随机。
+    spline 为路线的平滑样条 (见 route_spline), 给出时按弧长在曲线上取点, 否则在路线点之间线性插值。
+    """
     if len(route) < 2:
         raise ValueError("路径点至少需要两个")
 
+    base_speed = BASE_SPEED_MPS if base_speed is None else base_speed
+    speed_jitter = SPEED_JITTER_RATIO if speed_jitter is None else speed_jitter
+    tick_interval = TICK_INTERVAL_SEC if tick_interval is None else tick_interval
+    dist_limit = DIST_LIMIT_M if dist_limit is None else dist_limit
+
     idx, seg_dist, total_dist = 0, 0.0, 0.0
-    t_start = t_prev = time.perf_counter()
-    next_tick = t_prev + TICK_INTERVAL_SEC
+    t_start = t_prev = clock.now()
+    next_tick = t_prev + tick_interval
     frame = 0
+    elapsed = 0.0
+
+    if display:
+        from prettytable import PrettyTable
 
     lat, lon = route[0]
-    set_location(mgr_path, lon, lat, offset)
-    print(f"{CLR_C}已设置初始位置, 开始模拟行走...{CLR_RST}")
+    send(mgr_path, lon, lat, offset)
+    if display:
+        print(f"{CLR_C}已设置初始位置, 开始模拟行走...{CLR_RST}")
 
     while True:
-        now = time.perf_counter()
+        now = clock.now()
         if now < next_tick:
-            time.sleep(next_tick - now)
+            clock.sleep(next_tick - now)
             now = next_tick
-        next_tick += TICK_INTERVAL_SEC
+        next_tick += tick_interval
         dt = now - t_prev
         t_prev = now
 
-        lat1, lon1 = route[idx]
-        lat2, lon2 = route[(idx + 1) % len(route)]
-        seg_len = geo_dist_m(lat1, lon1, lat2, lon2)
-
-        speed = BASE_SPEED_MPS * random.uniform(1 - SPEED_JITTER_RATIO, 1 + SPEED_JITTER_RATIO)
+        if speed_profile is not None:
+            speed = speed_profile.speed_at(total_dist)
+        else:
+            speed = base_speed * random.uniform(1 - speed_jitter, 1 + speed_jitter)
         move = speed * dt
-        seg_dist += move
         total_dist += move
 
-        while seg_len > 0 and seg_dist >= seg_len:
-            seg_dist -= seg_len
-            idx = (idx + 1) % len(route)
+        if spline is not None:
+            lat, lon = spline.position_at(total_dist)
+        else:
+            seg_dist += move
             lat1, lon1 = route[idx]
             lat2, lon2 = route[(idx + 1) % len(route)]
             seg_len = geo_dist_m(lat1, lon1, lat2, lon2)
-
-        ratio = seg_dist / seg_len if seg_len > 0 else 0
-        lat = lat1 + (lat2 - lat1) * ratio
-        lon = lon1 + (lon2 - lon1) * ratio
-        set_location(mgr_path, lon, lat, offset)
+            # 零长度段 (如首尾重合的闭合路线) 直接跳过; 最多跳过一圈, 防止所有点重合时死循环
+            skipped = 0
+            while seg_dist >= seg_len and skipped < len(route):
+                seg_dist -= seg_len
+                idx = (idx + 1) % len(route)
+                lat1, lon1 = route[idx]
+                lat2, lon2 = route[(idx + 1) % len(route)]
+                seg_len = geo_dist_m(lat1, lon1, lat2, lon2)
+                skipped += 1
+
+            ratio = seg_dist / seg_len if seg_len > 0 else 0
+            lat = lat1 + (lat2 - lat1) * ratio
+            lon = lon1 + (lon2 - lon1) * ratio
+        send(mgr_path, lon, lat, offset)
 
         frame += 1
         elapsed = now - t_start
-
-        tbl = PrettyTable(["时间", "即时速度", "总路程", "均速", "步频"])
-        tbl.add_row([
-            f"{CLR_P}{elapsed:7.2f}{CLR_RST}s",
-            f"{CLR_P}{speed:7.2f}{CLR_RST}m/s",
-            f"{CLR_P}{total_dist:8.2f}{CLR_RST}m",
-            f"{CLR_P}{total_dist/elapsed:7.2f}{CLR_RST}m/s" if elapsed > 0 else "0.00",
-            f"{CLR_P}{frame/elapsed:7.2f}{CLR_RST}Hz" if elapsed > 0 else "0.00",
-        ])
-        os.system("cls" if os.name == "nt" else "clear")
-        print(f"{HEART}               跑步模拟进行中...               {CLR_RST}")
-        print(tbl)
-
-        if total_dist >= DIST_LIMIT_M:
-            print(f"\n{CLR_A}✔ 已达到目标距离 {DIST_LIMIT_M}米, 模拟结束！{CLR_RST}")
+        for hook in hooks:
+            hook(elapsed, total_dist, speed)
+
+        if display:
+            tbl = PrettyTable(["时间", "即时速度", "总路程", "均速", "步频"])
+            tbl.add_row([
+                f"{CLR_P}{elapsed:7.2f}{CLR_RST}s",
+                f"{CLR_P}{speed:7.2f}{CLR_RST}m/s",
+                f"{CLR_P}{total_dist:8.2f}{CLR_RST}m",
+                f"{CLR_P}{total_dist/elapsed:7.2f}{CLR_RST}m/s" if elapsed > 0 else "0.00",
+                f"{CLR_P}{frame/elapsed:7.2f}{CLR_RST}Hz" if elapsed > 0 else "0.00",
+            ])
+            os.system("cls" if os.name == "nt" else "clear")
+            print(f"{HEART}               跑步模拟进行中...               {CLR_RST}")
+            print(tbl)
+
+        if total_dist >= dist_limit:
+            if display:
+                print(f"\n{CLR_A}✔ 已达到目标距离 {dist_limit}米, 模拟结束！{CLR_RST}")
             break
 
+    return WalkResult(elapsed, total_dist, frame)
+
+
+def start_gps_noise(
+    cfg: dict,
+    route: List[Tuple[float, float]],
+    dist_limit: float,
+    speed_profile: Optional["SpeedProfile"] = None,
+    spline: Optional["RouteSpline"] = None,
+    min_dist: float = 0.0,
+):
+    """
+    按 gps_noise 配置创建定位噪声 (默认开启), 返回 (NoisySender 或 None, 目标距离)
+
+    预计增加的路程由同样参数、同一随机种子的噪声在虚拟时钟上空跑一遍实际路线 (含速度曲线和平滑样条) 得到;
+    compensate 开启时按 "应用记录的路程 / 行走路程" 的比例缩短目标距离, 使应用记录的路程接近原目标,
+    但不少于 min_dist (如最后一个检查点)。
+    """
+    noise_cfg = cfg.get("gps_noise") or {}
+    if not noise_cfg.get("enabled", True):
+        return None, dist_limit
+
+    from gps_noise import DEFAULT_TAU_SEC, GaussMarkovNoise, NoisySender, estimate_added_m
+
+    sigma = float(noise_cfg.get("sigma_m", JITTER_RADIUS_M))
+    tau = float(noise_cfg.get("tau_sec", DEFAULT_TAU_SEC))
+    # 未配置种子时也先抽取一个, 预估与实际行走使用同一条噪声序列
+    seed = noise_cfg.get("seed")
+    if seed is None:
+        seed = random.randrange(2**32)
+    try:
+        noise = GaussMarkovNoise(sigma, tau, TICK_INTERVAL_SEC, seed=seed)
+    except ValueError as exc:
+        sys.exit(f"{CLR_A}× gps_noise 配置错误: {exc}{CLR_RST}")
+
+    from clock import VirtualClock
+
+    def dry_run(send: LocationSender, hook: TickHook) -> WalkResult:
+        return simulate_walk(Path(), route, (0.0, 0.0), send=send, hooks=[hook], clock=VirtualClock(),
+                             display=False, dist_limit=dist_limit, speed_profile=speed_profile, spline=spline)
+
+    added = estimate_added_m(dry_run, sigma, tau, TICK_INTERVAL_SEC, seed=seed)
+    print(f"{CLR_C}✔ 定位噪声: σ={sigma:.1f} 米, 相关时间 {tau:.0f}s, "
+          f"应用记录的路程预计比行走多 {added:+.1f} 米{CLR_RST}")
+    if noise_cfg.get("compensate"):
+        dist_limit = max(dist_limit * dist_limit / (dist_limit + added), min_dist)
+        print(f"{CLR_P}已补偿目标距离: 实际行走 {dist_limit:.1f} 米{CLR_RST}")
+    return NoisySender(noise), dist_limit
+
+
+def plan_checkpoints(cfg: dict, route: List[Tuple[float, float]], offset: Tuple[float, float],
+                     spline: Optional["RouteSpline"] = None):
+    """按 checkpoints 配置计算各检查点在沿路线 (开启 spline 时沿平滑曲线) 第几米被经过, 路线不经过时退出"""
+    if not cfg.get("checkpoints"):
+        return None
+
+    from checkpoints import CheckpointPlan, parse_checkpoints
+
+    try:
+        plan = CheckpointPlan(route, parse_checkpoints(cfg["checkpoints"]), offset, spline)
+    except ValueError as exc:
+        sys.exit(f"{CLR_A}× checkpoints 配置错误: {exc}{CLR_RST}")
+
+    if plan.unreachable:
+        print_checkpoint_plan(plan, DIST_LIMIT_M)
+        names = ", ".join(cp.name for cp in plan.unreachable)
+        sys.exit(f"{CLR_A}× 路线不经过以下检查点: {names}{CLR_RST}")
+    if plan.required_m > DIST_LIMIT_M:
+        print(f"{CLR_P}目标距离将延长到 {plan.required_m:.1f} 米以经过所有检查点{CLR_RST}")
+    return plan
+
+
+def print_checkpoint_plan(plan, dist_limit: float) -> None:
+    """按实际使用的目标距离输出检查点计划"""
+    print(f"{CLR_C}✔ 检查点计划 (路线一圈 {plan.lap_m:.1f} 米):{CLR_RST}")
+    for line in plan.report(dist_limit):
+        print(line)
+
+
+def plan_speed(cfg: dict, route: List[Tuple[float, float]], dist_limit: float = DIST_LIMIT_M,
+               spline: Optional["RouteSpline"] = None) -> Optional["SpeedProfile"]:
+    """按 speed_plan 配置为路线生成速度曲线 (默认开启; 开启 spline 时按样条弧长规划弯道)"""
+    plan_cfg = cfg.get("speed_plan") or {}
+    if not plan_cfg.get("enabled", True):
+        return None
+
+    from speed_planner import build_speed_profile
+
+    profile = build_speed_profile(route, BASE_SPEED_MPS, dist_limit, SPEED_JITTER_RATIO, seed=plan_cfg.get("seed"),
+                                  spline=spline)
+    print(f"{CLR_C}✔ 已生成速度曲线: {len(profile)} 个采样点, "
+          f"{min(profile.speeds):.2f}~{max(profile.speeds):.2f} m/s{CLR_RST}")
+    return profile
+
+
+def build_spline(cfg: dict, route: List[Tuple[float, float]]) -> Optional["RouteSpline"]:
+    """按 spline 配置为路线构建平滑样条 (默认关闭)"""
+    spline_cfg = cfg.get("spline") or {}
+    if not spline_cfg.get("enabled"):
+        return None
+
+    from route_spline import LUT_POINTS_PER_M, RouteSpline
+
+    spline = RouteSpline(route, float(spline_cfg.get("points_per_m", LUT_POINTS_PER_M)))
+    print(f"{CLR_C}✔ 已构建平滑路线: 一圈 {spline.length:.1f} 米, 查找表 {len(spline.lut_s)} 点{CLR_RST}")
+    return spline
+
+
+def start_sensor_stream(cfg: dict):
+    """按 sensor_stream 配置启动增量传感器推送 (需在应用进入跑步界面后调用)"""
+    stream_cfg = cfg.get("sensor_stream") or {}
+    if not stream_cfg.get("enabled"):
+        return None
+
+    from sensor_simulator import DEFAULT_CHUNK_SEC, SensorStreamer, find_adb_path, get_recent_sensor_files
+
+    adb_path = find_adb_path(cfg)
+    recent_files = get_recent_sensor_files(adb_path)
+    if not recent_files:
+        print(f"{CLR_A}× 未找到应用生成的 sensor 文件, 跳过增量推送{CLR_RST}")
+        return None
+
+    target_filename = recent_files[0][0]
+    chunk_sec = float(stream_cfg.get("chunk_sec", DEFAULT_CHUNK_SEC))
+    streamer = SensorStreamer(adb_path, target_filename, BASE_SPEED_MPS, chunk_sec)
+    streamer.start()
+    print(f"{CLR_C}✔ 传感器数据将增量推送到: {target_filename} (每 {chunk_sec:.0f} 秒一块){CLR_RST}")
+    return streamer
+
+
+def start_live_state(cfg: dict):
+    """按 live_state 配置创建实时状态共享 (默认开启), 供 sensor_simulator 等工具读取"""
+    live_cfg = cfg.get("live_state") or {}
+    if not live_cfg.get("enabled", True):
+        return None
+
+    from live_state import DEFAULT_STATE_PATH, LiveStatePublisher
+
+    path = resolve_path(live_cfg["path"]) if live_cfg.get("path") else DEFAULT_STATE_PATH
+    try:
+        return LiveStatePublisher(path)
+    except OSError as exc:
+        print(f"{CLR_A}× 无法创建实时状态文件 {path}: {exc}{CLR_RST}")
+        return None
+
+
+def start_connection_monitor(cfg: dict, emu_dir: Path):
+    """按 watchdog 配置启动连接健康监测 (默认开启)"""
+    watchdog_cfg = cfg.get("watchdog") or {}
+    if not watchdog_cfg.get("enabled", True):
+        return None
+
+    from connection_monitor import FAIL_THRESHOLD, PROBE_INTERVAL_SEC, ConnectionMonitor
+
+    mgr_path, adb_path = manager_paths(emu_dir)
+    return ConnectionMonitor(
+        send=set_location,
+        probe=lambda: probe_emulator(mgr_path),
+        reconnect=lambda: adb_connect(mgr_path, adb_path),
+        probe_interval=float(watchdog_cfg.get("probe_interval_sec", PROBE_INTERVAL_SEC)),
+        fail_threshold=int(watchdog_cfg.get("fail_threshold", FAIL_THRESHOLD)),
+    ).start()
+
+
+def start_latency_probe(cfg: dict, emu_dir: Path):
+    """按 latency_probe 配置启动端到端延迟探测 (默认关闭)"""
+    probe_cfg = cfg.get("latency_probe") or {}
+    if not probe_cfg.get("enabled"):
+        return None
+
+    from latency_probe import SAMPLE_INTERVAL_SEC, AdbLocationQuery, LatencyProbe
+
+    _, adb_path = manager_paths(emu_dir)
+    return LatencyProbe(
+        AdbLocationQuery(adb_path),
+        interval=float(probe_cfg.get("interval_sec", SAMPLE_INTERVAL_SEC)),
+    ).start()
+
+
+def print_monitor_metrics(metrics: dict) -> None:
+    """输出连接健康统计"""
+    print(f"{CLR_C}连接统计:{CLR_RST} 注入 {metrics['sent']} 次, 失败 {metrics['failed']} 次, "
+          f"丢失 {metrics['lost_ticks']} 帧, 断线 {metrics['disconnects']} 次, "
+          f"重连 {metrics['reconnects']} 次 (共 {metrics['reconnect_time_sec']:.1f}s)")
+    if "latency_p50_ms" in metrics:
+        print(f"{CLR_C}注入耗时:{CLR_RST} p50 {metrics['latency_p50_ms']:.0f}ms, "
+              f"p95 {metrics['latency_p95_ms']:.0f}ms, max {metrics['latency_max_ms']:.0f}ms")
+
+
+class _Background:
+    """在后台线程中执行 fn; result() 等待完成, 并在调用线程中重新抛出其异常 (包括 sys.exit)"""
+
+    def __init__(self, fn: Callable[[], object]) -> None:
+        self._fn = fn
+        self._value: object = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._value = self._fn()
+        except BaseException as exc:
+            self._error = exc
+
+    def result(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class Connection(NamedTuple):
+    emu_dir: Path
+    mgr_path: Path
+    searched: bool  # emu_dir 是搜索得到的, 需要写回配置
+
+
+def discover_and_connect(cfg: dict, log: Callable[[str], None] = print) -> Connection:
+    """
+    查找模拟器目录并连接 (在后台线程中运行)
+
+    只读取 cfg, 不修改也不保存; 搜索到的目录由调用方在主线程写回配置。
+    """
+    emu_dir = configured_emu_dir(cfg, log)
+    searched = emu_dir is None
+    if searched:
+        emu_dir = search_emu_dir(log)
+    return Connection(emu_dir, connect_to_emulator(emu_dir, log), searched)
+
 
 def main() -> None:
     cfg = load_config()
-    emu_dir = find_emu_dir(cfg)
-    mgr_path = connect_to_emulator(emu_dir)
+    # 模拟器搜索/连接主要在等待外部进程, 与路线加载和速度规划并行进行;
+    # 后台任务只读取配置的副本, 输出先缓存, 结果回到主线程后再输出并写回配置
+    cfg_snapshot = dict(cfg)
+    connect_log: List[str] = []
+    connecting = _Background(lambda: discover_and_connect(cfg_snapshot, connect_log.append))
     route, offset = load_walk_path(cfg)
+    spline = build_spline(cfg, route)
+    checkpoint_plan = plan_checkpoints(cfg, route, offset, spline)
+    dist_limit = checkpoint_plan.goal_m(DIST_LIMIT_M) if checkpoint_plan else DIST_LIMIT_M
+    profile = plan_speed(cfg, route, dist_limit, spline)
+    noisy, dist_limit = start_gps_noise(cfg, route, dist_limit, profile, spline,
+                                        min_dist=checkpoint_plan.required_m if checkpoint_plan else 0.0)
+    if checkpoint_plan:
+        print_checkpoint_plan(checkpoint_plan, dist_limit)
+    try:
+        connection = connecting.result()
+    finally:
+        for line in connect_log:
+            print(line)
+    emu_dir, mgr_path = connection.emu_dir, connection.mgr_path
+    if connection.searched:
+        remember_emu_dir(cfg, emu_dir)
 
     print("\n" + "=" * 40)
     print(f"{CLR_C}准备就绪！请在模拟器中手动进入跑步界面。{CLR_RST}")
@@ -301,7 +661,56 @@ def main() -> None:
         print(f"{CLR_P}已应用位置偏移: Δlat={offset[0]:.6f}, Δlon={offset[1]:.6f}{CLR_RST}")
     input(f"{CLR_P}准备好后, 按【Enter】键开始模拟走路...{CLR_RST}")
 
-    simulate_walk(mgr_path, route, offset)
+    streamer = start_sensor_stream(cfg)
+    hooks = [streamer.on_tick] if streamer else []
+    live = start_live_state(cfg)
+    if live:
+        hooks.append(live.on_tick)
+    tracker = None
+    if checkpoint_plan:
+        from checkpoints import CheckpointTracker
+        tracker = CheckpointTracker(checkpoint_plan)
+        hooks.append(tracker.on_tick)
+    monitor = start_connection_monitor(cfg, emu_dir)
+    send = monitor.send if monitor else set_location
+    probe = start_latency_probe(cfg, emu_dir)
+    if probe:
+        send = probe.wrap(send)
+    if noisy:
+        send = noisy.wrap(send)
+        hooks.append(noisy.on_tick)
+    completed = False
+    try:
+        simulate_walk(mgr_path, route, offset, send=send, hooks=hooks, dist_limit=dist_limit,
+                      speed_profile=profile, spline=spline)
+        completed = True
+    finally:
+        if noisy:
+            noisy.stop()
+            print(f"{CLR_C}定位噪声:{CLR_RST} 行走 {noisy.true_m:.1f} 米, 应用记录约 {noisy.noisy_m:.1f} 米 "
+                  f"(多出 {noisy.added_m:.1f} 米)")
+        if tracker:
+            print(f"{CLR_C}检查点: 已经过 {len(tracker.passed)}/{len(tracker.pending)}{CLR_RST}")
+            for checkpoint, elapsed in tracker.passed:
+                print(f"  {checkpoint.name:<12} {elapsed:7.1f}s")
+        if live:
+            if completed:
+                live.finish()
+            else:
+                live.abort()
+            live.close()
+        if monitor:
+            monitor.stop()
+            print_monitor_metrics(monitor.metrics())
+        if probe:
+            from latency_probe import format_report
+            probe.stop()
+            print(f"{CLR_C}端到端延迟:{CLR_RST} {format_report(probe.report())}")
+        if streamer:
+            if completed:
+                streamer.finish()
+            else:
+                streamer.abort()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+路线导入器注册表 - 按文件后缀选择导入器，流式读入列式坐标数组
+
+所有导入器都把坐标直接追加到同一种 RouteArrays（纬度、经度两个 array('d')），
+读入时即去除连续重复点，不会先在内存中构造完整的文档树或元组列表：
+- .gpx  iterparse 流式解析 wpt（没有 wpt 时使用 trkpt / rtept）
+- .tcx  iterparse 流式解析 Trackpoint/Position
+- .kml  iterparse 流式解析 coordinates / gx:coord
+- .csv  逐行读取，按表头识别纬度、经度列
+- .fit  原生二进制 FIT record 消息解码（fit_decoder.py）
+- .json [[纬度, 经度], ...]
+- .py   只按数据读取 WALK_PATH 字面量（ast.literal_eval），不执行文件
+- .route gpx_parser.py compile 批量编译出的紧凑二进制路线
+
+注册表中只保存 "模块:函数" 字符串，首次使用某种格式时才导入对应模块。
+"""
+import ast
+import csv
+import importlib
+import json
+import xml.etree.ElementTree as ET
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DUPLICATE_TOLERANCE = 1e-6  # 与 gpx_parser.remove_duplicates 的默认容差一致
+
+# 后缀 -> "模块:函数"
+IMPORTERS: Dict[str, str] = {
+    ".gpx": "route_importers:import_gpx",
+    ".tcx": "route_importers:import_tcx",
+    ".kml": "route_importers:import_kml",
+    ".csv": "route_importers:import_csv",
+    ".fit": "fit_decoder:import_fit",
+    ".json": "route_importers:import_json",
+    ".py": "route_importers:import_py",
+    ".route": "gpx_parser:import_compiled",
+}
+
+_loaded: Dict[str, Callable[[Path], "RouteArrays"]] = {}
+
+
+class UnsupportedRouteFormat(ValueError):
+    """没有为该后缀注册导入器"""
+
+
+class RouteArrays:
+    """
+    列式坐标数组：纬度、经度分别存放在 array('d') 中
+
+    append 时跳过与上一个点在容差内重复的点。
+    """
+
+    __slots__ = ("lats", "lons", "tolerance")
+
+    def __init__(self, tolerance: float = DUPLICATE_TOLERANCE) -> None:
+        self.lats = array("d")
+        self.lons = array("d")
+        self.tolerance = tolerance
+
+    def append(self, lat: float, lon: float) -> None:
+        if self.lats:
+            if abs(lat - self.lats[-1]) <= self.tolerance and abs(lon - self.lons[-1]) <= self.tolerance:
+                return
+        self.lats.append(lat)
+        self.lons.append(lon)
+
+    def extend(self, points: Iterable[Tuple[float, float]]) -> "RouteArrays":
+        for lat, lon in points:
+            self.append(lat, lon)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def to_route(self) -> List[Tuple[float, float]]:
+        """转换为 simulate_walk 使用的 (纬度, 经度) 列表"""
+        return list(zip(self.lats, self.lons))
+
+
+def supported_suffixes() -> Tuple[str, ...]:
+    return tuple(IMPORTERS)
+
+
+def get_importer(suffix: str) -> Callable[[Path], RouteArrays]:
+    """按后缀取得导入器，首次使用时才导入所在模块"""
+    suffix = suffix.lower()
+    if suffix not in _loaded:
+        spec = IMPORTERS.get(suffix)
+        if spec is None:
+            raise UnsupportedRouteFormat(f"不支持的路径文件类型: {suffix}")
+        module_name, func_name = spec.split(":")
+        _loaded[suffix] = getattr(importlib.import_module(module_name), func_name)
+    return _loaded[suffix]
+
+
+def import_route(path: Path) -> RouteArrays:
+    """按后缀导入路线文件，返回列式坐标数组"""
+    path = Path(path)
+    return get_importer(path.suffix)(path)
+
+
+def load_route(path: Path) -> List[Tuple[float, float]]:
+    """按后缀导入路线文件，返回 (纬度, 经度) 列表"""
+    return import_route(path).to_route()
+
+
+def _local(tag: str) -> str:
+    """去掉 XML 命名空间前缀"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _attr_float(elem: ET.Element, name: str) -> float:
+    """读取元素的数值属性，缺少该属性时抛出 ValueError"""
+    value = elem.get(name)
+    if value is None:
+        raise ValueError(f"<{_local(elem.tag)}> 缺少 {name} 属性")
+    return float(value)
+
+
+def _text_float(elem: ET.Element) -> float:
+    """读取元素的数值文本，文本为空时抛出 ValueError"""
+    if elem.text is None:
+        raise ValueError(f"<{_local(elem.tag)}> 缺少数值")
+    return float(elem.text)
+
+
+def _coordinate_pairs(data: object, source: str) -> Iterable[Tuple[float, float]]:
+    """逐个校验 [[纬度, 经度], ...] 字面量，格式不符时抛出 ValueError"""
+    if not isinstance(data, (list, tuple)):
+        raise ValueError(f"{source} 应为 [[纬度, 经度], ...] 列表")
+    for i, item in enumerate(data):
+        if not isinstance(item, (list, tuple)) or len(item) != 2:
+            raise ValueError(f"{source} 第 {i + 1} 个点不是 [纬度, 经度]: {item!r}")
+        lat, lon = item
+        if not isinstance(lat, (int, float, str)) or not isinstance(lon, (int, float, str)):
+            raise ValueError(f"{source} 第 {i + 1} 个点的坐标不是数值: {item!r}")
+        yield float(lat), float(lon)
+
+
+def _iter_elements(path: Path, tags: Iterable[str]) -> Iterable[ET.Element]:
+    """
+    流式产出本地标签名在 tags 中的已解析完的元素
+
+    调用方处理完后元素会被清空并从父元素中摘除；只 clear 不摘除时根元素仍为每个点保留一个空元素，
+    内存随点数增长。
+    """
+    tags = frozenset(tags)
+    parents: List[ET.Element] = []
+    for event, elem in ET.iterparse(str(path), events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        if _local(elem.tag) in tags:
+            yield elem
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+
+
+def import_gpx(path: Path) -> RouteArrays:
+    """GPX：优先 wpt，没有 wpt 时使用 trkpt / rtept"""
+    waypoints = RouteArrays()
+    track = RouteArrays()
+    for elem in _iter_elements(path, ("wpt", "trkpt", "rtept")):
+        if _local(elem.tag) == "wpt":
+            waypoints.append(_attr_float(elem, "lat"), _attr_float(elem, "lon"))
+        else:
+            track.append(_attr_float(elem, "lat"), _attr_float(elem, "lon"))
+    return waypoints if len(waypoints) else track
+
+
+def import_tcx(path: Path) -> RouteArrays:
+    """TCX：Trackpoint/Position 下的 LatitudeDegrees / LongitudeDegrees"""
+    route = RouteArrays()
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    for elem in _iter_elements(path, ("LatitudeDegrees", "LongitudeDegrees", "Trackpoint")):
+        tag = _local(elem.tag)
+        if tag == "LatitudeDegrees":
+            lat = _text_float(elem)
+        elif tag == "LongitudeDegrees":
+            lon = _text_float(elem)
+        elif tag == "Trackpoint":
+            if lat is not None and lon is not None:
+                route.append(lat, lon)
+            lat = lon = None
+    return route
+
+
+def import_kml(path: Path) -> RouteArrays:
+    """KML：coordinates 中的 "经度,纬度[,高度]" 序列，或 gx:coord 中的 "经度 纬度 高度" """
+    route = RouteArrays()
+    for elem in _iter_elements(path, ("coordinates", "coord")):
+        if not elem.text:
+            continue
+        if _local(elem.tag) == "coordinates":
+            for token in elem.text.split():
+                parts = token.split(",")
+                if len(parts) >= 2:
+                    route.append(float(parts[1]), float(parts[0]))
+        else:
+            parts = elem.text.split()
+            if len(parts) >= 2:
+                route.append(float(parts[1]), float(parts[0]))
+    return route
+
+
+_LAT_NAMES = ("lat", "latitude", "纬度")
+_LON_NAMES = ("lon", "lng", "long", "longitude", "经度")
+
+
+def import_csv(path: Path) -> RouteArrays:
+    """CSV：按表头识别纬度、经度列；没有表头时按 "纬度,经度" 读取前两列"""
+    route = RouteArrays()
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        lat_idx, lon_idx = 0, 1
+        for row in reader:
+            if not row:
+                continue
+            header = [cell.strip().lower() for cell in row]
+            if any(name in header for name in _LAT_NAMES) and any(name in header for name in _LON_NAMES):
+                lat_idx = next(i for i, cell in enumerate(header) if cell in _LAT_NAMES)
+                lon_idx = next(i for i, cell in enumerate(header) if cell in _LON_NAMES)
+                continue
+            try:
+                route.append(float(row[lat_idx]), float(row[lon_idx]))
+            except (ValueError, IndexError):
+                continue
+    return route
+
+
+def import_json(path: Path) -> RouteArrays:
+    """JSON：[[纬度, 经度], ...]"""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return RouteArrays().extend(_coordinate_pairs(data, path.name))
+
+
+def import_py(path: Path) -> RouteArrays:
+    """
+    Python 路径文件：只解析 WALK_PATH 的字面量，不执行文件中的任何代码
+
+    兼容 gpx_parser.py 输出的 `WALK_PATH: List[Tuple[float, float]] = [...]` 格式。
+    """
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        if any(isinstance(t, ast.Name) and t.id == "WALK_PATH" for t in targets):
+            try:
+                data = ast.literal_eval(value)
+            except ValueError as exc:
+                raise ValueError(f"WALK_PATH 必须是坐标字面量: {exc}") from exc
+            return RouteArrays().extend(_coordinate_pairs(data, "WALK_PATH"))
+    raise ValueError(f"{path} 中未找到 WALK_PATH 变量")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+路线库 - 管理一个目录下的多条路线，支持按位置和目标距离快速选路
+
+功能：
+1. 扫描目录中的路线文件（route_importers 支持的所有格式），按 mtime 和大小增量更新索引
+2. 索引保存每条路线的包围盒、长度和抽稀后的几何（微度整数），落盘为 .route_index.json
+3. 基于网格的空间索引，支持"距某坐标 X 米内的路线"查询
+4. 按目标距离挑选最合适的路线（整圈数跑完与目标最接近）
+
+用法:
+    python route_library.py routes                              # 列出所有路线
+    python route_library.py routes --near 30.3083 120.0783 --radius 500
+    python route_library.py routes --distance 4000
+"""
+import argparse
+import json
+import math
+import xml.etree.ElementTree as ET
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from geo import METERS_PER_DEG
+from route_importers import load_route, supported_suffixes
+
+INDEX_FILENAME = ".route_index.json"
+INDEX_VERSION = 1
+ROUTE_SUFFIXES = supported_suffixes()
+
+GRID_CELL_DEG = 0.01  # 网格边长（度），约 1.1 公里
+MAX_INDEX_POINTS = 128  # 索引中每条路线最多保留的几何点数
+
+
+def walk_length_m(lats: Sequence[float], lons: Sequence[float]) -> float:
+    """
+    路线一圈的长度（米），包含从终点回到起点的一段
+
+    距离公式与 geo.geo_dist_m 一致，保证圈数估算与模拟行走时累计的路程一致。
+    """
+    n = len(lats)
+    total = 0.0
+    for i in range(n):
+        j = (i + 1) % n
+        total += math.hypot(lats[j] - lats[i], lons[j] - lons[i])
+    return total * METERS_PER_DEG
+
+
+def _point_segment_dist_m(lat: float, lon: float, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """点到线段的距离（米），局部等距投影"""
+    k = math.cos(math.radians(lat))
+    px, py = (lon - lon1) * k, lat - lat1
+    sx, sy = (lon2 - lon1) * k, lat2 - lat1
+    seg2 = sx * sx + sy * sy
+    t = 0.0 if seg2 == 0 else max(0.0, min(1.0, (px * sx + py * sy) / seg2))
+    return math.hypot(px - t * sx, py - t * sy) * METERS_PER_DEG
+
+
+class RouteEntry:
+    """索引中的一条路线：摘要信息 + 抽稀后的几何"""
+
+    __slots__ = ("name", "mtime", "size", "points", "length_m", "bbox", "geom")
+
+    def __init__(self, name: str, mtime: float, size: int, points: int, length_m: float,
+                 bbox: Tuple[float, float, float, float], geom: array) -> None:
+        self.name = name
+        self.mtime = mtime
+        self.size = size
+        self.points = points
+        self.length_m = length_m
+        self.bbox = bbox  # (min_lat, min_lon, max_lat, max_lon)
+        self.geom = geom  # array('i')，交替存放纬度、经度的微度值
+
+    @classmethod
+    def from_route(cls, path: Path, route: List[Tuple[float, float]]) -> "RouteEntry":
+        lats = array("d", (p[0] for p in route))
+        lons = array("d", (p[1] for p in route))
+        step = max(1, math.ceil(len(route) / MAX_INDEX_POINTS))
+        geom = array("i")
+        for i in list(range(0, len(route), step)) + [len(route) - 1]:
+            geom.append(round(lats[i] * 1e6))
+            geom.append(round(lons[i] * 1e6))
+        stat = path.stat()
+        return cls(
+            name=path.name,
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            points=len(route),
+            length_m=walk_length_m(lats, lons),
+            bbox=(min(lats), min(lons), max(lats), max(lons)),
+            geom=geom,
+        )
+
+    def to_json(self) -> dict:
+        return {
+            "name": self.name,
+            "mtime": self.mtime,
+            "size": self.size,
+            "points": self.points,
+            "length_m": round(self.length_m, 2),
+            "bbox": list(self.bbox),
+            "geom": self.geom.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "RouteEntry":
+        return cls(data["name"], data["mtime"], data["size"], data["points"], data["length_m"],
+                   tuple(data["bbox"]), array("i", data["geom"]))
+
+    def distance_to_m(self, lat: float, lon: float) -> float:
+        """坐标到（抽稀后）路线的最近距离（米）"""
+        g = self.geom
+        if len(g) == 2:
+            return _point_segment_dist_m(lat, lon, g[0] / 1e6, g[1] / 1e6, g[0] / 1e6, g[1] / 1e6)
+        best = math.inf
+        for i in range(0, len(g) - 2, 2):
+            d = _point_segment_dist_m(lat, lon, g[i] / 1e6, g[i + 1] / 1e6, g[i + 2] / 1e6, g[i + 3] / 1e6)
+            if d < best:
+                best = d
+        return best
+
+    def bbox_distance_m(self, lat: float, lon: float) -> float:
+        """坐标到包围盒的距离（米），用于快速剪枝"""
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        dlat = max(min_lat - lat, 0.0, lat - max_lat)
+        dlon = max(min_lon - lon, 0.0, lon - max_lon) * math.cos(math.radians(lat))
+        return math.hypot(dlat, dlon) * METERS_PER_DEG
+
+
+class GridIndex:
+    """
+    均匀网格空间索引：每个格子记录与之相交的对象 id
+
+    插入时按包围盒覆盖的格子登记，查询时枚举查询框覆盖的格子取并集。
+    """
+
+    def __init__(self, cell_deg: float = GRID_CELL_DEG) -> None:
+        self.cell_deg = cell_deg
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def _cell_range(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Iterable[Tuple[int, int]]:
+        c = self.cell_deg
+        for i in range(math.floor(min_lat / c), math.floor(max_lat / c) + 1):
+            for j in range(math.floor(min_lon / c), math.floor(max_lon / c) + 1):
+                yield i, j
+
+    def insert(self, item_id: int, bbox: Tuple[float, float, float, float]) -> None:
+        for cell in self._cell_range(*bbox):
+            self.cells.setdefault(cell, []).append(item_id)
+
+    def query(self, bbox: Tuple[float, float, float, float]) -> Set[int]:
+        found: Set[int] = set()
+        for cell in self._cell_range(*bbox):
+            found.update(self.cells.get(cell, ()))
+        return found
+
+    def query_radius(self, lat: float, lon: float, radius_m: float) -> Set[int]:
+        d_lat = radius_m / METERS_PER_DEG
+        d_lon = radius_m / (METERS_PER_DEG * max(0.01, math.cos(math.radians(lat))))
+        return self.query((lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon))
+
+
+class RouteLibrary:
+    """
+    路线库：目录扫描、增量索引、空间查询和按距离选路
+
+    Args:
+        root: 路线目录
+        cell_deg: 网格边长（度）
+    """
+
+    def __init__(self, root: Path, cell_deg: float = GRID_CELL_DEG) -> None:
+        self.root = Path(root)
+        self.index_path = self.root / INDEX_FILENAME
+        self.entries: List[RouteEntry] = []
+        self.grid = GridIndex(cell_deg)
+
+    def refresh(self) -> "RouteLibrary":
+        """扫描目录，只重新解析新增或修改过的文件，并更新索引文件"""
+        cached: Dict[str, RouteEntry] = {}
+        if self.index_path.exists():
+            try:
+                data = json.loads(self.index_path.read_text(encoding="utf-8"))
+                if data.get("version") == INDEX_VERSION:
+                    cached = {item["name"]: RouteEntry.from_json(item) for item in data.get("routes", [])}
+            except (json.JSONDecodeError, KeyError, TypeError):
+                cached = {}
+
+        entries = []
+        changed = False
+        for path in sorted(self.root.iterdir()):
+            if path.name.startswith(".") or path.suffix.lower() not in ROUTE_SUFFIXES or not path.is_file():
+                continue
+            stat = path.stat()
+            entry = cached.pop(path.name, None)
+            if entry is None or entry.mtime != stat.st_mtime or entry.size != stat.st_size:
+                try:
+                    route = load_route(path)
+                except (ValueError, OSError, SyntaxError, ET.ParseError) as exc:
+                    print(f"  跳过无法解析的路线 {path.name}: {exc}")
+                    continue
+                if len(route) < 2:
+                    continue
+                entry = RouteEntry.from_route(path, route)
+                changed = True
+            entries.append(entry)
+
+        if changed or cached:
+            self.index_path.write_text(
+                json.dumps({"version": INDEX_VERSION, "routes": [e.to_json() for e in entries]}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+        self._build(entries)
+        return self
+
+    def _build(self, entries: List[RouteEntry]) -> None:
+        self.entries = entries
+        self.grid = GridIndex(self.grid.cell_deg)
+        for i, entry in enumerate(entries):
+            self.grid.insert(i, entry.bbox)
+
+    def near(self, lat: float, lon: float, radius_m: float) -> List[Tuple[RouteEntry, float]]:
+        """
+        查询距坐标 radius_m 米内的路线
+
+        Returns:
+            [(路线, 距离米), ...] 按距离升序
+        """
+        found = []
+        for i in self.grid.query_radius(lat, lon, radius_m):
+            entry = self.entries[i]
+            if entry.bbox_distance_m(lat, lon) > radius_m:
+                continue
+            dist = entry.distance_to_m(lat, lon)
+            if dist <= radius_m:
+                found.append((entry, dist))
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def best_for_distance(
+        self,
+        target_m: float,
+        near: Optional[Tuple[float, float]] = None,
+        radius_m: float = 1000.0,
+    ) -> Optional[RouteEntry]:
+        """
+        挑选整圈跑完后总路程最接近目标距离的路线
+
+        Args:
+            target_m: 目标距离（米）
+            near: 可选的 (纬度, 经度)，只在其附近 radius_m 米内挑选
+            radius_m: 附近范围（米）
+
+        Returns:
+            最合适的路线，没有候选时返回 None
+        """
+        candidates = [e for e, _ in self.near(near[0], near[1], radius_m)] if near else self.entries
+        best, best_score = None, (math.inf, 0)
+        for entry in candidates:
+            if entry.length_m <= 0:
+                continue
+            laps = max(1, round(target_m / entry.length_m))
+            score = (abs(laps * entry.length_m - target_m) / target_m, laps)
+            if score < best_score:
+                best, best_score = entry, score
+        return best
+
+    def load(self, entry: RouteEntry) -> List[Tuple[float, float]]:
+        """读取完整路线几何，返回 (纬度, 经度) 列表，可直接交给 simulate_walk"""
+        return load_route(self.root / entry.name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="路线库查询")
+    parser.add_argument("root", type=Path, help="路线目录")
+    parser.add_argument("--near", nargs=2, type=float, metavar=("LAT", "LON"), help="查询坐标")
+    parser.add_argument("--radius", type=float, default=1000.0, help="查询半径（米）")
+    parser.add_argument("--distance", type=float, help="目标距离（米），输出最合适的路线")
+    args = parser.parse_args()
+
+    library = RouteLibrary(args.root).refresh()
+    print(f"路线库: {args.root} ({len(library.entries)} 条路线)")
+
+    if args.distance:
+        entry = library.best_for_distance(args.distance, tuple(args.near) if args.near else None, args.radius)
+        if entry is None:
+            print("没有符合条件的路线")
+        else:
+            laps = max(1, round(args.distance / entry.length_m))
+            print(f"最合适: {entry.name}  一圈 {entry.length_m:.0f} 米 x {laps} 圈 = {entry.length_m * laps:.0f} 米")
+        return
+
+    if args.near:
+        rows = library.near(args.near[0], args.near[1], args.radius)
+    else:
+        rows = [(entry, None) for entry in library.entries]
+    for entry, dist in rows:
+        dist_str = f"  距离 {dist:.0f} 米" if dist is not None else ""
+        print(f"  {entry.name:<40} {entry.points:>7} 点  {entry.length_m:>8.0f} 米{dist_str}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+路线样条 - 用向心 Catmull-Rom 样条平滑路线，并按弧长取点
+
+直接在路线点之间线性插值时，速度方向在每个路线点处突变，稀疏或抽稀过的路线在弯道处
+会变成折线。这里在加载路线时一次性完成：
+1. 每段（首尾相连，与 simulate_walk 的循环方式一致）转换为纬度、经度各一个三次多项式系数
+2. 按每米固定点数采样，累加弦长得到弧长查找表（弧长 -> 全局参数 u = 段号 + 段内参数）
+
+行走时每帧只需一次二分查找、一次线性插值和一次三次多项式求值，
+按弧长取点即可得到沿平滑曲线的匀速运动。
+"""
+import math
+from array import array
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+from geo import METERS_PER_DEG
+
+ALPHA = 0.5  # 0.5 为向心参数化，不会在急弯处出现尖点和自交
+LUT_POINTS_PER_M = 2.0  # 弧长查找表的采样密度（每米点数）
+_EPS = 1e-12
+
+
+def _catmull_rom_coeffs(p0: float, p1: float, p2: float, p3: float,
+                        t01: float, t12: float, t23: float) -> Tuple[float, float, float, float]:
+    """
+    一维分量的三次多项式系数 (a, b, c, d)，p(t) = ((a*t + b)*t + c)*t + d，t ∈ [0, 1]
+
+    t01 / t12 / t23 为向心参数化的节点间隔，切线按段长 t12 归一化。
+    """
+    m1 = (p2 - p1) + t12 * ((p1 - p0) / t01 - (p2 - p0) / (t01 + t12))
+    m2 = (p2 - p1) + t12 * ((p3 - p2) / t23 - (p3 - p1) / (t12 + t23))
+    a = 2 * p1 - 2 * p2 + m1 + m2
+    b = -3 * p1 + 3 * p2 - 2 * m1 - m2
+    return a, b, m1, p1
+
+
+class RouteSpline:
+    """
+    闭合路线的向心 Catmull-Rom 样条与弧长查找表
+
+    position_at(dist) 超出一圈长度时按圈取模。
+    """
+
+    __slots__ = ("coeffs", "lut_s", "lut_u", "length", "num_segments")
+
+    def __init__(self, route: Sequence[Tuple[float, float]], points_per_m: float = LUT_POINTS_PER_M) -> None:
+        n = len(route)
+        if n < 2:
+            raise ValueError("路径点至少需要两个")
+
+        # 每段 8 个系数：纬度 a b c d，经度 a b c d
+        self.coeffs = array("d")
+        for i in range(n):
+            p0, p1, p2, p3 = route[i - 1], route[i], route[(i + 1) % n], route[(i + 2) % n]
+            t01 = max(math.hypot(p1[0] - p0[0], p1[1] - p0[1]) ** ALPHA, _EPS)
+            t12 = max(math.hypot(p2[0] - p1[0], p2[1] - p1[1]) ** ALPHA, _EPS)
+            t23 = max(math.hypot(p3[0] - p2[0], p3[1] - p2[1]) ** ALPHA, _EPS)
+            self.coeffs.extend(_catmull_rom_coeffs(p0[0], p1[0], p2[0], p3[0], t01, t12, t23))
+            self.coeffs.extend(_catmull_rom_coeffs(p0[1], p1[1], p2[1], p3[1], t01, t12, t23))
+        self.num_segments = n
+
+        # 弧长查找表：每段按弦长决定采样数，累加相邻采样点间的距离
+        self.lut_s = array("d", [0.0])
+        self.lut_u = array("d", [0.0])
+        s = 0.0
+        prev_lat, prev_lon = route[0]
+        for i in range(n):
+            lat1, lon1 = route[i]
+            lat2, lon2 = route[(i + 1) % n]
+            chord = math.hypot(lat2 - lat1, lon2 - lon1) * METERS_PER_DEG
+            steps = max(1, int(math.ceil(chord * points_per_m)))
+            for k in range(1, steps + 1):
+                u = i + k / steps
+                lat, lon = self._eval(i, k / steps)
+                s += math.hypot(lat - prev_lat, lon - prev_lon) * METERS_PER_DEG
+                prev_lat, prev_lon = lat, lon
+                self.lut_s.append(s)
+                self.lut_u.append(u)
+        self.length = s
+
+    def _eval(self, seg: int, t: float) -> Tuple[float, float]:
+        c = self.coeffs
+        j = seg * 8
+        lat = ((c[j] * t + c[j + 1]) * t + c[j + 2]) * t + c[j + 3]
+        lon = ((c[j + 4] * t + c[j + 5]) * t + c[j + 6]) * t + c[j + 7]
+        return lat, lon
+
+    def position_at(self, dist: float) -> Tuple[float, float]:
+        """按沿曲线的路程取点，返回 (纬度, 经度)"""
+        if self.length <= 0:
+            return self._eval(0, 0.0)
+        s = dist % self.length
+        lut_s = self.lut_s
+        k = bisect_right(lut_s, s) - 1
+        if k >= len(lut_s) - 1:
+            k = len(lut_s) - 2
+        s0, s1 = lut_s[k], lut_s[k + 1]
+        u0, u1 = self.lut_u[k], self.lut_u[k + 1]
+        u = u0 + (u1 - u0) * ((s - s0) / (s1 - s0) if s1 > s0 else 0.0)
+        seg = min(int(u), self.num_segments - 1)
+        return self._eval(seg, u - seg)
+
+    def lut_points(self) -> List[Tuple[float, float]]:
+        """弧长查找表中每个采样点的坐标，与 lut_s 一一对应（首尾重合）"""
+        points = []
+        for u in self.lut_u:
+            seg = min(int(u), self.num_segments - 1)
+            points.append(self._eval(seg, u - seg))
+        return points
+
+    def sample(self, spacing_m: float) -> List[Tuple[float, float]]:
+        """按固定弧长间隔取一圈的点，用于导出或检查平滑效果"""
+        count = max(1, int(self.length / spacing_m))
+        return [self.position_at(i * spacing_m) for i in range(count)]
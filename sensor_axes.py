@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+三轴加速度 / 陀螺仪数据生成器 - 按固定大小分块生成，边生成边写出
+
+与 sensor_simulator.generate_sensor_data 输出的 10Hz 幅值不同，这里按可配置采样率
+（如 50~100Hz）输出 x/y/z 加速度（可选 x/y/z 陀螺仪）。所有轴共用同一个步态相位累加器，
+保证各轴的步态节奏一致；数据按块产生并通过流式序列化写出，内存占用只与块大小有关。
+
+坐标约定（手机竖直放在口袋中）：
+- y: 竖直方向，包含重力和每步的上下冲击
+- z: 前进方向，每步的前后加减速
+- x: 左右摆动，频率为步频的一半（左右脚交替）
+"""
+import math
+import random
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from sensor_simulator import (
+    GRAVITY,
+    STEP_FREQ_MAX,
+    STEP_FREQ_MIN,
+    write_json_stream,
+)
+
+DEFAULT_RATE_HZ = 100  # 默认采样率
+DEFAULT_CHUNK_SAMPLES = 4096  # 每块的采样点数
+
+# 各轴幅度（m/s^2），竖直方向冲击最大
+VERTICAL_AMPLITUDE = 9.0
+FORWARD_AMPLITUDE = 4.0
+LATERAL_AMPLITUDE = 2.5
+ACCEL_NOISE_STDDEV = 0.6
+
+# 陀螺仪幅度（rad/s）
+PITCH_AMPLITUDE = 1.6
+YAW_AMPLITUDE = 0.7
+ROLL_AMPLITUDE = 0.9
+GYRO_NOISE_STDDEV = 0.05
+
+STEP_FREQ_DRIFT = 0.02  # 步频每秒随机游走幅度 (Hz)
+IRREGULAR_INTERVAL_SEC = 1.2  # 每隔多久改变一次步幅强度
+
+
+class AxisGenerator:
+    """
+    多轴传感器数据生成器
+
+    步频在 [STEP_FREQ_MIN, STEP_FREQ_MAX] 内缓慢漂移，相位按采样逐点累加，
+    所有通道都由同一相位推导，跨块调用 take() 时相位连续。
+    """
+
+    def __init__(
+        self,
+        rate_hz: float = DEFAULT_RATE_HZ,
+        gyro: bool = False,
+        avg_speed_mps: float = 2.8,
+        seed: Optional[int] = None,
+    ) -> None:
+        if rate_hz <= 0:
+            raise ValueError("采样率必须为正数")
+        self.rate_hz = float(rate_hz)
+        self.gyro = gyro
+        self.rng = random.Random(seed)
+        self.step_freq = self.rng.uniform(STEP_FREQ_MIN, STEP_FREQ_MAX)
+        self.phase = 0.0
+        self.index = 0
+        self.intensity = 1.0
+        self.speed_factor = avg_speed_mps / 2.8
+        self._irregular_every = max(1, int(self.rate_hz * IRREGULAR_INTERVAL_SEC))
+        self._drift_every = max(1, int(self.rate_hz))
+
+    @property
+    def channels(self) -> int:
+        return 6 if self.gyro else 3
+
+    def take(self, count: int) -> List[List[float]]:
+        """继续生成 count 个采样点，每个点为 [ax, ay, az] 或 [ax, ay, az, gx, gy, gz]"""
+        rng = self.rng
+        gauss = rng.gauss
+        sin, cos = math.sin, math.cos
+        two_pi = 2 * math.pi
+        scale = 0.85 + 0.15 * self.speed_factor
+        rows = []
+
+        for i in range(self.index, self.index + count):
+            if i % self._drift_every == 0:
+                self.step_freq += rng.uniform(-STEP_FREQ_DRIFT, STEP_FREQ_DRIFT)
+                self.step_freq = min(STEP_FREQ_MAX, max(STEP_FREQ_MIN, self.step_freq))
+            if i % self._irregular_every == 0:
+                self.intensity = rng.uniform(0.75, 1.25) * scale
+
+            self.phase = (self.phase + two_pi * self.step_freq / self.rate_hz) % (2 * two_pi)
+            phase = self.phase
+            stride = phase / 2  # 左右脚交替，一个跨步包含两步
+            k = self.intensity
+
+            ay = GRAVITY + k * VERTICAL_AMPLITUDE * (0.7 * sin(phase) + 0.3 * sin(2 * phase)) + gauss(0, ACCEL_NOISE_STDDEV)
+            az = k * FORWARD_AMPLITUDE * cos(phase) + gauss(0, ACCEL_NOISE_STDDEV)
+            ax = k * LATERAL_AMPLITUDE * sin(stride) + gauss(0, ACCEL_NOISE_STDDEV)
+            row = [round(ax, 6), round(ay, 6), round(az, 6)]
+
+            if self.gyro:
+                gx = k * PITCH_AMPLITUDE * cos(phase) + gauss(0, GYRO_NOISE_STDDEV)
+                gy = k * YAW_AMPLITUDE * sin(stride) + gauss(0, GYRO_NOISE_STDDEV)
+                gz = k * ROLL_AMPLITUDE * cos(stride) + gauss(0, GYRO_NOISE_STDDEV)
+                row += [round(gx, 6), round(gy, 6), round(gz, 6)]
+
+            rows.append(row)
+
+        self.index += count
+        return rows
+
+    def iter_chunks(self, duration_sec: float, chunk_samples: int = DEFAULT_CHUNK_SAMPLES) -> Iterator[List[List[float]]]:
+        """
+        按块生成 duration_sec 秒的数据
+
+        Args:
+            duration_sec: 运动持续时间（秒）
+            chunk_samples: 每块的采样点数
+
+        Yields:
+            每块的采样点列表
+        """
+        remaining = int(duration_sec * self.rate_hz)
+        while remaining > 0:
+            count = min(chunk_samples, remaining)
+            yield self.take(count)
+            remaining -= count
+
+
+def write_axis_sensor_file(
+    duration_sec: float,
+    filename: str,
+    avg_speed_mps: float = 2.8,
+    rate_hz: float = DEFAULT_RATE_HZ,
+    gyro: bool = False,
+    chunk_samples: int = DEFAULT_CHUNK_SAMPLES,
+    seed: Optional[int] = None,
+) -> Path:
+    """
+    生成多轴数据并流式写入本地文件，全程只在内存中保留一块数据
+
+    Returns:
+        本地文件路径
+    """
+    generator = AxisGenerator(rate_hz, gyro, avg_speed_mps, seed)
+    print(f"  采样率: {generator.rate_hz:.0f} Hz, 通道数: {generator.channels}")
+    return write_json_stream(generator.iter_chunks(duration_sec, chunk_samples), filename)
+
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+块自助法传感器数据生成 - 拼接步频相近的真实录音片段
+
+与 sensor_simulator 的谐波模型不同，这里直接从真实数据中截取片段：
+1. 首次使用时把 real_sensor/ 打包成一个 float32 文件（.corpus.f32，本机字节序的本地缓存），
+   每个样本的偏移、点数和主步频取自 sensor_catalog 的目录；目录更新后自动重新打包
+2. 生成时以只读 mmap 打开打包文件，按目标步频筛选候选样本，随机截取 20~40 秒的片段，
+   相邻片段在交界处做 1 秒的线性交叉淡化
+3. 片段截取只是 memoryview 切片，逐点计算只发生在交叉淡化的区间
+
+同一个随机种子总是生成相同的数据。
+
+配置（config.json，可选）:
+    "sensor_bootstrap": {"enabled": true, "seed": 42}
+"""
+import mmap
+import random
+import struct
+from array import array
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from sensor_catalog import DEFAULT_CORPUS_DIR, SampleSummary, SensorCatalog
+from sensor_simulator import CLR_C, CLR_RST, SAMPLING_RATE_HZ, cadence_for_speed
+
+PACKED_FILENAME = ".corpus.f32"
+MAGIC = b"RIMB"
+VERSION = 1
+
+BLOCK_MIN_SEC = 20.0  # 片段最短时长
+BLOCK_MAX_SEC = 40.0  # 片段最长时长
+CROSSFADE_SEC = 1.0  # 交叉淡化时长
+TRIM_SEC = 30.0  # 跳过每段录音开头和结尾（起跑、停下）的时长
+CADENCE_TOLERANCE_SPM = 8.0  # 候选样本与目标步频的最大差值
+MIN_CANDIDATES = 3  # 符合步频的样本不足时，按步频差取最接近的若干个
+SAMPLE_DECIMALS = 4
+
+_HEADER = struct.Struct("<4sHxxI")  # magic, 版本, 样本数
+_ENTRY = struct.Struct("<QIf")  # 数据偏移（点）, 点数, 主步频（步/分钟）
+
+
+class CorpusEntry(NamedTuple):
+    offset: int
+    count: int
+    cadence_spm: float
+
+
+def _catalog_summaries(corpus_dir: Path) -> Tuple[List[SampleSummary], float]:
+    """更新目录并返回 (全部样本摘要, 目录文件的 mtime)"""
+    with SensorCatalog(corpus_dir) as catalog:
+        catalog.refresh()
+        return catalog.query(), catalog.db_path.stat().st_mtime
+
+
+def pack_corpus(corpus_dir: Path = DEFAULT_CORPUS_DIR, summaries: Optional[Sequence[SampleSummary]] = None) -> Path:
+    """
+    把语料目录打包为一个 float32 文件，步频等摘要取自 sensor_catalog
+
+    Args:
+        corpus_dir: 语料目录
+        summaries: 已更新过的目录摘要（如 ensure_packed 中取得的），None 时更新目录后读取
+
+    Returns:
+        打包文件路径
+    """
+    import json
+
+    corpus_dir = Path(corpus_dir)
+    if summaries is None:
+        summaries = _catalog_summaries(corpus_dir)[0]
+    summaries = [s for s in summaries if s.cadence_spm > 0]
+
+    out_path = corpus_dir / PACKED_FILENAME
+    tmp_path = out_path.with_suffix(".tmp")
+    entries = []
+    offset = 0
+    with tmp_path.open("wb") as f:
+        f.seek(_HEADER.size + _ENTRY.size * len(summaries))
+        for summary in summaries:
+            data = array("f", (float(v) for v in json.loads((corpus_dir / summary.name).read_bytes())))
+            data.tofile(f)
+            entries.append(CorpusEntry(offset, len(data), summary.cadence_spm))
+            offset += len(data)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries)))
+        for entry in entries:
+            f.write(_ENTRY.pack(*entry))
+    tmp_path.replace(out_path)
+    return out_path
+
+
+def ensure_packed(corpus_dir: Path = DEFAULT_CORPUS_DIR) -> Path:
+    """打包文件不存在或比目录旧时重新打包（目录只扫描一次，摘要直接交给 pack_corpus）"""
+    corpus_dir = Path(corpus_dir)
+    if not corpus_dir.is_dir():
+        raise FileNotFoundError(f"未找到语料目录: {corpus_dir}")
+    summaries, db_mtime = _catalog_summaries(corpus_dir)
+    packed = corpus_dir / PACKED_FILENAME
+    if not packed.exists() or packed.stat().st_mtime < db_mtime:
+        packed = pack_corpus(corpus_dir, summaries)
+    return packed
+
+
+class BootstrapCorpus:
+    """只读映射的打包语料；data 为整个语料的 float32 memoryview，不做任何复制"""
+
+    def __init__(self, path: Path) -> None:
+        self._file = Path(path).open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} 不是有效的打包语料")
+        self.entries = [
+            CorpusEntry(*_ENTRY.unpack_from(self._mm, _HEADER.size + i * _ENTRY.size)) for i in range(count)
+        ]
+        data_start = _HEADER.size + _ENTRY.size * count
+        self.data = memoryview(self._mm)[data_start:].cast("f")
+
+    def close(self) -> None:
+        if getattr(self, "data", None) is not None:
+            self.data.release()
+            self.data = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "BootstrapCorpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class BlockBootstrapGenerator:
+    """
+    可连续取样的块自助法生成器，接口与 SensorGenerator.take 相同
+
+    Args:
+        corpus: 打包语料
+        target_spm: 目标步频（步/分钟）
+        seed: 随机种子
+    """
+
+    def __init__(self, corpus: BootstrapCorpus, target_spm: float, seed: Optional[int] = None) -> None:
+        self.corpus = corpus
+        self.target_spm = target_spm
+        self.rng = random.Random(seed)
+        self.block_min = int(BLOCK_MIN_SEC * SAMPLING_RATE_HZ)
+        self.block_max = int(BLOCK_MAX_SEC * SAMPLING_RATE_HZ)
+        self.fade = int(CROSSFADE_SEC * SAMPLING_RATE_HZ)
+        self.candidates, self.weights = self._select_candidates()
+        self.blocks = 0
+        self._buffer: List[float] = []
+        self._tail: List[float] = []
+
+    def _select_candidates(self) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """返回候选的 (可截取起点, 可截取终点) 以及按可截取长度的权重"""
+        trim = int(TRIM_SEC * SAMPLING_RATE_HZ)
+        need = self.block_max + self.fade
+        usable = []
+        for entry in self.corpus.entries:
+            start, end = entry.offset + trim, entry.offset + entry.count - trim
+            if end - start < need:  # 短录音不去掉首尾
+                start, end = entry.offset, entry.offset + entry.count
+            if end - start >= need:
+                usable.append((abs(entry.cadence_spm - self.target_spm), start, end))
+        if not usable:
+            raise ValueError("语料中没有足够长的样本")
+
+        usable.sort()
+        matched = [u for u in usable if u[0] <= CADENCE_TOLERANCE_SPM]
+        if len(matched) < MIN_CANDIDATES:
+            matched = usable[:MIN_CANDIDATES]
+        return [(start, end) for _, start, end in matched], [end - start for _, start, end in matched]
+
+    def _next_block(self) -> List[float]:
+        start, end = self.rng.choices(self.candidates, self.weights)[0]
+        length = self.rng.randint(self.block_min, self.block_max) + self.fade
+        begin = self.rng.randint(start, end - length)
+        self.blocks += 1
+        return self.corpus.data[begin:begin + length].tolist()
+
+    def take(self, count: int) -> List[float]:
+        """继续生成 count 个采样点"""
+        fade = self.fade
+        while len(self._buffer) < count:
+            block = self._next_block()
+            if self._tail:
+                # 上一片段的末尾淡出，本片段的开头淡入
+                for i in range(fade):
+                    w = (i + 1) / (fade + 1)
+                    self._buffer.append(self._tail[i] * (1 - w) + block[i] * w)
+                self._buffer.extend(block[fade:-fade])
+            else:
+                self._buffer.extend(block[:-fade])
+            self._tail = block[-fade:]
+
+        out, self._buffer = self._buffer[:count], self._buffer[count:]
+        return [round(v, SAMPLE_DECIMALS) for v in out]
+
+
+def generate_bootstrap_data(
+    duration_sec: float,
+    avg_speed_mps: float = 2.8,
+    corpus_dir: Path = DEFAULT_CORPUS_DIR,
+    seed: Optional[int] = None,
+) -> List[float]:
+    """
+    拼接真实片段生成加速度幅值数据，与 generate_sensor_data 的输出格式相同
+
+    Raises:
+        FileNotFoundError: 语料目录不存在
+        ValueError: 语料中没有可用的样本
+    """
+    num_samples = int(duration_sec * SAMPLING_RATE_HZ)
+    target_spm = cadence_for_speed(avg_speed_mps) * 60
+
+    with BootstrapCorpus(ensure_packed(corpus_dir)) as corpus:
+        generator = BlockBootstrapGenerator(corpus, target_spm, seed)
+        data = generator.take(num_samples)
+
+    print(f"{CLR_C}生成参数 (真实片段拼接):{CLR_RST}")
+    print(f"  采样数: {num_samples}")
+    print(f"  目标步频: {target_spm:.0f} 步/分钟, 候选样本 {len(generator.candidates)} 个")
+    print(f"  片段数: {generator.blocks}, 随机种子: {seed}")
+    return data
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+真实传感器数据目录 - 一次扫描 real_sensor/，把每个文件的统计摘要存入 SQLite
+
+功能：
+1. 按 mtime 和大小增量更新；mtime 变了但内容哈希相同的文件不会重新解析
+2. 每个文件保存采样点数、时长、均值、标准差、分位数和主步频
+3. 按时长、步频等条件直接在目录中筛选样本，不需要再读取原始文件
+
+目录保存在语料目录下的 .sensor_catalog.db。
+
+用法:
+    python sensor_catalog.py                                   # 更新并列出全部样本
+    python sensor_catalog.py --duration 25 35 --spm 165 175    # 25~35 分钟、165~175 步/分钟
+"""
+import argparse
+import hashlib
+import json
+import math
+import sqlite3
+import statistics
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sensor_simulator import SAMPLING_RATE_HZ
+
+DEFAULT_CORPUS_DIR = Path("real_sensor")
+CATALOG_FILENAME = ".sensor_catalog.db"
+CATALOG_VERSION = 1
+
+# 主步频搜索范围和分辨率
+CADENCE_MIN_HZ = 2.0  # 120 步/分钟
+CADENCE_MAX_HZ = 3.6  # 216 步/分钟
+CADENCE_STEP_HZ = 0.01
+CADENCE_WINDOW_SEC = 30.0  # 每个分析窗口的长度
+CADENCE_MAX_WINDOWS = 16  # 每个文件最多分析的窗口数（均匀分布在整段数据上）
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    duration_sec REAL NOT NULL,
+    mean REAL NOT NULL,
+    std REAL NOT NULL,
+    min REAL NOT NULL,
+    p05 REAL NOT NULL,
+    p25 REAL NOT NULL,
+    p50 REAL NOT NULL,
+    p75 REAL NOT NULL,
+    p95 REAL NOT NULL,
+    max REAL NOT NULL,
+    cadence_spm REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_duration ON samples (duration_sec);
+CREATE INDEX IF NOT EXISTS samples_cadence ON samples (cadence_spm);
+"""
+
+
+class SampleSummary(NamedTuple):
+    name: str
+    count: int
+    duration_sec: float
+    mean: float
+    std: float
+    min: float
+    p05: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+    max: float
+    cadence_spm: float
+
+
+_SUMMARY_COLUMNS = ", ".join(SampleSummary._fields)
+
+
+def _quantile(sorted_data: Sequence[float], q: float) -> float:
+    """线性插值分位数"""
+    pos = (len(sorted_data) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_data) - 1)
+    return sorted_data[lo] + (sorted_data[hi] - sorted_data[lo]) * (pos - lo)
+
+
+def _goertzel_power(window: Sequence[float], freq_hz: float, rate_hz: float) -> float:
+    """单频点功率（Goertzel 算法）"""
+    coeff = 2 * math.cos(2 * math.pi * freq_hz / rate_hz)
+    s1 = s2 = 0.0
+    for x in window:
+        s1, s2 = x + coeff * s1 - s2, s1
+    return s1 * s1 + s2 * s2 - coeff * s1 * s2
+
+
+def dominant_cadence_hz(data: Sequence[float], rate_hz: float = SAMPLING_RATE_HZ) -> float:
+    """
+    估计主步频：在若干个窗口上对 CADENCE_MIN_HZ~CADENCE_MAX_HZ 扫频，取功率之和最大的频率
+
+    Returns:
+        步频（Hz），数据不足一个窗口时返回 0
+    """
+    size = int(CADENCE_WINDOW_SEC * rate_hz)
+    if len(data) < size:
+        return 0.0
+    num_windows = min(CADENCE_MAX_WINDOWS, len(data) // size)
+    stride = (len(data) - size) // max(1, num_windows - 1) if num_windows > 1 else 0
+    windows = []
+    for w in range(num_windows):
+        chunk = data[w * stride:w * stride + size]
+        mean = sum(chunk) / size
+        windows.append([x - mean for x in chunk])
+
+    freqs = [CADENCE_MIN_HZ + i * CADENCE_STEP_HZ
+             for i in range(int(round((CADENCE_MAX_HZ - CADENCE_MIN_HZ) / CADENCE_STEP_HZ)) + 1)]
+    best_freq, best_power = 0.0, -1.0
+    for freq in freqs:
+        power = sum(_goertzel_power(window, freq, rate_hz) for window in windows)
+        if power > best_power:
+            best_freq, best_power = freq, power
+    return best_freq
+
+
+def summarize(name: str, data: Sequence[float], rate_hz: float = SAMPLING_RATE_HZ) -> SampleSummary:
+    """计算一个样本文件的统计摘要"""
+    if len(data) < 2:
+        raise ValueError("采样点不足")
+    sorted_data = sorted(data)
+    p05, p25, p50, p75, p95 = (_quantile(sorted_data, q) for q in QUANTILES)
+    return SampleSummary(
+        name=name,
+        count=len(data),
+        duration_sec=len(data) / rate_hz,
+        mean=statistics.fmean(data),
+        std=statistics.stdev(data),
+        min=sorted_data[0],
+        p05=p05, p25=p25, p50=p50, p75=p75, p95=p95,
+        max=sorted_data[-1],
+        cadence_spm=dominant_cadence_hz(data, rate_hz) * 60,
+    )
+
+
+def pooled_stats(entries: Iterable[SampleSummary]) -> Tuple[int, float, float]:
+    """
+    由各文件的 (点数, 均值, 标准差) 精确合并出整体的统计量，不读取原始数据
+
+    Returns:
+        (总点数, 均值, 样本标准差)
+    """
+    total = 0
+    sum_x = 0.0
+    sum_sq = 0.0
+    for e in entries:
+        total += e.count
+        sum_x += e.mean * e.count
+        sum_sq += e.std ** 2 * (e.count - 1) + e.mean ** 2 * e.count
+    if total < 2:
+        return total, sum_x / total if total else 0.0, 0.0
+    mean = sum_x / total
+    return total, mean, math.sqrt(max(0.0, (sum_sq - total * mean * mean) / (total - 1)))
+
+
+class SensorCatalog:
+    """
+    真实传感器数据目录
+
+    Args:
+        root: 语料目录（默认 real_sensor/）
+    """
+
+    def __init__(self, root: Path = DEFAULT_CORPUS_DIR) -> None:
+        self.root = Path(root)
+        self.db_path = self.root / CATALOG_FILENAME
+        self.conn = sqlite3.connect(str(self.db_path))
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CATALOG_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS samples")
+            self.conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SensorCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def refresh(self) -> Tuple[int, int, int]:
+        """
+        扫描语料目录，只重新解析新增或内容变化的文件
+
+        Returns:
+            (新解析的文件数, 仅更新 mtime 的文件数, 删除的记录数)
+        """
+        known = {
+            name: (mtime_ns, size, sha1)
+            for name, mtime_ns, size, sha1 in self.conn.execute("SELECT name, mtime_ns, size, sha1 FROM samples")
+        }
+        parsed = touched = 0
+        with self.conn:
+            for path in sorted(self.root.glob("*.txt")):
+                stat = path.stat()
+                old = known.pop(path.name, None)
+                if old is not None and old[0] == stat.st_mtime_ns and old[1] == stat.st_size:
+                    continue
+
+                raw = path.read_bytes()
+                sha1 = hashlib.sha1(raw).hexdigest()
+                if old is not None and old[2] == sha1:
+                    self.conn.execute(
+                        "UPDATE samples SET mtime_ns = ?, size = ? WHERE name = ?",
+                        (stat.st_mtime_ns, stat.st_size, path.name),
+                    )
+                    touched += 1
+                    continue
+
+                try:
+                    summary = summarize(path.name, [float(v) for v in json.loads(raw)])
+                except (ValueError, TypeError) as exc:
+                    print(f"  跳过无法解析的样本 {path.name}: {exc}")
+                    if old is not None:
+                        known[path.name] = old  # 旧记录已过期，留给下面的清理删除
+                    continue
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO samples (mtime_ns, size, sha1, {_SUMMARY_COLUMNS}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' * len(SampleSummary._fields))})",
+                    (stat.st_mtime_ns, stat.st_size, sha1, *summary),
+                )
+                parsed += 1
+
+            if known:
+                self.conn.executemany("DELETE FROM samples WHERE name = ?", [(name,) for name in known])
+        return parsed, touched, len(known)
+
+    def query(
+        self,
+        duration_min: Optional[Tuple[float, float]] = None,
+        spm: Optional[Tuple[float, float]] = None,
+        limit: Optional[int] = None,
+        shuffle: bool = False,
+    ) -> List[SampleSummary]:
+        """
+        按条件筛选样本
+
+        Args:
+            duration_min: 时长范围（分钟）
+            spm: 主步频范围（步/分钟）
+            limit: 最多返回的条数
+            shuffle: 随机排序（否则按文件名）
+        """
+        sql = f"SELECT {_SUMMARY_COLUMNS} FROM samples WHERE 1 = 1"
+        params: List[float] = []
+        if duration_min:
+            sql += " AND duration_sec BETWEEN ? AND ?"
+            params += [duration_min[0] * 60, duration_min[1] * 60]
+        if spm:
+            sql += " AND cadence_spm BETWEEN ? AND ?"
+            params += list(spm)
+        sql += " ORDER BY random()" if shuffle else " ORDER BY name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [SampleSummary(*row) for row in self.conn.execute(sql, params)]
+
+
+def format_summary(entry: SampleSummary) -> str:
+    return (
+        f"  {entry.name:<42} {entry.count:>6} 点 {entry.duration_sec / 60:6.1f} 分钟  "
+        f"均值 {entry.mean:5.2f}  标准差 {entry.std:5.2f}  中位数 {entry.p50:5.2f}  "
+        f"步频 {entry.cadence_spm:4.0f} 步/分钟"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="真实传感器数据目录")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_CORPUS_DIR, help="语料目录")
+    parser.add_argument("--duration", nargs=2, type=float, metavar=("MIN", "MAX"), help="时长范围（分钟）")
+    parser.add_argument("--spm", nargs=2, type=float, metavar=("MIN", "MAX"), help="步频范围（步/分钟）")
+    parser.add_argument("--limit", type=int, help="最多列出的条数")
+    args = parser.parse_args()
+
+    if not args.dir.is_dir():
+        print(f"错误: 未找到语料目录 {args.dir}")
+        return
+
+    with SensorCatalog(args.dir) as catalog:
+        parsed, touched, removed = catalog.refresh()
+        print(f"目录: {catalog.db_path} (新解析 {parsed}, 更新 {touched}, 删除 {removed})")
+        entries = catalog.query(args.duration, args.spm, args.limit)
+
+    for entry in entries:
+        print(format_summary(entry))
+    count, mean, std = pooled_stats(entries)
+    print(f"共 {len(entries)} 个样本, {count} 点, 均值 {mean:.2f}, 标准差 {std:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,10 @@ import math
 import random
 import subprocess
 import sys
+import tempfile
 import time
-import uuid
-from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
 # --- 终端颜色定义 ---
 CLR_A = "\x1b[01;38;5;117m"
@@ -34,12 +33,19 @@ GRAVITY = 9.8  # 重力加速度基线
 # 步频参数（跑步节奏）
 STEP_FREQ_MIN = 2.5  # 最小步频 (Hz) - 150步/分钟
 STEP_FREQ_MAX = 3.0  # 最大步频 (Hz) - 180步/分钟
+STRIDE_LENGTH_M = 1.0  # 由速度估算步频时使用的步长（米）
 
 # 幅度参数（根据全部真实数据统计: mean=14.98, std=12.20）
 AMPLITUDE_BASE = 15.0  # 基础幅度
 AMPLITUDE_VARIATION = 38.0  # 幅度变化范围
 NOISE_STDDEV = 7.0  # 噪声标准差
 
+# --- 设备路径与增量推送参数 ---
+REMOTE_SENSOR_DIR = "/storage/emulated/0/sensor"
+DEFAULT_CHUNK_SEC = 30.0  # 增量推送时每块覆盖的运动时长（秒）
+GZIP_LEVEL = 6  # 压缩推送时的 gzip 压缩级别
+TRANSFER_OK_MARKER = "__RUNINMUMU_OK__"
+
 
 def load_config() -> dict:
     """读取配置文件"""
@@ -68,6 +74,31 @@ def find_adb_path(cfg: dict) -> Path:
     return adb_path
 
 
+def parse_sensor_listing(output: str) -> List[Tuple[str, str, str]]:
+    """
+    解析 `stat -c '%y|%n'` 的输出
+    
+    Returns:
+        [(filename, date, time), ...]，保持输入顺序
+    """
+    files = []
+    for line in output.splitlines():
+        line = line.strip()
+        if "|" not in line:
+            continue
+        timestamp, filename = line.rsplit("|", 1)
+        filename = filename.rsplit("/", 1)[-1]
+        if not filename.endswith('.txt'):
+            continue
+        # 格式: 2024-12-15 14:30:45.123456789 +0800
+        parts = timestamp.split()
+        if len(parts) >= 2:
+            files.append((filename, parts[0], parts[1].split('.')[0]))  # 去掉纳秒
+        else:
+            files.append((filename, "unknown", "unknown"))
+    return files
+
+
 def get_recent_sensor_files(adb_path: Path, minutes: int = 120) -> List[Tuple[str, str, str]]:
     """
     获取模拟器中最近N分钟内修改的sensor文件
@@ -77,11 +108,11 @@ def get_recent_sensor_files(adb_path: Path, minutes: int = 120) -> List[Tuple[st
     """
     print(f"{CLR_P}正在查询模拟器中的sensor文件...{CLR_RST}")
     
-    # 使用stat命令获取更可靠的文件信息
+    # 一次 adb 往返完成排序和取修改时间，不再为每个文件单独调用 stat
     cmd = [
         str(adb_path),
         "shell",
-        "cd /storage/emulated/0/sensor && ls -t *.txt 2>/dev/null | head -n 20"
+        f"cd {REMOTE_SENSOR_DIR} && for f in $(ls -t *.txt 2>/dev/null | head -n 20); do stat -c '%y|%n' \"$f\" 2>/dev/null || echo \"|$f\"; done"
     ]
     
     try:
@@ -92,40 +123,76 @@ def get_recent_sensor_files(adb_path: Path, minutes: int = 120) -> List[Tuple[st
             print(f"{CLR_P}  目录为空或不存在{CLR_RST}")
             return []
         
-        files = []
-        for line in output.split('\n'):
-            filename = line.strip()
-            if filename.endswith('.txt'):
-                # 获取文件修改时间
-                stat_cmd = [
-                    str(adb_path),
-                    "shell",
-                    f"stat -c '%y' /storage/emulated/0/sensor/{filename} 2>/dev/null || echo ''"
-                ]
-                try:
-                    stat_result = subprocess.run(stat_cmd, capture_output=True, text=True, encoding="utf-8", timeout=2)
-                    timestamp = stat_result.stdout.strip()
-                    if timestamp:
-                        # 格式: 2024-12-15 14:30:45.123456789 +0800
-                        parts = timestamp.split()
-                        if len(parts) >= 2:
-                            date_str = parts[0]
-                            time_str = parts[1].split('.')[0]  # 去掉纳秒
-                            files.append((filename, date_str, time_str))
-                        else:
-                            files.append((filename, "unknown", "unknown"))
-                    else:
-                        files.append((filename, "unknown", "unknown"))
-                except:
-                    files.append((filename, "unknown", "unknown"))
-        
-        return files  # ls -t 已经按时间排序，最新的在前
+        return parse_sensor_listing(output)  # ls -t 已经按时间排序，最新的在前
     
     except Exception as e:
         print(f"{CLR_A}ERROR 查询文件失败: {e}{CLR_RST}")
         return []
 
 
+def cadence_for_speed(speed_mps: float) -> float:
+    """由速度估算步频 (Hz)，限制在 [STEP_FREQ_MIN, STEP_FREQ_MAX]"""
+    return min(max(speed_mps / STRIDE_LENGTH_M, STEP_FREQ_MIN), STEP_FREQ_MAX)
+
+
+class SensorGenerator:
+    """
+    可连续取样的加速度幅值生成器
+
+    保存步态相位、不规则因子和采样序号，多次调用 take() 拼接出的序列
+    与一次性生成的序列相同，供边跑边生成的增量推送使用。
+    """
+
+    def __init__(self, avg_speed_mps: float = 2.8, step_freq: Optional[float] = None) -> None:
+        self.set_speed(avg_speed_mps)
+        # 随机步频（在范围内）
+        self.step_freq = step_freq if step_freq is not None else random.uniform(STEP_FREQ_MIN, STEP_FREQ_MAX)
+        self.index = 0
+        self.irregular_factor = 1.0
+
+    def set_speed(self, avg_speed_mps: float) -> None:
+        """根据速度调整幅度（保持接近真实均值）"""
+        speed_factor = avg_speed_mps / 2.8  # 归一化到默认速度
+        self.amplitude = AMPLITUDE_BASE * (0.85 + 0.15 * speed_factor)  # 轻微调整
+
+    def take(self, count: int) -> List[float]:
+        """继续生成 count 个采样点"""
+        data = []
+        irregular_every = int(SAMPLING_RATE_HZ * 1.2)
+
+        for i in range(self.index, self.index + count):
+            t = i / SAMPLING_RATE_HZ  # 当前时间点（秒）
+
+            # 基础周期分量（步频）
+            phase = 2 * math.pi * self.step_freq * t
+
+            # 组合多个分量模拟真实步态
+            periodic = (
+                0.6 * math.sin(phase) +  # 基础步频
+                0.3 * math.sin(2 * phase) +  # 二次谐波
+                0.1 * math.sin(3 * phase)  # 三次谐波
+            )
+
+            # 不规则性：每几步改变幅度
+            if i % irregular_every == 0:
+                self.irregular_factor = random.uniform(0.6, 1.4)
+
+            # 组合：基线 + 周期分量 + 噪声
+            value = (
+                self.amplitude +  # 基础幅度
+                periodic * AMPLITUDE_VARIATION * 0.45 * self.irregular_factor +  # 周期变化
+                random.gauss(0, NOISE_STDDEV)  # 高斯噪声
+            )
+
+            # 限制在合理范围内（0-100 m/s²）
+            value = max(0.5, min(100.0, value))
+
+            data.append(round(value, 6))
+
+        self.index += count
+        return data
+
+
 def generate_sensor_data(duration_sec: float, avg_speed_mps: float = 2.8) -> List[float]:
     """
     生成模拟的加速度传感器数据（幅值）
@@ -138,50 +205,55 @@ def generate_sensor_data(duration_sec: float, avg_speed_mps: float = 2.8) -> Lis
         加速度幅值列表
     """
     num_samples = int(duration_sec * SAMPLING_RATE_HZ)
-    data = []
-    
-    # 根据速度调整幅度（保持接近真实均值）
-    speed_factor = avg_speed_mps / 2.8  # 归一化到默认速度
-    amplitude = AMPLITUDE_BASE * (0.85 + 0.15 * speed_factor)  # 轻微调整
-    
-    # 随机步频（在范围内）
-    step_freq = random.uniform(STEP_FREQ_MIN, STEP_FREQ_MAX)
+    generator = SensorGenerator(avg_speed_mps)
     
     print(f"{CLR_C}生成参数:{CLR_RST}")
     print(f"  采样数: {num_samples}")
-    print(f"  步频: {step_freq:.2f} Hz ({step_freq*60:.0f} 步/分钟)")
-    print(f"  基础幅度: {amplitude:.2f} m/s^2")
+    print(f"  步频: {generator.step_freq:.2f} Hz ({generator.step_freq*60:.0f} 步/分钟)")
+    print(f"  基础幅度: {generator.amplitude:.2f} m/s^2")
     
-    for i in range(num_samples):
-        t = i / SAMPLING_RATE_HZ  # 当前时间点（秒）
-        
-        # 基础周期分量（步频）
-        phase = 2 * math.pi * step_freq * t
-        
-        # 组合多个分量模拟真实步态
-        periodic = (
-            0.6 * math.sin(phase) +  # 基础步频
-            0.3 * math.sin(2 * phase) +  # 二次谐波
-            0.1 * math.sin(3 * phase)  # 三次谐波
-        )
-        
-        # 不规则性：每几步改变幅度
-        if i == 0 or i % int(SAMPLING_RATE_HZ * 1.2) == 0:
-            irregular_factor = random.uniform(0.6, 1.4)
-        
-        # 组合：基线 + 周期分量 + 噪声
-        value = (
-            amplitude +  # 基础幅度
-            periodic * AMPLITUDE_VARIATION * 0.45 * irregular_factor +  # 周期变化
-            random.gauss(0, NOISE_STDDEV)  # 高斯噪声
-        )
-        
-        # 限制在合理范围内（0-100 m/s²）
-        value = max(0.5, min(100.0, value))
-        
-        data.append(round(value, 6))
-    
-    return data
+    return generator.take(num_samples)
+
+
+def _format_sample(sample) -> str:
+    if isinstance(sample, (list, tuple)):
+        return "[" + ",".join(str(v) for v in sample) + "]"
+    return str(sample)
+
+
+def write_json_stream(chunks: Iterable[Sequence], filename: str) -> Path:
+    """
+    流式写出 JSON 数组：逐块序列化并写入，不在内存中拼出完整内容
+
+    Args:
+        chunks: 数据块序列，块内元素为标量（幅值）或列表（多轴采样）
+        filename: 本地文件名
+
+    Returns:
+        本地文件路径
+    """
+    temp_path = Path(filename)
+    size = 0
+    first = True
+
+    # 格式化为JSON数组（紧凑格式，无空格）
+    with temp_path.open("w", encoding="utf-8") as f:
+        f.write("[")
+        size += 1
+        for chunk in chunks:
+            if not chunk:
+                continue
+            text = ",".join(_format_sample(v) for v in chunk)
+            if not first:
+                text = "," + text
+            first = False
+            f.write(text)
+            size += len(text)
+        f.write("]")
+        size += 1
+
+    print(f"{CLR_C}OK 已生成本地文件: {temp_path} ({size} 字节){CLR_RST}")
+    return temp_path
 
 
 def write_sensor_file(data: List[float], filename: str) -> Path:
@@ -191,43 +263,312 @@ def write_sensor_file(data: List[float], filename: str) -> Path:
     Returns:
         临时文件路径
     """
-    temp_path = Path(filename)
-    
-    # 格式化为JSON数组（紧凑格式，无空格）
-    content = "[" + ",".join(str(v) for v in data) + "]"
-    
-    temp_path.write_text(content, encoding="utf-8")
-    print(f"{CLR_C}OK 已生成本地文件: {temp_path} ({len(content)} 字节){CLR_RST}")
-    
-    return temp_path
+    return write_json_stream([data], filename)
+
+
+class TransferStats(NamedTuple):
+    ok: bool
+    method: str  # "gzip" / "plain"
+    raw_bytes: int
+    sent_bytes: int
+    seconds: float
+
+
+_device_gzip: Dict[str, bool] = {}
+
+
+def device_has_gzip(adb_path: Path) -> bool:
+    """检查设备端是否有可用的 gzip（toybox / busybox），结果按 adb 路径缓存"""
+    key = str(adb_path)
+    if key not in _device_gzip:
+        try:
+            result = subprocess.run(
+                [key, "shell", f"echo {TRANSFER_OK_MARKER} | gzip -c | gzip -dc"],
+                capture_output=True, text=True, timeout=10,
+            )
+            _device_gzip[key] = TRANSFER_OK_MARKER in result.stdout
+        except (OSError, subprocess.SubprocessError):
+            _device_gzip[key] = False
+    return _device_gzip[key]
 
 
-def push_to_emulator(adb_path: Path, local_file: Path, remote_filename: str) -> bool:
+def _push_gzip(adb_path: Path, local_file: Path, remote_path: str) -> Optional[int]:
+    """
+    压缩推送：主机端流式 gzip，设备端解压到临时文件后 mv 到目标路径
+
+    Returns:
+        实际传输的字节数，失败时返回 None
+    """
+    import gzip
+    import shutil
+
+    remote_dir, name = remote_path.rsplit("/", 1)
+    remote_gz = f"{remote_dir}/.{name}.gz"
+    remote_tmp = f"{remote_dir}/.{name}.partial"
+
+    with tempfile.NamedTemporaryFile(suffix=".gz", delete=False) as tmp:
+        with local_file.open("rb") as src, gzip.GzipFile(fileobj=tmp, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as dst:
+            shutil.copyfileobj(src, dst, 1 << 16)
+    gz_path = Path(tmp.name)
+    try:
+        subprocess.run([str(adb_path), "push", str(gz_path), remote_gz], capture_output=True, check=True)
+        result = subprocess.run(
+            [str(adb_path), "shell",
+             f"gzip -dc {remote_gz} > {remote_tmp} && mv -f {remote_tmp} {remote_path} && echo {TRANSFER_OK_MARKER}; "
+             f"rm -f {remote_gz} {remote_tmp}"],
+            capture_output=True, text=True,
+        )
+        if TRANSFER_OK_MARKER not in result.stdout:
+            return None
+        return gz_path.stat().st_size
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    finally:
+        gz_path.unlink(missing_ok=True)
+
+
+def transfer_file(adb_path: Path, local_file: Path, remote_path: str, compress: bool = True) -> TransferStats:
+    """
+    推送文件到设备：设备端有 gzip 时压缩推送，否则（或压缩推送失败时）退回普通 adb push
+
+    Returns:
+        TransferStats
+    """
+    raw_bytes = local_file.stat().st_size
+    t0 = time.perf_counter()
+
+    if compress and device_has_gzip(adb_path):
+        sent = _push_gzip(adb_path, local_file, remote_path)
+        if sent is not None:
+            return TransferStats(True, "gzip", raw_bytes, sent, time.perf_counter() - t0)
+        print(f"{CLR_A}压缩推送失败，改为普通推送...{CLR_RST}")
+
+    try:
+        subprocess.run([str(adb_path), "push", str(local_file), remote_path], capture_output=True, text=True, check=True)
+        ok = True
+    except subprocess.CalledProcessError as e:
+        print(f"{CLR_A}ERROR 推送失败: {e.stderr}{CLR_RST}")
+        ok = False
+    return TransferStats(ok, "plain", raw_bytes, raw_bytes if ok else 0, time.perf_counter() - t0)
+
+
+def push_to_emulator(adb_path: Path, local_file: Path, remote_filename: str, compress: bool = True) -> bool:
     """
     通过ADB推送文件到模拟器
     
     Returns:
         是否成功
     """
-    remote_path = f"/storage/emulated/0/sensor/{remote_filename}"
+    remote_path = f"{REMOTE_SENSOR_DIR}/{remote_filename}"
     
     # 确保目录存在
     print(f"{CLR_P}确保模拟器目录存在...{CLR_RST}")
-    mkdir_cmd = [str(adb_path), "shell", "mkdir -p /storage/emulated/0/sensor"]
+    mkdir_cmd = [str(adb_path), "shell", f"mkdir -p {REMOTE_SENSOR_DIR}"]
     subprocess.run(mkdir_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     
     # 推送文件
     print(f"{CLR_P}正在推送文件到模拟器...{CLR_RST}")
-    push_cmd = [str(adb_path), "push", str(local_file), remote_path]
-    
-    try:
-        result = subprocess.run(push_cmd, capture_output=True, text=True, check=True)
-        print(f"{CLR_C}OK 推送成功: {remote_path}{CLR_RST}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"{CLR_A}ERROR 推送失败: {e.stderr}{CLR_RST}")
+    stats = transfer_file(adb_path, Path(local_file), remote_path, compress)
+    if not stats.ok:
         return False
 
+    print(f"{CLR_C}OK 推送成功: {remote_path}{CLR_RST}")
+    if stats.method == "gzip":
+        saved = stats.raw_bytes - stats.sent_bytes
+        ratio = saved / stats.raw_bytes * 100 if stats.raw_bytes else 0.0
+        print(f"{CLR_P}  gzip 压缩推送: {stats.raw_bytes} -> {stats.sent_bytes} 字节 "
+              f"(节省 {saved} 字节, {ratio:.1f}%), 耗时 {stats.seconds:.2f} 秒{CLR_RST}")
+    else:
+        print(f"{CLR_P}  普通推送: {stats.raw_bytes} 字节, 耗时 {stats.seconds:.2f} 秒{CLR_RST}")
+    return True
+
+
+class SensorStreamer:
+    """
+    跑步过程中增量生成并分块推送传感器数据
+
+    数据先追加到模拟器上的临时文件 .<文件名>.partial，结束时只需补上最后一小块
+    并 mv 成目标文件；应用在跑步中写入的原文件直到最后一刻才被替换。
+    上传在后台线程完成，不阻塞行走循环。本地同时保留一份完整副本，
+    任何一块上传失败时在结束阶段退回整文件推送。
+    """
+
+    def __init__(
+        self,
+        adb_path: Path,
+        remote_filename: str,
+        avg_speed_mps: float = 2.8,
+        chunk_sec: float = DEFAULT_CHUNK_SEC,
+    ) -> None:
+        import queue
+        import threading
+
+        self.adb_path = adb_path
+        self.remote_filename = remote_filename
+        self.remote_path = f"{REMOTE_SENSOR_DIR}/{remote_filename}"
+        self.partial_path = f"{REMOTE_SENSOR_DIR}/.{remote_filename}.partial"
+        self.local_path = Path(remote_filename)
+        self.chunk_samples = max(1, int(chunk_sec * SAMPLING_RATE_HZ))
+        self.generator = SensorGenerator(avg_speed_mps)
+        self.samples = 0
+        self.chunks_pushed = 0
+        self.bytes_pushed = 0
+        self.failed = False
+        self._pending: List[float] = []
+        self._opened = False
+        self._avg_speed = avg_speed_mps
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._upload_loop, daemon=True)
+        self._local_file = None
+
+    def start(self) -> None:
+        """准备设备目录和本地副本，启动后台上传线程"""
+        subprocess.run(
+            [str(self.adb_path), "shell", f"mkdir -p {REMOTE_SENSOR_DIR}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self._local_file = self.local_path.open("w", encoding="utf-8")
+        self._worker.start()
+
+    def on_tick(self, elapsed_sec: float, total_dist_m: float, speed_mps: float) -> None:
+        """simulate_walk 的每帧回调"""
+        avg_speed = total_dist_m / elapsed_sec if elapsed_sec > 0 else self._avg_speed
+        self.advance(elapsed_sec, avg_speed)
+
+    def advance(self, elapsed_sec: float, avg_speed_mps: float) -> None:
+        """生成到 elapsed_sec 为止的数据，攒满一块就交给后台上传"""
+        self._avg_speed = avg_speed_mps
+        target = int(elapsed_sec * SAMPLING_RATE_HZ)
+        if target <= self.samples:
+            return
+        self.generator.set_speed(avg_speed_mps)
+        self._pending.extend(self.generator.take(target - self.samples))
+        self.samples = target
+        if len(self._pending) >= self.chunk_samples:
+            self._flush()
+
+    def _flush(self, final: bool = False) -> None:
+        piece = ""
+        if self._pending:
+            piece = ("," if self._opened else "[") + ",".join(str(v) for v in self._pending)
+            self._opened = True
+            self._pending = []
+        if final:
+            piece += "]" if self._opened else "[]"
+        if not piece:
+            return
+        self._local_file.write(piece)
+        self._queue.put(piece)
+
+    def _upload_loop(self) -> None:
+        first = True
+        while True:
+            piece = self._queue.get()
+            if piece is None:
+                return
+            if self.failed:
+                continue
+            if self._append_remote(piece, first):
+                self.chunks_pushed += 1
+                self.bytes_pushed += len(piece)
+            else:
+                self.failed = True
+            first = False
+
+    def _append_remote(self, piece: str, first: bool) -> bool:
+        """推送一块数据：第一块直接覆盖 partial，之后的块推送后在设备端追加"""
+        with tempfile.NamedTemporaryFile("w", suffix=".chunk", delete=False, encoding="utf-8") as tmp:
+            tmp.write(piece)
+        chunk_path = f"{self.partial_path}.chunk"
+        try:
+            target = self.partial_path if first else chunk_path
+            subprocess.run(
+                [str(self.adb_path), "push", tmp.name, target],
+                capture_output=True, check=True,
+            )
+            if not first:
+                subprocess.run(
+                    [str(self.adb_path), "shell", f"cat {chunk_path} >> {self.partial_path} && rm {chunk_path}"],
+                    capture_output=True, check=True,
+                )
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+        finally:
+            Path(tmp.name).unlink(missing_ok=True)
+
+    def finish(self) -> bool:
+        """
+        补齐最后一块并原子替换目标文件
+        
+        Returns:
+            是否成功
+        """
+        self._flush(final=True)
+        self._queue.put(None)
+        self._worker.join()
+        self._local_file.close()
+
+        print(f"{CLR_P}传感器数据: {self.samples} 个采样点, 已增量推送 {self.chunks_pushed} 块 ({self.bytes_pushed} 字节){CLR_RST}")
+        success = False
+        if not self.failed:
+            result = subprocess.run(
+                [str(self.adb_path), "shell", f"mv -f {self.partial_path} {self.remote_path}"],
+                capture_output=True, text=True,
+            )
+            success = result.returncode == 0
+
+        if not success:
+            print(f"{CLR_A}增量推送失败，改为整文件推送...{CLR_RST}")
+            subprocess.run(
+                [str(self.adb_path), "shell", f"rm -f {self.partial_path}"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            success = push_to_emulator(self.adb_path, self.local_path, self.remote_filename)
+
+        if success:
+            print(f"{CLR_C}OK 传感器数据已替换: {self.remote_path}{CLR_RST}")
+            try:
+                self.local_path.unlink()
+            except OSError:
+                pass
+        return success
+
+    def abort(self) -> None:
+        """行走异常中断时停止上传，删除设备上的临时文件和本地副本，不替换目标文件"""
+        self._queue.put(None)
+        if self._worker.is_alive():
+            self._worker.join()
+        if self._local_file is not None:
+            self._local_file.close()
+        subprocess.run(
+            [str(self.adb_path), "shell", f"rm -f {self.partial_path} {self.partial_path}.chunk"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.local_path.unlink(missing_ok=True)
+        print(f"{CLR_A}行走中断，已放弃增量推送的传感器数据{CLR_RST}")
+
+
+LIVE_STATE_MAX_AGE_SEC = 600  # 超过该时间未更新的实时状态视为上一次跑步的残留
+
+
+def read_walk_state(cfg: dict):
+    """读取 main.py 共享的实时行走状态，没有可用状态或行走已中断时返回 None"""
+    live_cfg = cfg.get("live_state") or {}
+    if not live_cfg.get("enabled", True):
+        return None
+
+    from live_state import DEFAULT_STATE_PATH, read_live_state
+
+    path = Path(live_cfg["path"]).expanduser() if live_cfg.get("path") else DEFAULT_STATE_PATH
+    state = read_live_state(path)
+    if state is None or state.ticks == 0 or state.aborted or state.age() > LIVE_STATE_MAX_AGE_SEC:
+        return None
+    return state
+
 
 def main():
     """主流程"""
@@ -251,6 +592,7 @@ def main():
         
         use_new = input(f"{CLR_A}是否创建新文件? (y/N): {CLR_RST}").strip().lower()
         if use_new == 'y':
+            import uuid
             file_uuid = str(uuid.uuid4())
             target_filename = f"{file_uuid}.txt"
             print(f"{CLR_C}将创建新文件: {target_filename}{CLR_RST}")
@@ -290,42 +632,74 @@ def main():
             print(f"{CLR_A}ERROR 输入无效{CLR_RST}")
             sys.exit(1)
     
-    # 3. 询问用户运动时长
+    # 3. 时长和平均速度：优先使用 main.py 共享的实时状态作为默认值
+    default_duration, default_speed = 1143.0, 2.8
+    live = read_walk_state(cfg)
+    if live:
+        default_duration = round(live.elapsed_sec)
+        default_speed = round(live.avg_speed_mps, 2)
+        status = "已结束" if live.finished else "进行中"
+        print(f"\n{CLR_C}OK 读取到 main.py 的行走状态 ({status}): "
+              f"{live.elapsed_sec:.0f}秒, {live.distance_m:.0f}米, 均速 {live.avg_speed_mps:.2f} m/s{CLR_RST}")
+
     print(f"\n{CLR_P}请输入本次跑步的持续时间(秒):{CLR_RST}")
     print(f"{CLR_P}  提示: 3200米 @ 2.8m/s ~= 1143秒 ~= 19分钟{CLR_RST}")
     
     try:
-        duration_input = input(f"{CLR_A}时长(秒) [{CLR_P}1143{CLR_A}]: {CLR_RST}").strip()
-        duration = float(duration_input) if duration_input else 1143.0
+        duration_input = input(f"{CLR_A}时长(秒) [{CLR_P}{default_duration:g}{CLR_A}]: {CLR_RST}").strip()
+        duration = float(duration_input) if duration_input else float(default_duration)
     except ValueError:
-        print(f"{CLR_A}ERROR 输入无效，使用默认值 1143秒{CLR_RST}")
-        duration = 1143.0
+        print(f"{CLR_A}ERROR 输入无效，使用默认值 {default_duration:g}秒{CLR_RST}")
+        duration = float(default_duration)
     
     # 4. 询问平均速度
     try:
-        speed_input = input(f"{CLR_A}平均速度(m/s) [{CLR_P}2.8{CLR_A}]: {CLR_RST}").strip()
-        avg_speed = float(speed_input) if speed_input else 2.8
+        speed_input = input(f"{CLR_A}平均速度(m/s) [{CLR_P}{default_speed:g}{CLR_A}]: {CLR_RST}").strip()
+        avg_speed = float(speed_input) if speed_input else default_speed
     except ValueError:
-        print(f"{CLR_A}ERROR 输入无效，使用默认值 2.8 m/s{CLR_RST}")
-        avg_speed = 2.8
+        print(f"{CLR_A}ERROR 输入无效，使用默认值 {default_speed:g} m/s{CLR_RST}")
+        avg_speed = default_speed
     
     print(f"\n{CLR_C}开始生成传感器数据...{CLR_RST}")
     
-    # 5. 生成数据
-    sensor_data = generate_sensor_data(duration, avg_speed)
-    
-    # 统计信息
-    import statistics
-    print(f"\n{CLR_C}数据统计:{CLR_RST}")
-    print(f"  数据点数: {len(sensor_data)}")
-    print(f"  平均值: {statistics.mean(sensor_data):.2f} m/s^2")
-    print(f"  标准差: {statistics.stdev(sensor_data):.2f} m/s^2")
-    print(f"  最小值: {min(sensor_data):.2f} m/s^2")
-    print(f"  最大值: {max(sensor_data):.2f} m/s^2")
-    
-    # 6. 写入本地文件（使用选定的文件名）
-    print(f"\n{CLR_C}目标文件: {target_filename}{CLR_RST}")
-    local_file = write_sensor_file(sensor_data, target_filename)
+    axes_cfg = cfg.get("sensor_axes") or {}
+    if axes_cfg.get("enabled"):
+        # 5-6. 多轴高采样率数据：分块生成并流式写入本地文件
+        from sensor_axes import DEFAULT_RATE_HZ, write_axis_sensor_file
+        print(f"\n{CLR_C}目标文件: {target_filename}{CLR_RST}")
+        local_file = write_axis_sensor_file(
+            duration,
+            target_filename,
+            avg_speed,
+            rate_hz=float(axes_cfg.get("rate_hz", DEFAULT_RATE_HZ)),
+            gyro=bool(axes_cfg.get("gyro", False)),
+        )
+    else:
+        # 5. 生成数据：开启 sensor_bootstrap 时拼接真实片段，不可用时退回谐波模型
+        sensor_data = None
+        bootstrap_cfg = cfg.get("sensor_bootstrap") or {}
+        if bootstrap_cfg.get("enabled"):
+            from sensor_bootstrap import DEFAULT_CORPUS_DIR, generate_bootstrap_data
+            corpus_dir = Path(bootstrap_cfg.get("corpus_dir", DEFAULT_CORPUS_DIR))
+            try:
+                sensor_data = generate_bootstrap_data(duration, avg_speed, corpus_dir, bootstrap_cfg.get("seed"))
+            except (OSError, ValueError) as exc:
+                print(f"{CLR_A}真实片段拼接不可用 ({exc})，改用谐波模型{CLR_RST}")
+        if sensor_data is None:
+            sensor_data = generate_sensor_data(duration, avg_speed)
+        
+        # 统计信息
+        import statistics
+        print(f"\n{CLR_C}数据统计:{CLR_RST}")
+        print(f"  数据点数: {len(sensor_data)}")
+        print(f"  平均值: {statistics.mean(sensor_data):.2f} m/s^2")
+        print(f"  标准差: {statistics.stdev(sensor_data):.2f} m/s^2")
+        print(f"  最小值: {min(sensor_data):.2f} m/s^2")
+        print(f"  最大值: {max(sensor_data):.2f} m/s^2")
+        
+        # 6. 写入本地文件（使用选定的文件名）
+        print(f"\n{CLR_C}目标文件: {target_filename}{CLR_RST}")
+        local_file = write_sensor_file(sensor_data, target_filename)
     
     # 7. 推送到模拟器（同名替换）
     print()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+sensor 文件自动替换 - 监视模拟器的 sensor 目录，无需人工选择文件和输入时长
+
+流程：
+1. 一个常驻的 adb shell 在设备端循环 stat sensor 目录，主机端对比相邻两次快照，
+   应用为本次跑步创建的新文件会在一个轮询间隔（默认 0.5 秒）内被发现
+2. 发现新文件后，后台线程立即按配置的时长和速度预生成数据并写到本地
+3. 到达触发时间（默认为发现文件后 duration_sec 秒）时自动推送并同名替换
+
+用法:
+    python sensor_watch.py
+
+配置（config.json，可选）:
+    "sensor_watch": {"duration_sec": 1143, "avg_speed": 2.8, "replace_after_sec": 1143}
+"""
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from sensor_simulator import (
+    CLR_A,
+    CLR_C,
+    CLR_P,
+    CLR_RST,
+    HEART,
+    REMOTE_SENSOR_DIR,
+    find_adb_path,
+    generate_sensor_data,
+    load_config,
+    push_to_emulator,
+    write_sensor_file,
+)
+
+WATCH_INTERVAL_SEC = 0.5  # 设备端轮询间隔
+RESTART_DELAY_SEC = 1.0  # adb shell 断开后重启的等待时间
+SNAPSHOT_MARKER = "__RUNINMUMU_SNAP__"
+DEFAULT_DURATION_SEC = 1143.0  # 3200米 @ 2.8m/s
+DEFAULT_SPEED_MPS = 2.8
+
+Snapshot = Dict[str, Tuple[int, int]]  # 文件名 -> (mtime, 大小)
+
+
+def parse_snapshot(lines) -> Snapshot:
+    """
+    解析 `stat -c '%Y %s %n'` 的输出
+
+    Returns:
+        {文件名: (修改时间戳, 大小)}
+    """
+    snapshot: Snapshot = {}
+    for line in lines:
+        parts = line.strip().split(" ", 2)
+        if len(parts) != 3 or not parts[2].endswith(".txt"):
+            continue
+        try:
+            snapshot[parts[2]] = (int(parts[0]), int(parts[1]))
+        except ValueError:
+            continue
+    return snapshot
+
+
+class SensorDirWatcher:
+    """
+    sensor 目录监视器
+
+    设备端只运行一个 shell 循环，每个间隔输出一次目录快照；主机端只做快照对比，
+    第一份快照作为基线，之后出现的新文件通过 on_created(文件名, 修改时间戳) 回调通知。
+    """
+
+    def __init__(
+        self,
+        adb_path: Path,
+        on_created: Callable[[str, int], None],
+        interval: float = WATCH_INTERVAL_SEC,
+    ) -> None:
+        self.adb_path = adb_path
+        self.on_created = on_created
+        self.interval = interval
+        self.known: Optional[Snapshot] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _script(self) -> str:
+        return (
+            f"while true; do cd {REMOTE_SENSOR_DIR} 2>/dev/null && stat -c '%Y %s %n' *.txt 2>/dev/null; "
+            f"echo {SNAPSHOT_MARKER}; sleep {self.interval}; done"
+        )
+
+    def start(self) -> "SensorDirWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def _watch_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._proc = subprocess.Popen(
+                    [str(self.adb_path), "shell", self._script()],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding="utf-8",
+                )
+                lines = []
+                for line in self._proc.stdout:
+                    if line.strip() == SNAPSHOT_MARKER:
+                        self._diff(parse_snapshot(lines))
+                        lines = []
+                    else:
+                        lines.append(line)
+                    if self._stop.is_set():
+                        break
+            except OSError:
+                pass
+            finally:
+                if self._proc is not None:
+                    try:
+                        self._proc.kill()
+                    except OSError:
+                        pass
+            self._stop.wait(RESTART_DELAY_SEC)
+
+    def _diff(self, snapshot: Snapshot) -> None:
+        if self.known is None:
+            self.known = snapshot
+            return
+        created = [name for name in snapshot if name not in self.known]
+        self.known = snapshot
+        for name in sorted(created, key=lambda n: snapshot[n][0]):
+            self.on_created(name, snapshot[name][0])
+
+
+class AutoReplacer:
+    """
+    发现新文件后后台预生成数据，到达触发时间后推送替换
+
+    只处理发现的第一个新文件（即本次跑步的文件）。
+    """
+
+    def __init__(self, adb_path: Path, duration_sec: float, avg_speed_mps: float, replace_after_sec: float) -> None:
+        self.adb_path = adb_path
+        self.duration_sec = duration_sec
+        self.avg_speed_mps = avg_speed_mps
+        self.replace_after_sec = replace_after_sec
+        self.target: Optional[str] = None
+        self.detected_at = 0.0
+        self.success = False
+        self.done = threading.Event()
+        self._cancel = threading.Event()
+
+    def on_created(self, filename: str, mtime: int) -> None:
+        if self.target is not None:
+            return
+        self.target = filename
+        self.detected_at = time.time()
+        print(f"{CLR_C}✔ 检测到新的 sensor 文件: {filename}{CLR_RST}")
+        threading.Thread(target=self._prepare_and_replace, daemon=True).start()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _prepare_and_replace(self) -> None:
+        try:
+            print(f"{CLR_P}后台预生成 {self.duration_sec:.0f} 秒的数据...{CLR_RST}")
+            data = generate_sensor_data(self.duration_sec, self.avg_speed_mps)
+            local_file = write_sensor_file(data, self.target)
+
+            remaining = self.detected_at + self.replace_after_sec - time.time()
+            if remaining > 0:
+                print(f"{CLR_P}将在 {remaining:.0f} 秒后自动替换 (Ctrl+C 取消){CLR_RST}")
+            if self._cancel.wait(max(0.0, remaining)):
+                return
+
+            self.success = push_to_emulator(self.adb_path, local_file, self.target)
+            try:
+                local_file.unlink()
+            except OSError:
+                pass
+        finally:
+            self.done.set()
+
+
+def main() -> None:
+    print(f"\n{HEART}{'='*60}{CLR_RST}")
+    print(f"{HEART}  传感器数据自动替换{CLR_RST}")
+    print(f"{HEART}{'='*60}{CLR_RST}\n")
+
+    cfg = load_config()
+    adb_path = find_adb_path(cfg)
+    watch_cfg = cfg.get("sensor_watch") or {}
+    duration = float(watch_cfg.get("duration_sec", DEFAULT_DURATION_SEC))
+    avg_speed = float(watch_cfg.get("avg_speed", DEFAULT_SPEED_MPS))
+    replace_after = float(watch_cfg.get("replace_after_sec", duration))
+
+    replacer = AutoReplacer(adb_path, duration, avg_speed, replace_after)
+    watcher = SensorDirWatcher(adb_path, replacer.on_created).start()
+    print(f"{CLR_P}正在监视 {REMOTE_SENSOR_DIR}，请在应用中开始跑步...{CLR_RST}")
+
+    try:
+        while not replacer.done.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        replacer.cancel()
+        print(f"\n{CLR_A}已取消自动替换{CLR_RST}")
+        sys.exit(1)
+    finally:
+        watcher.stop()
+
+    if replacer.success:
+        print(f"\n{HEART}  SUCCESS! 传感器数据已替换: {replacer.target}{CLR_RST}")
+        print(f"{CLR_A}现在可以在应用中点击[结束跑步]了！{CLR_RST}\n")
+    else:
+        print(f"\n{CLR_A}ERROR 自动替换失败，请检查错误信息{CLR_RST}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
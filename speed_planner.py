@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+速度规划 - 加载路线时一次性生成"累计路程 -> 目标速度"曲线，行走时每帧只查表
+
+曲线由以下几部分叠加：
+1. 热身 / 疲劳：起跑后逐渐提速到巡航速度，后半程缓慢掉速
+2. 相关抖动：AR(1) 过程生成的平滑速度波动，代替每帧独立的均匀随机数
+3. 弯道减速：按每个路线点的转角估计曲率，限制过弯速度（开启 spline 时按样条上的点和弧长计算，
+   与行走累计路程的方式一致）
+4. 加减速限制：前向 / 反向各扫一遍，保证入弯前提前减速、出弯后逐渐加速
+
+最后整体缩放，使按时间计算的平均速度等于配置的平均速度（约束点除外）。
+"""
+import math
+import random
+from array import array
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from geo import geo_dist_m
+
+if TYPE_CHECKING:
+    from route_spline import RouteSpline
+
+PROFILE_STEP_M = 1.0  # 曲线采样间隔（米）
+
+LATERAL_ACCEL_MPS2 = 1.2  # 过弯允许的最大向心加速度
+ACCEL_MPS2 = 0.4  # 加速度上限
+DECEL_MPS2 = 0.8  # 减速度上限
+MIN_CURVE_SPAN_M = 6.0  # 计算曲率时的最小弧长，避免 GPS 密集点造成的假急弯
+MIN_SPEED_RATIO = 0.6  # 弯道限速不低于平均速度的该比例
+
+WARMUP_M = 300.0  # 热身距离
+WARMUP_START_RATIO = 0.85  # 起跑速度比例
+FATIGUE_RATIO = 0.05  # 跑完全程时的掉速比例
+
+JITTER_CORR_M = 25.0  # 速度波动的相关长度（米）
+
+
+class SpeedProfile:
+    """
+    按固定路程间隔采样的目标速度曲线
+
+    speed_at 只做一次下标计算和数组访问，超出曲线末尾时返回最后一个值。
+    """
+
+    __slots__ = ("speeds", "step", "_last")
+
+    def __init__(self, speeds: array, step: float = PROFILE_STEP_M) -> None:
+        if not speeds:
+            raise ValueError("速度曲线不能为空")
+        self.speeds = speeds
+        self.step = step
+        self._last = len(speeds) - 1
+
+    def speed_at(self, dist: float) -> float:
+        i = int(dist / self.step)
+        return self.speeds[i if i < self._last else self._last]
+
+    def __len__(self) -> int:
+        return len(self.speeds)
+
+    def mean_speed(self) -> float:
+        """按时间加权的平均速度（总路程 / 总用时）"""
+        return len(self.speeds) / sum(1.0 / v for v in self.speeds)
+
+
+def _lap_polyline(route: Sequence[Tuple[float, float]],
+                  spline: Optional["RouteSpline"] = None) -> Tuple[List[Tuple[float, float]], List[float]]:
+    """
+    一圈的闭合折线（末点即起点）及每个点沿行走路线的路程
+
+    不给 spline 时为路线点加首尾相连的闭合段（与 simulate_walk 的循环方式一致）；给出时从样条的
+    弧长查找表中按 MIN_CURVE_SPAN_M 的弧长间隔取点，路程取自 lut_s。
+    """
+    if spline is None:
+        points = list(route)
+        points.append(points[0])
+        cum = [0.0]
+        for i in range(len(points) - 1):
+            cum.append(cum[-1] + geo_dist_m(*points[i], *points[i + 1]))
+        return points, cum
+
+    lut_points, lut_s = spline.lut_points(), spline.lut_s
+    points, cum = [], []
+    next_s = 0.0
+    for point, s in zip(lut_points, lut_s):
+        if s >= next_s:
+            points.append(point)
+            cum.append(s)
+            next_s = s + MIN_CURVE_SPAN_M
+    if cum[-1] < lut_s[-1]:
+        if len(cum) > 2 and lut_s[-1] - cum[-1] < MIN_CURVE_SPAN_M / 2:
+            points.pop()
+            cum.pop()
+        points.append(lut_points[-1])
+        cum.append(lut_s[-1])
+    return points, cum
+
+
+def corner_caps(route: Sequence[Tuple[float, float]], base_speed: float,
+                spline: Optional["RouteSpline"] = None) -> List[Tuple[float, float]]:
+    """
+    计算一圈内每个路线点（开启 spline 时为样条上的点）的弯道限速
+
+    Returns:
+        [(距起点的路程, 限速), ...]，只包含限速低于 base_speed 的点
+    """
+    points, cum = _lap_polyline(route, spline)
+    n = len(points) - 1
+    lengths = [cum[i + 1] - cum[i] for i in range(n)]
+    cos_lat = math.cos(math.radians(points[0][0]))
+    headings = []
+    for i in range(n):
+        lat1, lon1 = points[i]
+        lat2, lon2 = points[i + 1]
+        headings.append(math.atan2(lat2 - lat1, (lon2 - lon1) * cos_lat))
+
+    floor = base_speed * MIN_SPEED_RATIO
+    caps = []
+    for i in range(n):
+        prev_len, next_len = lengths[i - 1], lengths[i]
+        if prev_len <= 0 or next_len <= 0:
+            continue
+        turn = abs((headings[i] - headings[i - 1] + math.pi) % (2 * math.pi) - math.pi)
+        span = max((prev_len + next_len) / 2, MIN_CURVE_SPAN_M)
+        curvature = turn / span
+        if curvature <= 0:
+            continue
+        cap = max(math.sqrt(LATERAL_ACCEL_MPS2 / curvature), floor)
+        if cap < base_speed:
+            caps.append((cum[i], cap))
+    return caps
+
+
+def _shape(dist: float, total: float) -> float:
+    """热身与疲劳的速度倍率"""
+    warm = 1.0
+    if dist < WARMUP_M:
+        x = dist / WARMUP_M
+        warm = WARMUP_START_RATIO + (1 - WARMUP_START_RATIO) * x * x * (3 - 2 * x)
+    return warm * (1 - FATIGUE_RATIO * min(dist / total, 1.0))
+
+
+def build_speed_profile(
+    route: Sequence[Tuple[float, float]],
+    base_speed: float,
+    dist_limit: float,
+    speed_jitter: float,
+    step: float = PROFILE_STEP_M,
+    seed: Optional[int] = None,
+    spline: Optional["RouteSpline"] = None,
+) -> SpeedProfile:
+    """
+    为路线生成目标速度曲线，覆盖 [0, dist_limit] 的全部路程
+
+    Args:
+        route: (纬度, 经度) 列表，按首尾相连循环
+        base_speed: 目标平均速度（米/秒）
+        dist_limit: 总路程（米）
+        speed_jitter: 速度波动比例，与 simulate_walk 的 ±speed_jitter 含义相同
+        step: 曲线采样间隔（米）
+        seed: 抖动的随机种子，None 时使用全局随机数
+        spline: 行走使用的平滑样条，给出时一圈长度和弯道位置按样条弧长计算
+
+    Returns:
+        SpeedProfile
+    """
+    if len(route) < 2:
+        raise ValueError("路径点至少需要两个")
+
+    rng = random.Random(seed) if seed is not None else random
+    n = int(math.ceil(dist_limit / step)) + 1
+    lap = spline.length if spline is not None else _lap_polyline(route)[1][-1]
+
+    # 弯道限速：按圈展开到整条曲线
+    caps = array("d", [math.inf]) * n
+    lap_caps = corner_caps(route, base_speed, spline) if lap > 0 else []
+    if lap_caps:
+        for lap_idx in range(int(dist_limit // lap) + 1):
+            offset = lap_idx * lap
+            for pos, cap in lap_caps:
+                k = int((offset + pos) / step)
+                if k >= n:
+                    break
+                if cap < caps[k]:
+                    caps[k] = cap
+
+    # 相关抖动：AR(1)，平稳标准差为 speed_jitter / 2，截断在 ±speed_jitter
+    rho = math.exp(-step / JITTER_CORR_M)
+    sigma = speed_jitter / 2 * math.sqrt(1 - rho * rho)
+    jitter = array("d", bytes(8 * n))
+    j = 0.0
+    for k in range(n):
+        j = rho * j + rng.gauss(0.0, sigma)
+        jitter[k] = min(max(j, -speed_jitter), speed_jitter)
+
+    target = array("d", (base_speed * _shape(k * step, dist_limit) * (1 + jitter[k]) for k in range(n)))
+
+    def plan(scale: float) -> array:
+        v = array("d", (min(t * scale, c) for t, c in zip(target, caps)))
+        for k in range(1, n):  # 出弯加速
+            limit = math.sqrt(v[k - 1] ** 2 + 2 * ACCEL_MPS2 * step)
+            if v[k] > limit:
+                v[k] = limit
+        for k in range(n - 2, -1, -1):  # 入弯前减速
+            limit = math.sqrt(v[k + 1] ** 2 + 2 * DECEL_MPS2 * step)
+            if v[k] > limit:
+                v[k] = limit
+        return v
+
+    # 弯道限速会拉低均速，整体缩放一次使平均速度回到 base_speed
+    first = SpeedProfile(plan(1.0), step)
+    return SpeedProfile(plan(base_speed / first.mean_speed()), step)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""测试延迟探测：假设备丢弃和延后的位置分别计为未观察到和乱序"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, '.')
+
+from geo import METERS_PER_DEG
+from latency_probe import FakeLocationDevice, LatencyProbe
+
+STEP_SEC = 0.025  # 采样间隔
+TICKS_PER_SEND = 4  # 每 0.1 秒发送一个位置
+
+
+class ManualClock:
+    def __init__(self) -> None:
+        self.steps = 0
+
+    def __call__(self) -> float:
+        return self.steps * STEP_SEC
+
+
+def run(sends: int, drop_every: int, reorder_every: int) -> dict:
+    clock = ManualClock()
+    device = FakeLocationDevice(0.15, drop_every, clock=clock, reorder_every=reorder_every, reorder_delay_sec=0.25)
+    probe = LatencyProbe(device.query, clock=clock)
+    send = probe.wrap(device.send)
+    lat, lon = 30.3083, 120.0783
+    for i in range(sends):
+        send(Path("fake"), lon, lat, (0.0, 0.0))
+        lat += 2.8 * TICKS_PER_SEND * STEP_SEC / METERS_PER_DEG
+        for _ in range(TICKS_PER_SEND):
+            clock.steps += 1
+            probe.sample()
+    for _ in range(40):  # 等在途的位置全部到达
+        clock.steps += 1
+        probe.sample()
+    return probe.report()
+
+
+def test_in_order() -> None:
+    report = run(30, 0, 0)
+    print(f"无丢失无乱序: {report}")
+    assert report["observed"] == 30
+    assert report["unobserved"] == 0
+    assert report["reordered"] == 0
+
+
+def test_drop_and_reorder_counts() -> None:
+    report = run(70, drop_every=5, reorder_every=7)
+    print(f"丢失 + 乱序: {report}")
+    dropped = [i for i in range(1, 71) if i % 5 == 0]
+    delayed = [i for i in range(1, 71) if i % 7 == 0 and i % 5 != 0]
+    # 第 70 个位置被丢弃，在最后一个观察到的位置之后，不计为未观察到
+    assert report["unobserved"] == len(dropped) - 1, report
+    assert report["observed"] == 70 - len(dropped), report
+    # 每个延后的位置都晚于之后的位置到达，且只计一次
+    assert report["reordered"] == len(delayed), report
+
+
+if __name__ == "__main__":
+    test_in_order()
+    test_drop_and_reorder_counts()
+    print("\nOK 延迟探测丢失/乱序统计检查通过")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""测试路线批量编译：不同目录下的同名文件不会互相覆盖"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, '.')
+
+import gpx_parser
+from route_importers import load_route
+
+
+def write_gpx(path: Path, points) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wpts = "".join(f'<wpt lat="{lat}" lon="{lon}"></wpt>' for lat, lon in points)
+    path.write_text(f'<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">{wpts}</gpx>', encoding="utf-8")
+
+
+def test_same_name_in_different_dirs() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        routes = {
+            root / "a" / "run.gpx": [(30.1, 120.1), (30.2, 120.2)],
+            root / "b" / "run.gpx": [(31.1, 121.1), (31.2, 121.2), (31.3, 121.3)],
+            root / "b" / "run.json": [(32.1, 122.1), (32.2, 122.2)],
+        }
+        for path, points in routes.items():
+            if path.suffix == ".gpx":
+                write_gpx(path, points)
+            else:
+                path.write_text(str([list(p) for p in points]), encoding="utf-8")
+
+        sources = gpx_parser.collect_sources([str(root / "a"), str(root / "b")])
+        manifest = gpx_parser.compile_routes(sources, root / "out", jobs=2)
+
+        outputs = [entry["output"] for entry in manifest["routes"]]
+        print(f"输出文件: {outputs}")
+        assert len(set(outputs)) == len(routes), outputs
+        for entry in manifest["routes"]:
+            assert "error" not in entry, entry
+            compiled = load_route(root / "out" / entry["output"])
+            assert len(compiled) == len(routes[Path(entry["source"])]), entry
+
+
+def test_collision_fails_before_compiling() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_gpx(root / "a__run.gpx", [(30.1, 120.1), (30.2, 120.2)])
+        write_gpx(root / "a" / "run.gpx", [(30.1, 120.1), (30.2, 120.2)])
+        sources = [root / "a__run.gpx", root / "a" / "run.gpx"]
+        try:
+            gpx_parser.compile_routes(sources, root / "out")
+        except ValueError as exc:
+            print(f"冲突检测: {exc}")
+        else:
+            raise AssertionError("输出文件名冲突时应报错")
+        assert not (root / "out").exists()
+
+
+if __name__ == "__main__":
+    test_same_name_in_different_dirs()
+    test_collision_fails_before_compiling()
+    print("\nOK 批量编译输出文件名检查通过")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+行走参数扫描 - 虚拟时钟 + 假后端，毫秒级跑完整次模拟
+
+对速度、速度波动、发送间隔做网格扫描，输出每组参数的最终路程、用时和发送点数；
+结果可保存为 JSON，之后用 --check 对比，作为行走逻辑的快速回归检查（随机种子固定，结果可复现）。
+
+用法:
+    python walk_sweep.py                                           # 默认参数跑一次
+    python walk_sweep.py --speeds 2.4 2.8 3.2 --ticks 0.2 0.4 1.0 --seeds 3
+    python walk_sweep.py --plan                                    # 使用速度曲线
+    python walk_sweep.py --output sweep.json                       # 保存结果
+    python walk_sweep.py --check sweep.json                        # 与保存的结果对比
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from itertools import product
+from pathlib import Path
+from typing import List, Tuple
+
+from prettytable import PrettyTable
+
+import main as walker
+from clock import VirtualClock
+from route_importers import load_route
+from speed_planner import build_speed_profile
+
+CHECK_TOLERANCE = 1e-6
+
+
+def run_once(route: List[Tuple[float, float]], speed: float, jitter: float, tick: float,
+             dist_limit: float, seed: int, plan: bool = False) -> dict:
+    """用虚拟时钟和计数假后端跑完整次模拟；plan 为 True 时使用速度曲线"""
+    sent = 0
+
+    def count_send(mgr_path: Path, lon: float, lat: float, offset: Tuple[float, float]) -> None:
+        nonlocal sent
+        sent += 1
+
+    random.seed(seed)
+    t0 = time.perf_counter()
+    profile = build_speed_profile(route, speed, dist_limit, jitter, seed=seed) if plan else None
+    result = walker.simulate_walk(
+        Path("fake"), route, (0.0, 0.0), send=count_send, clock=VirtualClock(), display=False,
+        base_speed=speed, speed_jitter=jitter, tick_interval=tick, dist_limit=dist_limit,
+        speed_profile=profile,
+    )
+    return {
+        "speed": speed,
+        "jitter": jitter,
+        "tick": tick,
+        "seed": seed,
+        "distance_m": result.distance_m,
+        "duration_sec": result.elapsed_sec,
+        "ticks": result.ticks,
+        "points_sent": sent,
+        "wall_ms": (time.perf_counter() - t0) * 1000,
+    }
+
+
+def check(results: List[dict], expected_path: Path) -> List[str]:
+    """与保存的结果逐项对比，返回不一致项"""
+    expected = json.loads(expected_path.read_text(encoding="utf-8"))
+    key = lambda r: (r["speed"], r["jitter"], r["tick"], r["seed"])
+    expected_by_key = {key(r): r for r in expected["runs"]}
+    mismatches = []
+    for run in results:
+        exp = expected_by_key.get(key(run))
+        if exp is None:
+            continue
+        for field in ("distance_m", "duration_sec", "ticks", "points_sent"):
+            if abs(run[field] - exp[field]) > CHECK_TOLERANCE:
+                mismatches.append(f"{key(run)} {field}: {exp[field]} -> {run[field]}")
+    return mismatches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="行走参数扫描（虚拟时钟）")
+    parser.add_argument("--route", type=Path, help="路线文件（route_importers 支持的格式），默认按 config.json 加载")
+    parser.add_argument("--speeds", nargs="+", type=float, default=[walker.BASE_SPEED_MPS], help="平均速度 (m/s)")
+    parser.add_argument("--jitters", nargs="+", type=float, default=[walker.SPEED_JITTER_RATIO], help="速度波动比例")
+    parser.add_argument("--ticks", nargs="+", type=float, default=[walker.TICK_INTERVAL_SEC], help="发送间隔 (秒)")
+    parser.add_argument("--distance", type=float, default=walker.DIST_LIMIT_M, help="目标距离 (米)")
+    parser.add_argument("--seeds", type=int, default=1, help="每组参数的随机种子数")
+    parser.add_argument("--plan", action="store_true", help="使用速度曲线（弯道减速、热身/疲劳、相关抖动）")
+    parser.add_argument("--output", type=Path, help="保存结果的 JSON 路径")
+    parser.add_argument("--check", type=Path, help="与保存的结果对比")
+    args = parser.parse_args()
+
+    if args.route:
+        route = load_route(args.route)
+    else:
+        route, _ = walker.load_walk_path(walker.load_config())
+
+    runs = [
+        run_once(route, speed, jitter, tick, args.distance, seed, args.plan)
+        for speed, jitter, tick, seed in product(args.speeds, args.jitters, args.ticks, range(args.seeds))
+    ]
+
+    tbl = PrettyTable(["速度", "波动", "间隔", "种子", "路程(m)", "用时(s)", "发送点数", "耗时(ms)"])
+    for run in runs:
+        tbl.add_row([run["speed"], run["jitter"], run["tick"], run["seed"], f"{run['distance_m']:.2f}",
+                     f"{run['duration_sec']:.1f}", run["points_sent"], f"{run['wall_ms']:.1f}"])
+    print(tbl)
+
+    if args.output:
+        args.output.write_text(json.dumps({"distance_limit_m": args.distance, "runs": runs}, indent=4), encoding="utf-8")
+        print(f"结果已保存到: {args.output}")
+
+    if args.check:
+        mismatches = check(runs, args.check)
+        if mismatches:
+            print(f"× {len(mismatches)} 项与 {args.check} 不一致:")
+            for line in mismatches:
+                print(f"  - {line}")
+            return 1
+        print(f"✓ 与 {args.check} 一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())